@@ -0,0 +1,137 @@
+"""
+JSON telemetri ucu (/api/telemetri_gonder) ile ikili ucu (/api/telemetri_gonder_ikili)
+karşılaştırır:
+
+  1. Hatta giden byte: istek gövdesi ve http.client'ın eklediği başlıklar dahil.
+  2. Çözme maliyeti (process içi): JSON -> TelemetriModel -> TelemetriKaydi ile
+     struct -> TelemetriKaydi, paket başına mikro saniye.
+  3. Uçtan uca sunucu CPU'su: geçici bir sunucuya her iki uçtan aynı sayıda
+     paket gönderilir, sunucu process'inin harcadığı CPU (Linux /proc) paket
+     sayısına bölünür.
+
+Kullanım:
+    python bench/ikili_karsilastirma.py [--takim-sayisi 200] [--tur 10] [--cikti sonuc.json]
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+from olcum import ISTEMCI_DIZINI, SUNUCU_DIZINI, SunucuSureci, takim_listesi_olustur
+
+sys.path.insert(0, ISTEMCI_DIZINI)
+from competitor_client import CompetitorClient
+
+
+def ornek_paket(takim_no, tur=0):
+    istemci = CompetitorClient()
+    istemci.takim_no = takim_no
+    return istemci._telemetry_payload(41.508775 + tur * 1e-5, 36.118335, 38.25, 2.5, 181.75, -3.25,
+                                      15.5, 87.5, 1, 1, {"hedef_merkez_X": 320, "hedef_merkez_Y": 240,
+                                                         "hedef_genislik": 64, "hedef_yukseklik": 48})
+
+
+def hat_boyutlari(paket):
+    json_govde = json.dumps(paket).encode("utf-8")
+    ikili_govde = CompetitorClient.encode_telemetry_binary(paket)
+
+    def istek_boyutu(yol, govde, icerik_turu):
+        # http.client'ın gönderdiği istek satırı ve başlıklar
+        basliklar = (f"POST {yol} HTTP/1.1\r\nHost: 127.0.0.1:8000\r\nAccept-Encoding: identity\r\n"
+                     f"Content-Length: {len(govde)}\r\nContent-Type: {icerik_turu}\r\n\r\n")
+        return len(basliklar) + len(govde)
+
+    return {
+        "json_govde_byte": len(json_govde),
+        "ikili_govde_byte": len(ikili_govde),
+        "json_istek_byte": istek_boyutu("/api/telemetri_gonder", json_govde, "application/json"),
+        "ikili_istek_byte": istek_boyutu("/api/telemetri_gonder_ikili", ikili_govde, "application/octet-stream"),
+    }
+
+
+def cozme_maliyeti(paket, tekrar):
+    # referee_server import edilirken çalışma dizininde DB oluşturur; geçici dizinde yap
+    onceki_dizin = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="hakem_ikili_"))
+    sys.path.insert(0, SUNUCU_DIZINI)
+    try:
+        from referee_server import TelemetriModel
+        from telemetri_kaydi import TelemetriKaydi
+    finally:
+        os.chdir(onceki_dizin)
+
+    json_govde = json.dumps(paket).encode("utf-8")
+    ikili_govde = CompetitorClient.encode_telemetry_binary(paket)
+    assert TelemetriKaydi.ikiliden(ikili_govde).gps_saati_ms == \
+        TelemetriKaydi.modelden(TelemetriModel.model_validate(json.loads(json_govde))).gps_saati_ms
+
+    # FastAPI gövdeyi önce json.loads ile çözer, sonra modeli doğrular
+    json_s = timeit.timeit(lambda: TelemetriKaydi.modelden(TelemetriModel.model_validate(json.loads(json_govde))),
+                           number=tekrar)
+    ikili_s = timeit.timeit(lambda: TelemetriKaydi.ikiliden(ikili_govde), number=tekrar)
+    return {"json_us": round(json_s / tekrar * 1e6, 3), "ikili_us": round(ikili_s / tekrar * 1e6, 3)}
+
+
+def uctan_uca_cpu(takim_sayisi, tur_sayisi, port):
+    takimlar = takim_listesi_olustur(takim_sayisi)
+    sunucu = SunucuSureci(takimlar, port).baslat()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        for takim in takimlar:
+            conn.request("POST", "/api/giris", body=json.dumps({"kadi": takim["kadi"], "sifre": takim["sifre"]}),
+                         headers={"Content-Type": "application/json"})
+            conn.getresponse().read()
+
+        sonuc = {}
+        for ad, yol, kodla, icerik_turu in (
+                ("json", "/api/telemetri_gonder", lambda p: json.dumps(p).encode("utf-8"), "application/json"),
+                ("ikili", "/api/telemetri_gonder_ikili", CompetitorClient.encode_telemetry_binary,
+                 "application/octet-stream")):
+            basarili = 0
+            cpu_once = sunucu.cpu_suresi_s()
+            for tur in range(tur_sayisi):
+                for takim in takimlar:
+                    conn.request("POST", yol, body=kodla(ornek_paket(takim["takim_no"], tur)),
+                                 headers={"Content-Type": icerik_turu})
+                    resp = conn.getresponse()
+                    resp.read()
+                    basarili += resp.status == 200
+                # Aynı takımın iki paketi arasında 2 Hz kuralı (tur süreleri değişse de)
+                time.sleep(0.55)
+            cpu_s = sunucu.cpu_suresi_s() - cpu_once
+            sonuc[ad] = {"paket": basarili, "sunucu_cpu_s": round(cpu_s, 3),
+                         "paket_basina_cpu_us": round(cpu_s / max(basarili, 1) * 1e6, 1)}
+        conn.close()
+        return sonuc
+    finally:
+        sunucu.durdur()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--takim-sayisi", type=int, default=200)
+    parser.add_argument("--tur", type=int, default=10, help="Her takımın her uçtan göndereceği paket sayısı")
+    parser.add_argument("--tekrar", type=int, default=20000, help="Process içi çözme ölçümü tekrar sayısı")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--cikti", help="JSON sonucun ayrıca yazılacağı dosya")
+    args = parser.parse_args()
+
+    paket = ornek_paket(1)
+    sonuc = {
+        "hat": hat_boyutlari(paket),
+        "cozme": cozme_maliyeti(paket, args.tekrar),
+        "uctan_uca": uctan_uca_cpu(args.takim_sayisi, args.tur, args.port),
+    }
+    metin = json.dumps(sonuc, indent=4, ensure_ascii=False)
+    if args.cikti:
+        with open(args.cikti, "w") as f:
+            f.write(metin)
+    print(metin)
+
+
+if __name__ == "__main__":
+    main()
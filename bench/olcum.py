@@ -0,0 +1,119 @@
+"""bench/ altındaki betiklerin ortak ölçüm ve sunucu başlatma yardımcıları."""
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+SUNUCU_DIZINI = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "server"))
+ISTEMCI_DIZINI = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "client"))
+
+
+def yuzdelik(degerler, oran):
+    sirali = sorted(degerler)
+    return sirali[min(len(sirali) - 1, int(len(sirali) * oran))]
+
+
+def gecikme_ozeti(sureler_ms):
+    """Gecikme listesinden (ms) p50/p95/p99/max özetini çıkarır."""
+    if not sureler_ms:
+        return {"adet": 0}
+    sirali = sorted(sureler_ms)
+    return {
+        "adet": len(sirali),
+        "p50_ms": round(yuzdelik(sirali, 0.50), 3),
+        "p95_ms": round(yuzdelik(sirali, 0.95), 3),
+        "p99_ms": round(yuzdelik(sirali, 0.99), 3),
+        "max_ms": round(sirali[-1], 3),
+    }
+
+
+def takim_listesi_olustur(takim_sayisi, onek="yuk_takim"):
+    return [{"kadi": f"{onek}{i}", "sifre": f"sifre{i}", "takim_no": i}
+            for i in range(1, takim_sayisi + 1)]
+
+
+def kaynak_ip(sira):
+    """
+    Her simüle takıma ayrı bir loopback adresi verir (127.0.x.y).
+
+    Sunucu oturumu IP ile eşleştirdiği için aynı IP'den giriş yapan takımlar
+    birbirinin oturumunu ezer; Linux'ta tüm 127/8 bloğu loopback'tir.
+    127.0.0.1 sunucunun localhost istisnasına takıldığı için kullanılmaz.
+    """
+    return f"127.0.{sira // 250 + 1}.{sira % 250 + 2}"
+
+
+class SunucuSureci:
+    """
+    referee_server.py'yi geçici bir çalışma dizininde ayrı bir process olarak başlatır.
+    Gerçek yarisma_verileri.db ve teams.json'a dokunulmaz.
+    """
+
+    def __init__(self, takimlar, port, ortam=None, uvicorn_argumanlari=()):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.dizin = tempfile.mkdtemp(prefix="hakem_bench_")
+        self.db_yolu = os.path.join(self.dizin, "yarisma_verileri.db")
+        with open(os.path.join(self.dizin, "teams.json"), "w") as f:
+            json.dump(takimlar, f)
+        self._ortam = dict(os.environ, **(ortam or {}))
+        self._argumanlar = list(uvicorn_argumanlari)
+        self._surec = None
+        self._log = None
+
+    def baslat(self, zaman_asimi_s=20):
+        self._log = open(os.path.join(self.dizin, "sunucu_log.txt"), "w")
+        self._surec = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "referee_server:app", "--app-dir", SUNUCU_DIZINI,
+             "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning",
+             *self._argumanlar],
+            cwd=self.dizin, env=self._ortam, stdout=self._log, stderr=subprocess.STDOUT)
+        son = time.monotonic() + zaman_asimi_s
+        while time.monotonic() < son:
+            if self._surec.poll() is not None:
+                raise RuntimeError(f"Sunucu başlatılamadı, bkz. {self._log.name}")
+            try:
+                urllib.request.urlopen(f"{self.url}/api/sunucusaati", timeout=1).read()
+                return self
+            except OSError:
+                time.sleep(0.1)
+        self.durdur()
+        raise RuntimeError("Sunucu zamanında ayağa kalkmadı")
+
+    def durdur(self):
+        """SIGINT ile düzgün kapatır (kuyrukta kalan telemetri diske yazılır)."""
+        if self._surec is None:
+            return
+        self._surec.send_signal(signal.SIGINT)
+        try:
+            self._surec.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self._surec.kill()
+        self._surec = None
+        self._log.close()
+
+    def cpu_suresi_s(self):
+        """Sunucu process'inin harcadığı toplam CPU süresi (user + system, Linux /proc)."""
+        with open(f"/proc/{self._surec.pid}/stat") as f:
+            alanlar = f.read().rsplit(")", 1)[1].split()
+        # ")" sonrası 12. ve 13. alanlar utime ve stime (clock tick)
+        return (int(alanlar[11]) + int(alanlar[12])) / os.sysconf("SC_CLK_TCK")
+
+    def db_boyutu(self):
+        """
+        Veritabanının mantıksal boyutu (page_count * page_size, byte). Dosya
+        boyutlarına bakılmaz: açılışta yazılanlar henüz -wal'dadır, kapanışta
+        WAL ana dosyaya aktarılıp silinir; ikisini karşılaştırmak büyümeyi
+        negatif gösterebilir. Ayrı bir bağlantı WAL'deki son commit'i de görür.
+        """
+        conn = sqlite3.connect(self.db_yolu)
+        try:
+            sayfa_sayisi = conn.execute("PRAGMA page_count").fetchone()[0]
+            return sayfa_sayisi * conn.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            conn.close()
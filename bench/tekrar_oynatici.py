@@ -0,0 +1,224 @@
+"""
+Kayıtlı bir maçı (yarisma_verileri.db) hakem sunucusuna yeniden oynatır.
+
+telemetri, kilitlenmeler ve kamikaze tabloları satır satır okunan
+generator'larla akıtılır ve heapq.merge ile tek bir zaman çizelgesinde
+birleştirilir; veritabanı belleğe alınmaz. Her olay, kayıttaki zamanına göre
+(--hiz ile hızlandırılarak) planlanır ve takımın kendi thread'ine / kendi
+loopback IP'sine (bkz. olcum.kaynak_ip) verilir.
+
+Kilitlenme ve kamikaze satırlarında sunucu saati yoktur; saat metinleri
+takımın telemetrisindeki gps_saati_ms -> sunucu_saati_ms farkıyla zaman
+çizelgesine yerleştirilir. Bu satırlar eklenme (rowid) sırasıyla okunur.
+
+Sonunda planlanan ve gerçek gönderim zamanı arasındaki gecikme (sunucunun
+kayıttaki hıza ne kadar yetişebildiği), elde edilen hız ve uç nokta başına
+cevap süreleri raporlanır.
+
+Kullanım:
+    python bench/tekrar_oynatici.py --db kayit.db --hiz 10 [--cikti sonuc.json]
+    python bench/tekrar_oynatici.py --db kayit.db --hiz 0            # olabildiğince hızlı
+    python bench/tekrar_oynatici.py --db kayit.db --url http://127.0.0.1:8000
+"""
+import argparse
+import contextlib
+import heapq
+import io
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+from olcum import SunucuSureci, gecikme_ozeti, kaynak_ip
+from yuk_testi import OlcumluIstemci, rapor_olustur
+
+TELEMETRI_SQL = """SELECT sunucu_saati_ms, takim_no, enlem, boylam, irtifa, dikilme, yonelme, yatis, hiz,
+    batarya, otonom, kilitlenme, hedef_merkez_X, hedef_merkez_Y, hedef_genislik, hedef_yukseklik,
+    gps_saati_ms FROM telemetri ORDER BY sunucu_saati_ms"""
+TAKIM_KUYRUK_BOYUTU = 1000
+
+
+def _saat(ms):
+    saat, kalan = divmod(ms, 3600000)
+    dakika, kalan = divmod(kalan, 60000)
+    saniye, milisaniye = divmod(kalan, 1000)
+    return {"saat": saat, "dakika": dakika, "saniye": saniye, "milisaniye": milisaniye}
+
+
+def _saat_ms(metin):
+    saat, dakika, saniye, milisaniye = (int(parca) for parca in metin.split(":"))
+    return (saat * 3600000) + (dakika * 60000) + (saniye * 1000) + milisaniye
+
+
+def telemetri_olaylari(conn):
+    for (zaman_ms, takim_no, enlem, boylam, irtifa, dikilme, yonelme, yatis, hiz, batarya, otonom,
+         kilitlenme, merkez_x, merkez_y, genislik, yukseklik, gps_ms) in conn.execute(TELEMETRI_SQL):
+        yield zaman_ms, takim_no, "/api/telemetri_gonder", {
+            "takim_numarasi": takim_no,
+            "iha_enlem": enlem, "iha_boylam": boylam, "iha_irtifa": irtifa,
+            "iha_dikilme": dikilme, "iha_yonelme": yonelme, "iha_yatis": yatis, "iha_hiz": hiz,
+            "iha_batarya": batarya, "iha_otonom": otonom, "iha_kilitlenme": kilitlenme,
+            "hedef_merkez_X": merkez_x, "hedef_merkez_Y": merkez_y,
+            "hedef_genislik": genislik, "hedef_yukseklik": yukseklik,
+            "gps_saati": _saat(gps_ms),
+        }
+
+
+def gps_farklari(conn):
+    """{takim_no: sunucu_saati_ms - gps_saati_ms} (takımın ilk paketinden)."""
+    return {takim_no: fark for takim_no, _, fark in conn.execute(
+        "SELECT takim_no, MIN(sunucu_saati_ms), sunucu_saati_ms - gps_saati_ms FROM telemetri GROUP BY takim_no")}
+
+
+def kilitlenme_olaylari(conn, farklar, atlanan):
+    for takim_no, bitis, otonom_mu in conn.execute(
+            "SELECT takim_no, bitis_saati, otonom_mu FROM kilitlenmeler ORDER BY rowid"):
+        try:
+            bitis_ms = _saat_ms(bitis)
+        except ValueError:
+            atlanan["kilitlenme"] += 1
+            continue
+        if takim_no not in farklar:
+            atlanan["kilitlenme"] += 1
+            continue
+        yield bitis_ms + farklar[takim_no], takim_no, "/api/kilitlenme_bilgisi", {
+            "kilitlenmeBitisZamani": _saat(bitis_ms), "otonom_kilitlenme": otonom_mu}
+
+
+def kamikaze_olaylari(conn, farklar, atlanan):
+    for takim_no, baslangic, bitis, qr_metni in conn.execute(
+            "SELECT takim_no, baslangic_saati, bitis_saati, qr_metni FROM kamikaze ORDER BY rowid"):
+        try:
+            baslangic_ms, bitis_ms = _saat_ms(baslangic), _saat_ms(bitis)
+        except ValueError:
+            atlanan["kamikaze"] += 1
+            continue
+        if takim_no not in farklar:
+            atlanan["kamikaze"] += 1
+            continue
+        yield bitis_ms + farklar[takim_no], takim_no, "/api/kamikaze_bilgisi", {
+            "kamikazeBaslangicZamani": _saat(baslangic_ms), "kamikazeBitisZamani": _saat(bitis_ms),
+            "qrMetni": qr_metni}
+
+
+def takim_isci(istemci, kuyruk, gecikmeler):
+    """Takımın olaylarını sırayla gönderir; planlanan zamandan sapmayı kaydeder."""
+    while True:
+        olay = kuyruk.get()
+        if olay is None:
+            return
+        hedef, endpoint, paket = olay
+        gecikmeler.append((time.monotonic() - hedef) * 1000)
+        istemci._send_request(endpoint, "POST", paket)
+
+
+def oynat(db_yolu, url, takimlar, hiz):
+    """
+    Olayları oynatır; (istemciler, gecikmeler_ms, kayit_suresi_s, gercek_sure_s, olay_sayisi, atlanan) döner.
+    hiz 0 ise bekleme yapılmaz.
+    """
+    conn = sqlite3.connect(db_yolu)
+    atlanan = {"kilitlenme": 0, "kamikaze": 0, "bilinmeyen_takim": 0}
+    farklar = gps_farklari(conn)
+    olaylar = heapq.merge(telemetri_olaylari(conn),
+                          kilitlenme_olaylari(conn, farklar, atlanan),
+                          kamikaze_olaylari(conn, farklar, atlanan),
+                          key=lambda olay: olay[0])
+
+    istemciler, kuyruklar, threadler, gecikmeler = {}, {}, [], []
+    for sira, takim in enumerate(takimlar):
+        istemci = OlcumluIstemci(url, takim["kadi"], takim["sifre"], kaynak_ip(sira))
+        if not istemci.login():
+            continue
+        istemciler[istemci.takim_no] = istemci
+        kuyruklar[istemci.takim_no] = queue.Queue(maxsize=TAKIM_KUYRUK_BOYUTU)
+        threadler.append(threading.Thread(target=takim_isci, daemon=True,
+                                          args=(istemci, kuyruklar[istemci.takim_no], gecikmeler)))
+    for t in threadler:
+        t.start()
+
+    olay_sayisi, ilk_ms, son_ms = 0, None, None
+    baslangic = time.monotonic()
+    for zaman_ms, takim_no, endpoint, paket in olaylar:
+        if ilk_ms is None:
+            ilk_ms = zaman_ms
+        son_ms = zaman_ms
+        if takim_no not in kuyruklar:
+            atlanan["bilinmeyen_takim"] += 1
+            continue
+        if hiz > 0:
+            hedef = baslangic + (zaman_ms - ilk_ms) / 1000 / hiz
+            bekle = hedef - time.monotonic()
+            if bekle > 0:
+                time.sleep(bekle)
+        else:
+            hedef = time.monotonic()
+        kuyruklar[takim_no].put((hedef, endpoint, paket))
+        olay_sayisi += 1
+
+    for kuyruk in kuyruklar.values():
+        kuyruk.put(None)
+    for t in threadler:
+        t.join()
+    gercek_sure = time.monotonic() - baslangic
+    conn.close()
+    kayit_suresi = (son_ms - ilk_ms) / 1000 if ilk_ms is not None else 0.0
+    return list(istemciler.values()), gecikmeler, kayit_suresi, gercek_sure, olay_sayisi, atlanan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="Oynatılacak kayıt (yarisma_verileri.db kopyası)")
+    parser.add_argument("--hiz", type=float, default=1.0, help="Hızlandırma çarpanı; 0 = olabildiğince hızlı")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--url", help="Yeni sunucu başlatmak yerine çalışan sunucuyu hedefle "
+                                      "(takımları kayıttakilerle aynı olmalı)")
+    parser.add_argument("--cikti", help="JSON sonucun ayrıca yazılacağı dosya")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    takimlar = [{"kadi": kadi, "sifre": sifre, "takim_no": takim_no}
+                for kadi, sifre, takim_no in conn.execute("SELECT kadi, sifre, takim_no FROM takimlar")]
+    conn.close()
+
+    sunucu = None
+    if args.url:
+        url = args.url
+    else:
+        # Kayıttaki paketler 2 Hz kuralından zaten geçmiş; oynatmadaki birkaç ms'lik
+        # sapma (ve hızlandırma) yeniden 400'e düşürmesin diye kural kapatılır
+        sunucu = SunucuSureci(takimlar, args.port, ortam={"TELEMETRI_MIN_ARALIK_MS": "0"}).baslat()
+        url = sunucu.url
+
+    try:
+        # CompetitorClient girişleri konsola basar; oynatma boyunca çıktıyı yut
+        with contextlib.redirect_stdout(io.StringIO()):
+            istemciler, gecikmeler, kayit_suresi, gercek_sure, olay_sayisi, atlanan = oynat(
+                args.db, url, takimlar, args.hiz)
+    finally:
+        if sunucu is not None:
+            sunucu.durdur()
+
+    uc_noktalar, hiz_siniri = rapor_olustur(istemciler, gercek_sure)
+    sonuc = {
+        "ayarlar": {"db": args.db, "hiz": args.hiz, "takim_sayisi": len(istemciler)},
+        "olay_sayisi": olay_sayisi,
+        "atlanan": atlanan,
+        "kayit_suresi_s": round(kayit_suresi, 3),
+        "gercek_sure_s": round(gercek_sure, 3),
+        "elde_edilen_hiz": round(kayit_suresi / gercek_sure, 2) if gercek_sure > 0 else None,
+        # Planlanan gönderim anından sapma: sunucu (veya istemci) kayıttaki hıza yetişemezse büyür
+        "planlama_gecikmesi": gecikme_ozeti(gecikmeler),
+        "uc_noktalar": uc_noktalar,
+        "hiz_siniri_400": hiz_siniri,
+    }
+    metin = json.dumps(sonuc, indent=4, ensure_ascii=False)
+    if args.cikti:
+        with open(args.cikti, "w") as f:
+            f.write(metin)
+    print(metin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Yavaş disk senaryosu: SQLite commit'leri yapay olarak geciktirilirken
+/api/sunucusaati ve başka bir takımın /api/telemetri_gonder gecikmesinin
+artmadığını doğrular.
+
+Sunucu geçici bir dizinde (gerçek yarisma_verileri.db'ye dokunmadan) aynı
+process içinde başlatılır; tüm DB bağlantılarının commit'i --gecikme-ms kadar
+uyutulur ve arka planda sürekli kilitlenme paketi gönderilir.
+
+Kullanım:
+    python bench/yavas_disk_testi.py [--gecikme-ms 300] [--port 8100]
+
+Çıkış kodu 0 ise event loop yavaş diskten etkilenmemiştir.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import requests
+import uvicorn
+
+from olcum import SUNUCU_DIZINI, yuzdelik
+
+
+class YavasBaglanti:
+    """sqlite3 bağlantısını sarar; her commit'i yavaş bir disk gibi bekletir."""
+
+    def __init__(self, conn, gecikme_s):
+        self._conn = conn
+        self._gecikme_s = gecikme_s
+
+    def commit(self):
+        time.sleep(self._gecikme_s)
+        return self._conn.commit()
+
+    def __getattr__(self, ad):
+        return getattr(self._conn, ad)
+
+
+def sunucuyu_baslat(port, gecikme_s):
+    calisma_dizini = tempfile.mkdtemp(prefix="hakem_yavas_disk_")
+    with open(os.path.join(calisma_dizini, "teams.json"), "w") as f:
+        json.dump([{"kadi": "takim1", "sifre": "s1", "takim_no": 1},
+                   {"kadi": "takim2", "sifre": "s2", "takim_no": 2}], f)
+    os.chdir(calisma_dizini)
+    sys.path.insert(0, SUNUCU_DIZINI)
+    import referee_server
+
+    yonetici = referee_server.db_yoneticisi
+    orijinal_baglanti = yonetici.baglanti
+    yonetici.baglanti = lambda: YavasBaglanti(orijinal_baglanti(), gecikme_s)
+
+    server = uvicorn.Server(uvicorn.Config(referee_server.app, host="127.0.0.1",
+                                           port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def telemetri_paketi(takim_no):
+    now = datetime.now()
+    return {
+        "takim_numarasi": takim_no, "iha_enlem": 41.5, "iha_boylam": 36.1,
+        "iha_irtifa": 40.0, "iha_dikilme": 0.0, "iha_yonelme": 90.0, "iha_yatis": 0.0,
+        "iha_hiz": 10.0, "iha_batarya": 90.0, "iha_otonom": 1, "iha_kilitlenme": 0,
+        "hedef_merkez_X": 0, "hedef_merkez_Y": 0, "hedef_genislik": 0, "hedef_yukseklik": 0,
+        "gps_saati": {"saat": now.hour, "dakika": now.minute,
+                      "saniye": now.second, "milisaniye": now.microsecond // 1000},
+    }
+
+
+def olc(url, telemetri_sayisi):
+    """sunucusaati'ni sürekli, takım 2 telemetrisini 2 Hz'in altında ölçer (ms)."""
+    oturum = requests.Session()
+    saat, telemetri = [], []
+    sonraki_telemetri = time.monotonic() + 0.55  # Önceki ölçümün son paketinden sonra 2 Hz sınırı
+    while len(telemetri) < telemetri_sayisi:
+        t0 = time.perf_counter()
+        oturum.get(f"{url}/api/sunucusaati", timeout=10).raise_for_status()
+        saat.append((time.perf_counter() - t0) * 1000)
+
+        if time.monotonic() >= sonraki_telemetri:
+            sonraki_telemetri = time.monotonic() + 0.55
+            t0 = time.perf_counter()
+            resp = oturum.post(f"{url}/api/telemetri_gonder", json=telemetri_paketi(2), timeout=10)
+            telemetri.append((time.perf_counter() - t0) * 1000)
+            if resp.status_code != 200:
+                raise RuntimeError(f"telemetri reddedildi: {resp.status_code} {resp.text}")
+        time.sleep(0.02)
+    return saat, telemetri
+
+
+def kilitlenme_yagmuru(url, dur):
+    oturum = requests.Session()
+    while not dur.is_set():
+        now = datetime.now()
+        oturum.post(f"{url}/api/kilitlenme_bilgisi", timeout=30, json={
+            "kilitlenmeBitisZamani": {"saat": now.hour, "dakika": now.minute,
+                                      "saniye": now.second, "milisaniye": now.microsecond // 1000},
+            "otonom_kilitlenme": 1,
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gecikme-ms", type=float, default=300)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--telemetri-sayisi", type=int, default=8)
+    parser.add_argument("--yukleyici-sayisi", type=int, default=4)
+    args = parser.parse_args()
+
+    server = sunucuyu_baslat(args.port, args.gecikme_ms / 1000)
+    url = f"http://127.0.0.1:{args.port}"
+    for kadi, sifre in (("takim1", "s1"), ("takim2", "s2")):
+        requests.post(f"{url}/api/giris", json={"kadi": kadi, "sifre": sifre}, timeout=10).raise_for_status()
+
+    temel_saat, temel_telemetri = olc(url, args.telemetri_sayisi)
+
+    dur = threading.Event()
+    yukleyiciler = [threading.Thread(target=kilitlenme_yagmuru, args=(url, dur), daemon=True)
+                    for _ in range(args.yukleyici_sayisi)]
+    for t in yukleyiciler:
+        t.start()
+    time.sleep(args.gecikme_ms / 1000)  # Yükleyicilerin commit'e girmesini bekle
+    yuklu_saat, yuklu_telemetri = olc(url, args.telemetri_sayisi)
+    dur.set()
+    for t in yukleyiciler:
+        t.join()
+
+    sinir_ms = args.gecikme_ms / 2
+    sonuc = {}
+    basarili = True
+    for ad, temel, yuklu in (("sunucusaati", temel_saat, yuklu_saat),
+                             ("telemetri_gonder", temel_telemetri, yuklu_telemetri)):
+        artis = yuzdelik(yuklu, 0.95) - yuzdelik(temel, 0.95)
+        sonuc[ad] = {"temel_p95_ms": round(yuzdelik(temel, 0.95), 2),
+                     "yuklu_p95_ms": round(yuzdelik(yuklu, 0.95), 2),
+                     "artis_ms": round(artis, 2)}
+        basarili = basarili and artis < sinir_ms
+    sonuc["commit_gecikmesi_ms"] = args.gecikme_ms
+    sonuc["basarili"] = basarili
+    print(json.dumps(sonuc, indent=4))
+
+    server.should_exit = True
+    sys.exit(0 if basarili else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Hakem sunucusu için yük üretme ve gecikme ölçüm betiği.
+
+N takımlık bir teams.json üretir, referee_server.py'yi geçici bir dizinde
+başlatır, her takımı CompetitorClient ile (kendi loopback IP'sinden) giriş
+yaptırıp 1-2 Hz telemetri gönderir; belirtilen hızda kilitlenme ve kamikaze
+paketleri atar. Sonunda uç nokta başına throughput, p50/p95/p99 gecikme,
+400 (hız sınırı) sayısı ve DB büyümesi makine tarafından okunabilir JSON
+olarak yazılır.
+
+Kullanım:
+    python bench/yuk_testi.py --takim-sayisi 50 --hz 2 --sure-s 30 --cikti sonuc.json
+    python bench/yuk_testi.py --url http://127.0.0.1:8000 ...   # çalışan sunucuya karşı
+    python bench/yuk_testi.py --isci 4 ...                      # çoklu worker modu
+"""
+import argparse
+import collections
+import contextlib
+import http.client
+import io
+import json
+import random
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+
+from olcum import ISTEMCI_DIZINI, SunucuSureci, gecikme_ozeti, kaynak_ip, takim_listesi_olustur
+
+sys.path.insert(0, ISTEMCI_DIZINI)
+from competitor_client import CompetitorClient
+
+
+class OlcumluIstemci(CompetitorClient):
+    """
+    CompetitorClient'ın API'sini korur; istekleri kalıcı bir http.client
+    bağlantısı üzerinden belirli bir kaynak IP'den gönderir ve her isteğin
+    uç noktasını, durum kodunu ve süresini kaydeder.
+    """
+
+    def __init__(self, base_url, username, password, kaynak_adres):
+        super().__init__(base_url=base_url, username=username, password=password)
+        parca = urllib.parse.urlsplit(base_url)
+        self._adres = (parca.hostname, parca.port or 80)
+        self._kaynak_adres = kaynak_adres
+        self._conn = None
+        self.kayitlar = []  # [(endpoint, durum, sure_ms, govde)]
+
+    def _send_request(self, endpoint, method="GET", data=None, raw_body=None):
+        if raw_body is not None:
+            govde, basliklar = raw_body, {"Content-Type": "application/octet-stream"}
+        else:
+            govde, basliklar = (json.dumps(data).encode("utf-8") if data else None), self.headers
+        t0 = time.perf_counter()
+        for _ in range(2):
+            yeniden_kullanilan = self._conn is not None
+            bayat = False
+            try:
+                if not yeniden_kullanilan:
+                    self._conn = http.client.HTTPConnection(
+                        *self._adres, timeout=10,
+                        source_address=(self._kaynak_adres, 0) if self._kaynak_adres else None)
+                try:
+                    self._conn.request(method, endpoint, body=govde, headers=basliklar)
+                except (BrokenPipeError, ConnectionResetError):
+                    bayat = True
+                    raise
+                try:
+                    resp = self._conn.getresponse()
+                except http.client.RemoteDisconnected:
+                    bayat = True
+                    raise
+                ham = resp.read()
+                durum = resp.status
+                break
+            except (OSError, http.client.HTTPException):
+                if self._conn is not None:
+                    self._conn.close()
+                self._conn = None
+                durum, ham = 0, b""
+                # Sunucu boşta kalan keep-alive bağlantısını isteği okumadan kapatmış olabilir:
+                # yalnızca o durumda bir kez yeniden dene. Zaman aşımında istek işlenmiş olabilir.
+                if not (yeniden_kullanilan and bayat):
+                    break
+        sure_ms = (time.perf_counter() - t0) * 1000
+        try:
+            cevap = json.loads(ham) if ham else None
+        except ValueError:
+            cevap = None
+        self.kayitlar.append((endpoint, durum, sure_ms, cevap))
+        return durum, cevap
+
+
+def takim_dongusu(istemci, hz, bitis, dur):
+    """Mutlak zaman çizelgesiyle hz frekansında telemetri gönderir."""
+    periyot = 1.0 / hz
+    # Takımların aynı anda göndermemesi için rastgele faz
+    sonraki = time.monotonic() + random.uniform(0, periyot)
+    enlem, boylam, irtifa, yon = 41.51 + random.uniform(-0.01, 0.01), 36.12 + random.uniform(-0.01, 0.01), 40.0, 0.0
+    while not dur.is_set():
+        bekle = sonraki - time.monotonic()
+        if bekle > 0:
+            time.sleep(bekle)
+        if time.monotonic() >= bitis:
+            break
+        sonraki += periyot
+        enlem += random.uniform(-0.0001, 0.0001)
+        boylam += random.uniform(-0.0001, 0.0001)
+        yon = (yon + random.uniform(-2, 2)) % 360
+        istemci.send_telemetry(enlem, boylam, irtifa, random.uniform(-5, 5), yon,
+                               random.uniform(-10, 10), 15.0, 90.0, 1, 0)
+
+
+def olay_dongusu(olay_istemcileri, kilitlenme_hizi, kamikaze_hizi, bitis, dur):
+    """Toplam hızı verilen Poisson süreçleriyle kilitlenme/kamikaze paketi atar."""
+    toplam_hiz = kilitlenme_hizi + kamikaze_hizi
+    if toplam_hiz <= 0:
+        return
+    while not dur.is_set() and time.monotonic() < bitis:
+        time.sleep(random.expovariate(toplam_hiz))
+        istemci = random.choice(olay_istemcileri)
+        now = datetime.now()
+        if random.random() < kilitlenme_hizi / toplam_hiz:
+            istemci.send_lock_info(now, True)
+        else:
+            istemci.send_kamikaze_info(now - timedelta(seconds=5), now, "teknofest2025")
+
+
+def tablo_sayilari(db_yolu):
+    conn = sqlite3.connect(db_yolu)
+    try:
+        return {tablo: conn.execute(f"SELECT COUNT(*) FROM {tablo}").fetchone()[0]
+                for tablo in ("telemetri", "kilitlenmeler", "kamikaze")}
+    finally:
+        conn.close()
+
+
+def rapor_olustur(istemciler, sure_s):
+    uc_noktalar = collections.defaultdict(list)
+    durumlar = collections.defaultdict(collections.Counter)
+    hiz_siniri = 0
+    for istemci in istemciler:
+        for endpoint, durum, sure_ms, cevap in istemci.kayitlar:
+            uc_noktalar[endpoint].append(sure_ms)
+            durumlar[endpoint][durum] += 1
+            if endpoint == "/api/telemetri_gonder" and durum == 400 and cevap == 3:
+                hiz_siniri += 1
+    rapor = {}
+    for endpoint, sureler in sorted(uc_noktalar.items()):
+        basarili = durumlar[endpoint].get(200, 0)
+        rapor[endpoint] = dict(gecikme_ozeti(sureler),
+                               throughput_rps=round(basarili / sure_s, 2),
+                               durum_kodlari={str(k): v for k, v in sorted(durumlar[endpoint].items())})
+    return rapor, hiz_siniri
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--takim-sayisi", type=int, default=20)
+    parser.add_argument("--hz", type=float, default=1.0, help="Takım başına telemetri frekansı (1-2)")
+    parser.add_argument("--sure-s", type=float, default=20.0)
+    parser.add_argument("--kilitlenme-hizi", type=float, default=0.5, help="Saniyede toplam kilitlenme paketi")
+    parser.add_argument("--kamikaze-hizi", type=float, default=0.1, help="Saniyede toplam kamikaze paketi")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--url", help="Yeni sunucu başlatmak yerine çalışan sunucuyu hedefle")
+    parser.add_argument("--isci", type=int, default=1,
+                        help="Başlatılan sunucunun uvicorn worker sayısı (>1 ise paylaşılan durum deposuyla)")
+    parser.add_argument("--tek-ip", action="store_true",
+                        help="Tüm takımlar aynı IP'den bağlansın (Linux dışı sistemler için)")
+    parser.add_argument("--cikti", help="JSON sonucun ayrıca yazılacağı dosya")
+    args = parser.parse_args()
+
+    takimlar = takim_listesi_olustur(args.takim_sayisi)
+    sunucu = None
+    if args.url:
+        url = args.url
+    else:
+        ortam, uvicorn_argumanlari = None, ()
+        if args.isci > 1:
+            ortam = {"PAYLASIMLI_DURUM_DB": "paylasimli_durum.db"}
+            uvicorn_argumanlari = ("--workers", str(args.isci))
+        sunucu = SunucuSureci(takimlar, args.port, ortam=ortam, uvicorn_argumanlari=uvicorn_argumanlari).baslat()
+        url = sunucu.url
+        db_ilk_boyut = sunucu.db_boyutu()
+
+    istemciler, olay_istemcileri = [], []
+    for sira, takim in enumerate(takimlar):
+        ip = None if args.tek_ip else kaynak_ip(sira)
+        istemciler.append(OlcumluIstemci(url, takim["kadi"], takim["sifre"], ip))
+        # Olay paketleri telemetri bağlantısını beklemesin diye ayrı bağlantı
+        olay_istemcileri.append(OlcumluIstemci(url, takim["kadi"], takim["sifre"], ip))
+
+    dur = threading.Event()
+    # CompetitorClient her paketi konsola basar; ölçüm boyunca çıktıyı yut
+    with contextlib.redirect_stdout(io.StringIO()):
+        for istemci, olay_istemcisi in zip(istemciler, olay_istemcileri):
+            istemci.login()
+            olay_istemcisi.takim_no = istemci.takim_no
+
+        baslangic = time.monotonic()
+        bitis = baslangic + args.sure_s
+        threadler = [threading.Thread(target=takim_dongusu, args=(i, args.hz, bitis, dur), daemon=True)
+                     for i in istemciler if i.takim_no is not None]
+        threadler.append(threading.Thread(
+            target=olay_dongusu, daemon=True,
+            args=([i for i in olay_istemcileri if i.takim_no is not None],
+                  args.kilitlenme_hizi, args.kamikaze_hizi, bitis, dur)))
+        for t in threadler:
+            t.start()
+        try:
+            for t in threadler:
+                t.join()
+        except KeyboardInterrupt:
+            dur.set()
+        gercek_sure = time.monotonic() - baslangic
+
+    uc_noktalar, hiz_siniri = rapor_olustur(istemciler + olay_istemcileri, gercek_sure)
+    sonuc = {
+        "ayarlar": {"takim_sayisi": args.takim_sayisi, "hz": args.hz, "isci": args.isci,
+                    "sure_s": round(gercek_sure, 2),
+                    "kilitlenme_hizi": args.kilitlenme_hizi, "kamikaze_hizi": args.kamikaze_hizi,
+                    "giris_basarili": sum(1 for i in istemciler if i.takim_no is not None)},
+        "uc_noktalar": uc_noktalar,
+        "hiz_siniri_400": hiz_siniri,
+    }
+    if sunucu is not None:
+        sunucu.durdur()
+        db_son_boyut = sunucu.db_boyutu()
+        satirlar = tablo_sayilari(sunucu.db_yolu)
+        sonuc["veritabani"] = {
+            "ilk_boyut_byte": db_ilk_boyut,
+            "son_boyut_byte": db_son_boyut,
+            "buyume_byte": db_son_boyut - db_ilk_boyut,
+            "buyume_byte_s": round((db_son_boyut - db_ilk_boyut) / gercek_sure, 1),
+            "satirlar": satirlar,
+            "dizin": sunucu.dizin,
+        }
+
+    metin = json.dumps(sonuc, indent=4, ensure_ascii=False)
+    if args.cikti:
+        with open(args.cikti, "w") as f:
+            f.write(metin)
+    print(metin)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,28 @@
 import asyncio
-import requests
 import json
 import random
 import math
+import time
 from datetime import datetime, timedelta
 from fastapi import FastAPI
 from pydantic import BaseModel
 import uvicorn
+import websockets
+
+from saat_senkronu import SaatKestirici, saat_takip_dongusu
+from tasima import Tasima, Zamanlayici, ulasmis_olabilir
+from telemetri_gunlugu import ZAMAN_ASIMI, TelemetriGunlugu, simdi_ms
 
 # --- AYARLAR ---
 SERVER_URL = "http://localhost:8000"
+SERVER_WS_URL = "ws://localhost:8000/api/telemetri_akisi"
+AKIS_MODU = False                     # True: telemetri tek bir WebSocket bağlantısından akar
 BRIDGE_PORT = 8001                    # 2. Takım için bunu 8002 yapın
 TAKIM_KADI = "rota_takim"             # 2. Takım için "rota_takim2" yapın [cite: 52]
 TAKIM_SIFRE = "parola123"             # [cite: 54]
+TELEMETRI_HZ = 1.0                    # 1-2 Hz; sunucunun 490 ms kuralına göre ayarlanır (bkz. tasima.py)
+TELEMETRI_GUNLUGU = f"telemetri_gunlugu_{BRIDGE_PORT}.db"  # Her paket ve cevabı buraya eklenir (None: kapalı)
+SAAT_ORNEK_ARALIGI_S = 2.0            # /api/sunucusaati örnekleme aralığı (bkz. saat_senkronu.py)
 
 # --- VERİ MODELLERİ ---
 class IhaVerisi(BaseModel):
@@ -42,6 +52,13 @@ class KilitlenmeIstegi(BaseModel):
 current_state = IhaVerisi()
 latest_rival_data = []
 session_info = {"takim_no": None, "logged_in": False}
+# Sunucuya tek kalıcı bağlantı havuzu ve mutlak zamanlı telemetri çizelgesi
+tasima = Tasima(SERVER_URL)
+zamanlayici = Zamanlayici(TELEMETRI_HZ)
+# Sunucu saatine göre ofset/RTT; gps_saati ve olay zamanları sunucu saatiyle damgalanır
+saat = SaatKestirici()
+# Yerel paket günlüğü (bkz. telemetri_gunlugu.py)
+gunluk = TelemetriGunlugu(TELEMETRI_GUNLUGU) if TELEMETRI_GUNLUGU else None
 
 app = FastAPI(title="Teknofest Simülasyon Client")
 
@@ -56,12 +73,12 @@ def zaman_objesi_olustur(dt_obj):
         "milisaniye": int(dt_obj.microsecond / 1000)
     }
 
-def sunucuya_giris_yap():
+async def sunucuya_giris_yap():
     """Döküman Bölüm 5: Oturum Açma"""
     print("🔑 Yarışma sunucusuna giriş deneniyor...")
     try:
         payload = {"kadi": TAKIM_KADI, "sifre": TAKIM_SIFRE}
-        response = requests.post(f"{SERVER_URL}/api/giris", json=payload, timeout=2)
+        response = await tasima.post("/api/giris", json=payload)
         
         if response.status_code == 200:
             takim_no = response.json()
@@ -108,45 +125,75 @@ def rastgele_hareket_uret():
         current_state.hedef_merkez_Y = 0
         current_state.hedef_genislik = 0
         current_state.hedef_yukseklik = 0
-def paket_hazirla_ve_gonder():
-    """Döküman Bölüm 7: Telemetri Gönderimi"""
-    if not session_info["logged_in"]:
-        return
-
+def paket_hazirla():
+    """Döküman Bölüm 7: Telemetri paketini hazırlar."""
     # 1. Verileri güncelle (Rastgele hareket)
     rastgele_hareket_uret()
 
-    now = datetime.now()
+    now = saat.simdi()
     
     # 2. Payload Hazırla
     # Pydantic v2 için model_dump(), v1 için dict()
     payload = current_state.model_dump() 
     payload["takim_numarasi"] = session_info["takim_no"]
     payload["gps_saati"] = zaman_objesi_olustur(now)
+    return payload, now
+
+def cevabi_isle(data, now):
+    """Sunucunun telemetri cevabını (rakip konumları) işler."""
+    # --- TERMİNAL ÇIKTISI (Şelale Görünümü) ---
+    print("\n" + "-"*50)
+    print(f"📡 [TELEMETRİ] Gönderildi | Saat: {now.strftime('%H:%M:%S')}")
+    print(f"   Benim Konum: {current_state.iha_enlem:.6f}, {current_state.iha_boylam:.6f}")
+    print(f"📥 [CEVAP] Sunucudan Gelen Rakipler:")
+    print(json.dumps(data, indent=4, ensure_ascii=False))
+    print("-"*50)
+    # ------------------------------------------
+
+    global latest_rival_data
+    latest_rival_data = data.get("konumBilgileri", [])
+
+async def paket_hazirla_ve_gonder():
+    """Döküman Bölüm 7: Telemetri Gönderimi"""
+    if not session_info["logged_in"]:
+        return
+
+    payload, now = paket_hazirla()
+    await paket_gonder(simdi_ms(), payload, now=now)
 
+async def paket_gonder(olusturma_ms, payload, now=None):
+    """
+    Paketi gönderir ve sonucunu günlüğe yazar. Gönderilemeyen paket canlı uca
+    tekrar gönderilmez; bir sonraki gönderim zaten daha güncel durumu taşır.
+    """
+    durum, govde = 0, None
+    baslangic = time.perf_counter()
     try:
-        resp = requests.post(f"{SERVER_URL}/api/telemetri_gonder", json=payload, timeout=0.5)
+        resp = await tasima.post("/api/telemetri_gonder", json=payload, zaman_asimi_s=0.5)
+        durum, govde = resp.status_code, resp.content
         
         if resp.status_code == 200:
-            data = resp.json()
-            
-            # --- TERMİNAL ÇIKTISI (Şelale Görünümü) ---
-            print("\n" + "-"*50)
-            print(f"📡 [TELEMETRİ] Gönderildi | Saat: {now.strftime('%H:%M:%S')}")
-            print(f"   Benim Konum: {current_state.iha_enlem:.6f}, {current_state.iha_boylam:.6f}")
-            print(f"📥 [CEVAP] Sunucudan Gelen Rakipler:")
-            print(json.dumps(data, indent=4, ensure_ascii=False))
-            print("-"*50)
-            # ------------------------------------------
-
-            global latest_rival_data
-            latest_rival_data = data.get("konumBilgileri", [])
+            cevabi_isle(resp.json(), now or datetime.now())
             
         elif resp.status_code == 400:
             print("⚠️ Sunucu: 400 (Hız Sınırı veya Veri Hatası)")
+            if resp.json() == 3:
+                # Hız sınırına takıldı: zamanlayıcı güvenlik payını büyütür
+                zamanlayici.red_bildir()
+
+        elif resp.status_code == 401:
+            # Sunucu yeniden başlamış olabilir; oturumu tazele
+            print("⚠️ Sunucu: 401 (Oturum yok), yeniden giriş yapılıyor")
+            await sunucuya_giris_yap()
             
     except Exception as e:
         print(f"❌ Telemetri Hatası: {e}")
+        if ulasmis_olabilir(e):
+            durum = ZAMAN_ASIMI
+    finally:
+        zamanlayici.tamamlandi()
+        if gunluk is not None:
+            gunluk.kaydet(olusturma_ms, payload, durum, (time.perf_counter() - baslangic) * 1000, govde)
 
 # --- API ENDPOINTLERİ (Tetikleyiciler) ---
 
@@ -158,7 +205,7 @@ async def kamikaze_tetikle(istek: KamikazeIstegi):
     print("\n" + "!"*40)
     print("🚀 [KAMIKAZE] Simülasyon Başlatıldı...")
     
-    now = datetime.now()
+    now = saat.simdi()
     baslangic = zaman_objesi_olustur(now)
     # Kamikaze 5 saniye sürmüş gibi bitiş zamanı ayarla
     bitis = zaman_objesi_olustur(now + timedelta(seconds=5))
@@ -170,7 +217,7 @@ async def kamikaze_tetikle(istek: KamikazeIstegi):
     }
 
     try:
-        resp = requests.post(f"{SERVER_URL}/api/kamikaze_bilgisi", json=payload, timeout=2)
+        resp = await tasima.post("/api/kamikaze_bilgisi", json=payload)
         print(f"📤 Gönderilen Metin: {istek.qr_metni}")
         
         if resp.status_code == 200:
@@ -192,7 +239,7 @@ async def kilitlenme_tetikle(istek: KilitlenmeIstegi):
     print("\n" + "*"*40)
     print("🎯 [KİLİTLENME] Simülasyon Başlatıldı...")
     
-    now = datetime.now()
+    now = saat.simdi()
     bitis = zaman_objesi_olustur(now)
 
     payload = {
@@ -201,7 +248,7 @@ async def kilitlenme_tetikle(istek: KilitlenmeIstegi):
     }
 
     try:
-        resp = requests.post(f"{SERVER_URL}/api/kilitlenme_bilgisi", json=payload, timeout=2)
+        resp = await tasima.post("/api/kilitlenme_bilgisi", json=payload)
         
         if resp.status_code == 200:
             print("✅ [BAŞARILI] Kilitlenme sunucuya işlendi.")
@@ -215,23 +262,89 @@ async def kilitlenme_tetikle(istek: KilitlenmeIstegi):
         return {"durum": "Bağlantı Hatası"}
 
 # --- ARKAPLAN DÖNGÜSÜ ---
+async def akis_cevaplarini_oku(ws):
+    """WebSocket'ten gelen cevapları ve sunucunun ittiği konum yayınlarını işler."""
+    global latest_rival_data
+    async for mesaj in ws:
+        cevap = json.loads(mesaj)
+        if not cevap.get("yayin"):
+            # Son gönderilen paketin cevabı (cevaplar paket sırasıyla gelir)
+            zamanlayici.tamamlandi()
+        if cevap["kod"] == 200:
+            if cevap.get("yayin"):
+                # Sunucu itmesi: sadece rakip verisini tazele, terminali doldurma
+                latest_rival_data = cevap["icerik"].get("konumBilgileri", [])
+            else:
+                cevabi_isle(cevap["icerik"], datetime.now())
+        elif cevap["kod"] == 400:
+            print("⚠️ Sunucu: 400 (Hız Sınırı veya Veri Hatası)")
+            if cevap["icerik"] == 3:
+                # Hız sınırına takıldı: zamanlayıcı güvenlik payını büyütür
+                zamanlayici.red_bildir()
+        else:
+            print(f"❌ [HATA] Kod: {cevap['kod']} {cevap['icerik']}")
+
+async def telemetri_akis_dongusu():
+    """AKIS_MODU: her pakette yeni HTTP isteği yerine tek kalıcı WebSocket kullanılır."""
+    while True:
+        try:
+            async with websockets.connect(SERVER_WS_URL) as ws:
+                print(f"📡 Telemetri akışı WebSocket üzerinden başlatıldı ({TELEMETRI_HZ:g} Hz)...")
+                okuyucu = asyncio.create_task(akis_cevaplarini_oku(ws))
+                try:
+                    while not okuyucu.done():
+                        await zamanlayici.bekle()
+                        payload, _ = paket_hazirla()
+                        # RTT, cevap okununca (akis_cevaplarini_oku) kaydedilir
+                        await ws.send(json.dumps(payload))
+                        if gunluk is not None:
+                            # Akışta cevap ayrı gelir; durum NULL kaydedilir
+                            gunluk.kaydet(simdi_ms(), payload, None)
+                finally:
+                    okuyucu.cancel()
+        except Exception as e:
+            print(f"❌ Akış bağlantısı koptu: {e}")
+        # Sunucu yeniden başlamış olabilir; oturumu tazeleyip tekrar bağlan
+        await asyncio.sleep(2)
+        await sunucuya_giris_yap()
+
 async def telemetri_dongusu():
     while not session_info["logged_in"]:
-        sunucuya_giris_yap()
+        await sunucuya_giris_yap()
         await asyncio.sleep(2)
-    
-    print("📡 Telemetri akışı başlatıldı (1 Hz)...")
+
+    if AKIS_MODU:
+        await telemetri_akis_dongusu()
+        return
+
+    print(f"📡 Telemetri akışı başlatıldı ({TELEMETRI_HZ:g} Hz)...")
     while True:
-        await asyncio.to_thread(paket_hazirla_ve_gonder)
-        await asyncio.sleep(1.0) # 1 Hz kuralı
+        # Çizelge mutlak: gönderim süresi periyoda eklenmez
+        await zamanlayici.bekle()
+        await paket_hazirla_ve_gonder()
 
 @app.on_event("startup")
 async def startup_event():
+    if gunluk is not None:
+        gunluk.baslat()
     asyncio.create_task(telemetri_dongusu())
+    asyncio.create_task(saat_takip_dongusu(tasima, saat, SAAT_ORNEK_ARALIGI_S))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await tasima.kapat()
+    if gunluk is not None:
+        gunluk.durdur()
+
+@app.get("/telemetri/istatistik")
+async def telemetri_istatistik():
+    """Gönderim sapması/aralığı (zamanlayıcı), sunucu RTT ve saat ofseti istatistikleri (ms)."""
+    return {"zamanlayici": zamanlayici.ozet(), "rtt_ms": tasima.rtt.ozet(), "baglanti_hatasi": tasima.hata_sayisi,
+            "saat": saat.ozet(), "gunluk_atilan": gunluk.atilan if gunluk is not None else None}
 
 # ... diğer kodların altına ...
 
-def qr_hedefini_ogren():
+async def qr_hedefini_ogren():
     """
     Sunucudan Kamikaze yapılacak hedefin (QR Kodun) koordinatlarını çeker.
     Döküman Bölüm 10 referans alınmıştır.
@@ -245,7 +358,7 @@ def qr_hedefini_ogren():
 
     try:
         # GET isteği ile koordinatları al 
-        resp = requests.get(f"{SERVER_URL}/api/qr_koordinati", timeout=2)
+        resp = await tasima.get("/api/qr_koordinati")
         
         if resp.status_code == 200:
             data = resp.json()
@@ -271,11 +384,11 @@ def qr_hedefini_ogren():
 # --- API Tetikleyici (Manuel Test İçin) ---
 @app.get("/kamikaze/hedef_getir")
 async def hedef_getir_api():
-    koordinat = qr_hedefini_ogren()
+    koordinat = await qr_hedefini_ogren()
     if koordinat:
         return {"durum": "Hedef Alındı", "enlem": koordinat[0], "boylam": koordinat[1]}
     return {"durum": "Hata"}
-def hss_verilerini_guncelle():
+async def hss_verilerini_guncelle():
     """
     Sunucudan Hava Savunma Sistemi (Yasak Bölge) koordinatlarını çeker.
     Döküman Bölüm 11 [cite: 217-226].
@@ -283,7 +396,7 @@ def hss_verilerini_guncelle():
     if not session_info["logged_in"]: return
 
     try:
-        resp = requests.get(f"{SERVER_URL}/api/hss_koordinatlari", timeout=2)
+        resp = await tasima.get("/api/hss_koordinatlari")
         if resp.status_code == 200:
             data = resp.json()
             hss_listesi = data.get("hss_koordinat_bilgileri", [])
@@ -1,16 +1,29 @@
 import asyncio
-import requests
 import json
+import time
 from datetime import datetime
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import uvicorn
+import websockets
+
+from paylasimli_bellek import BellekYayinci, bellek_yolu
+from rakip_takibi import RakipTakipcisi
+from saat_senkronu import SaatKestirici, saat_takip_dongusu
+from tasima import Tasima, Zamanlayici, ulasmis_olabilir
+from telemetri_gunlugu import ZAMAN_ASIMI, TelemetriGunlugu, simdi_ms
 
 # --- AYARLAR ---
 SERVER_URL = "http://localhost:8000"
+SERVER_WS_URL = "ws://localhost:8000/api/telemetri_akisi"
+AKIS_MODU = False                     # True: telemetri tek bir WebSocket bağlantısından akar
 BRIDGE_PORT = 8002                    # Bu scriptin çalışacağı port
 TAKIM_KADI = "rota_takim2"             # [cite: 52]
 TAKIM_SIFRE = "parola123"             # [cite: 54]
+TELEMETRI_HZ = 1.0                    # 1-2 Hz; sunucunun 490 ms kuralına göre ayarlanır (bkz. tasima.py)
+TELEMETRI_GUNLUGU = f"telemetri_gunlugu_{BRIDGE_PORT}.db"  # Her paket ve cevabı buraya eklenir (None: kapalı)
+SAAT_ORNEK_ARALIGI_S = 2.0            # /api/sunucusaati örnekleme aralığı (bkz. saat_senkronu.py)
+PAYLASIMLI_BELLEK = True              # Durum ve rakipler aynı makinedeki process'lere paylaşılan bellekten de yayınlanır
 
 # --- VERİ MODELLERİ ---
 class IhaVerisi(BaseModel):
@@ -38,19 +51,42 @@ class IhaVerisi(BaseModel):
 current_state = IhaVerisi()
 # Sunucudan gelen rakip verileri burada tutulur.
 latest_rival_data = []
+# Rakiplerin fix geçmişi ve anlık konum tahmini (zaman_farki telafisi)
+takipci = RakipTakipcisi()
 # Oturum bilgisi
 session_info = {"token": None, "takim_no": None, "logged_in": False}
+# Sunucuya tek kalıcı bağlantı havuzu ve mutlak zamanlı telemetri çizelgesi
+tasima = Tasima(SERVER_URL)
+zamanlayici = Zamanlayici(TELEMETRI_HZ)
+# Sunucu saatine göre ofset/RTT; gps_saati ve olay zamanları sunucu saatiyle damgalanır
+saat = SaatKestirici()
+# Yerel paket günlüğü (bkz. telemetri_gunlugu.py)
+gunluk = TelemetriGunlugu(TELEMETRI_GUNLUGU) if TELEMETRI_GUNLUGU else None
+# Otopilot / görüntü işleme için paylaşılan bellek bloğu (bkz. paylasimli_bellek.py)
+yayinci = None
 
 app = FastAPI(title="Teknofest No-ROS Bridge")
 
 # --- YARDIMCI FONKSİYONLAR ---
 
-def sunucuya_giris_yap():
+def bellege_yayinla():
+    """Güncel durumu ve rakip listesini paylaşılan bellek bloğuna yazar."""
+    if yayinci is not None:
+        yayinci.yayinla(session_info["takim_no"], current_state.model_dump(), latest_rival_data)
+
+def rakipleri_guncelle(konum_bilgileri):
+    """Sunucudan gelen konumBilgileri'ni saklar, takipçiye işler ve yayınlar."""
+    global latest_rival_data
+    latest_rival_data = konum_bilgileri
+    takipci.guncelle(konum_bilgileri)
+    bellege_yayinla()
+
+async def sunucuya_giris_yap():
     """Döküman Bölüm 5: Oturum Açma"""
     print("Yarışma sunucusuna giriş deneniyor...")
     try:
         payload = {"kadi": TAKIM_KADI, "sifre": TAKIM_SIFRE} # [cite: 51-55]
-        response = requests.post(f"{SERVER_URL}/api/giris", json=payload, timeout=2)
+        response = await tasima.post("/api/giris", json=payload)
         
         if response.status_code == 200:
             takim_no = response.json() # [cite: 56]
@@ -65,13 +101,10 @@ def sunucuya_giris_yap():
         print(f"Sunucuya bağlanılamadı: {e}")
         return False
 
-def paket_hazirla_ve_gonder():
-    """Döküman Bölüm 7: Telemetri Gönderimi"""
-    if not session_info["logged_in"]:
-        return
-
-    # Şu anki zamanı al (GPS saati simülasyonu için)
-    now = datetime.now()
+def paket_hazirla():
+    """Döküman Bölüm 7: Telemetri paketini hazırlar."""
+    # Şu anki zamanı al (GPS saati simülasyonu için; sunucu saatine göre)
+    now = saat.simdi()
     
     # Döküman formatına uygun JSON oluştur [cite: 99-122]
     # Pydantic modelini dict'e çevirip üzerine zaman ve takım no ekliyoruz.
@@ -85,45 +118,140 @@ def paket_hazirla_ve_gonder():
         "saniye": now.second,
         "milisaniye": int(now.microsecond / 1000)
     }
+    return payload
+
+async def paket_hazirla_ve_gonder():
+    """Döküman Bölüm 7: Telemetri Gönderimi"""
+    if not session_info["logged_in"]:
+        return
+
+    await paket_gonder(simdi_ms(), paket_hazirla())
 
+async def paket_gonder(olusturma_ms, payload):
+    """
+    Paketi gönderir ve sonucunu günlüğe yazar. Gönderilemeyen paket canlı uca
+    tekrar gönderilmez; bir sonraki gönderim zaten daha güncel durumu taşır.
+    """
+    durum, govde = 0, None
+    baslangic = time.perf_counter()
     try:
         # POST İsteği [cite: 74]
-        resp = requests.post(f"{SERVER_URL}/api/telemetri_gonder", json=payload, timeout=0.5)
+        resp = await tasima.post("/api/telemetri_gonder", json=payload, zaman_asimi_s=0.5)
+        durum, govde = resp.status_code, resp.content
         
         if resp.status_code == 200:
             # Başarılı ise rakip verilerini kaydet [cite: 75, 132]
-            global latest_rival_data
             data = resp.json()
-            latest_rival_data = data.get("konumBilgileri", [])
+            rakipleri_guncelle(data.get("konumBilgileri", []))
             # print(f"Telemetri gitti. {len(latest_rival_data)} rakip verisi alındı.")
             
         elif resp.status_code == 400:
             # 2 Hz sınırı aşılırsa veya format hatalıysa [cite: 72]
             print("Sunucu Uyarısı: 400 (Hatalı İstek veya Hız Sınırı)")
+            if resp.json() == 3:
+                # Hız sınırına takıldı: zamanlayıcı güvenlik payını büyütür
+                zamanlayici.red_bildir()
+
+        elif resp.status_code == 401:
+            # Sunucu yeniden başlamış olabilir; oturumu tazele
+            print("Sunucu Uyarısı: 401 (Oturum yok), yeniden giriş yapılıyor")
+            await sunucuya_giris_yap()
             
     except Exception as e:
         print(f"Gönderim hatası: {e}")
+        if ulasmis_olabilir(e):
+            durum = ZAMAN_ASIMI
+    finally:
+        zamanlayici.tamamlandi()
+        if gunluk is not None:
+            gunluk.kaydet(olusturma_ms, payload, durum, (time.perf_counter() - baslangic) * 1000, govde)
 
 # --- ARKAPLAN DÖNGÜSÜ ---
+async def akis_cevaplarini_oku(ws):
+    """
+    WebSocket'ten gelen cevapları ve sunucunun ittiği konum yayınlarını işler.
+    Her ikisi de {"kod": ..., "icerik": ...} biçimindedir; 200 ise içerik
+    telemetri_gonder cevabıyla aynıdır.
+    """
+    async for mesaj in ws:
+        cevap = json.loads(mesaj)
+        if not cevap.get("yayin"):
+            # Son gönderilen paketin cevabı (cevaplar paket sırasıyla gelir)
+            zamanlayici.tamamlandi()
+        if cevap["kod"] == 200:
+            rakipleri_guncelle(cevap["icerik"].get("konumBilgileri", []))
+        elif cevap["kod"] == 400:
+            print("Sunucu Uyarısı: 400 (Hatalı İstek veya Hız Sınırı)")
+            if cevap["icerik"] == 3:
+                # Hız sınırına takıldı: zamanlayıcı güvenlik payını büyütür
+                zamanlayici.red_bildir()
+        else:
+            print(f"Akış hatası: {cevap['kod']} {cevap['icerik']}")
+
+async def telemetri_akis_dongusu():
+    """
+    AKIS_MODU: paketler tek bir kalıcı WebSocket'ten gider, rakip konumları
+    sunucu tarafından itilir. Giriş (IP eşleştirmesi) yine HTTP ile yapılır.
+    """
+    while True:
+        try:
+            async with websockets.connect(SERVER_WS_URL) as ws:
+                print(f"Telemetri akışı WebSocket üzerinden başlatıldı ({TELEMETRI_HZ:g} Hz)...")
+                okuyucu = asyncio.create_task(akis_cevaplarini_oku(ws))
+                try:
+                    while not okuyucu.done():
+                        await zamanlayici.bekle()
+                        payload = paket_hazirla()
+                        # RTT, cevap okununca (akis_cevaplarini_oku) kaydedilir
+                        await ws.send(json.dumps(payload))
+                        if gunluk is not None:
+                            # Akışta cevap ayrı gelir; durum NULL kaydedilir
+                            gunluk.kaydet(simdi_ms(), payload, None)
+                finally:
+                    okuyucu.cancel()
+        except Exception as e:
+            print(f"Akış bağlantısı koptu: {e}")
+        # Sunucu yeniden başlamış olabilir; oturumu tazeleyip tekrar bağlan
+        await asyncio.sleep(2)
+        await sunucuya_giris_yap()
+
 async def telemetri_dongusu():
-    """Saniyede 1 kez veriyi sunucuya gönderir."""
+    """Saniyede TELEMETRI_HZ kez veriyi sunucuya gönderir."""
     # Başlangıçta giriş yapmayı dene
     while not session_info["logged_in"]:
-        sunucuya_giris_yap()
+        await sunucuya_giris_yap()
         await asyncio.sleep(2)
-    
-    print("Telemetri akışı başlatıldı (1 Hz)...")
+
+    if AKIS_MODU:
+        await telemetri_akis_dongusu()
+        return
+
+    print(f"Telemetri akışı başlatıldı ({TELEMETRI_HZ:g} Hz)...")
     
     while True:
-        # Senkron request işlemini bloklamadan çalıştır
-        await asyncio.to_thread(paket_hazirla_ve_gonder)
-        
-        # Döküman kuralı: En az 1 Hz, yani 1 saniyede 1 paket 
-        await asyncio.sleep(1.0)
+        # Döküman kuralı: En az 1 Hz. Çizelge mutlak: gönderim süresi periyoda eklenmez
+        await zamanlayici.bekle()
+        await paket_hazirla_ve_gonder()
 
 @app.on_event("startup")
 async def startup_event():
+    global yayinci
+    if PAYLASIMLI_BELLEK:
+        yayinci = BellekYayinci(bellek_yolu(BRIDGE_PORT))
+        bellege_yayinla()
+        print(f"Paylaşılan bellek: {yayinci.yol}")
+    if gunluk is not None:
+        gunluk.baslat()
     asyncio.create_task(telemetri_dongusu())
+    asyncio.create_task(saat_takip_dongusu(tasima, saat, SAAT_ORNEK_ARALIGI_S))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await tasima.kapat()
+    if yayinci is not None:
+        yayinci.kapat()
+    if gunluk is not None:
+        gunluk.durdur()
 
 # --- API ENDPOINTLERİ (Senin Kullanacağın Kısım) ---
 
@@ -135,6 +263,7 @@ async def iha_veri_guncelle(yeni_veri: IhaVerisi):
     """
     global current_state
     current_state = yeni_veri
+    bellege_yayinla()
     return {"durum": "Veri güncellendi", "yeni_veri": current_state}
 
 @app.get("/iha/durum")
@@ -150,6 +279,28 @@ async def rakipleri_getir():
     """
     return {"timestamp": datetime.now(), "rakipler": latest_rival_data}
 
+@app.get("/rakipler/tahmin")
+async def rakip_tahminleri(ileri_s: float = 0.0):
+    """
+    Tüm rakiplerin şimdiki (ileri_s verilirse o kadar saniye sonraki) tahmini
+    konumları. fix_yasi_s: tahminin dayandığı son gerçek konumun yaşı.
+    """
+    return {"timestamp": datetime.now(), "rakipler": takipci.tum_konumlar(time.monotonic() + ileri_s)}
+
+@app.get("/rakipler/{takim_numarasi}/tahmin")
+async def rakip_tahmini(takim_numarasi: int, ileri_s: float = 0.0):
+    """Tek rakibin tahmini konumu; ileri_s < 0 geçmişteki bir anı sorar."""
+    tahmin = takipci.konum(takim_numarasi, time.monotonic() + ileri_s)
+    if tahmin is None:
+        raise HTTPException(status_code=404, detail="Bu takımdan konum alınmadı")
+    return tahmin
+
+@app.get("/telemetri/istatistik")
+async def telemetri_istatistik():
+    """Gönderim sapması/aralığı (zamanlayıcı), sunucu RTT ve saat ofseti istatistikleri (ms)."""
+    return {"zamanlayici": zamanlayici.ozet(), "rtt_ms": tasima.rtt.ozet(), "baglanti_hatasi": tasima.hata_sayisi,
+            "saat": saat.ozet(), "gunluk_atilan": gunluk.atilan if gunluk is not None else None}
+
 if __name__ == "__main__":
     # Bridge API 8001 portunda çalışacak
     uvicorn.run(app, host="0.0.0.0", port=BRIDGE_PORT)
\ No newline at end of file
@@ -1,146 +1,319 @@
-import urllib.request
-import urllib.parse
+import asyncio
+import http.client
 import json
+import struct
 import time
-from datetime import datetime
+import urllib.parse
+
+from saat_senkronu import SaatKestirici
+
+# /api/telemetri_gonder_ikili paket düzeni (sunucuda server/telemetri_kaydi.py IKILI_PAKET ile aynı):
+# sürüm, takım no, enlem, boylam (double), irtifa, dikilme, yönelme, yatış, hız, batarya (float),
+# otonom, kilitlenme (uint8), hedef X, Y, genişlik, yükseklik (int16), saat, dakika, saniye (uint8), ms (uint16)
+TELEMETRI_IKILI_SURUM = 1
+TELEMETRI_IKILI_PAKET = struct.Struct("<BiddffffffBBhhhhBBBH")
+
+_BOS_HEDEF = {"hedef_merkez_X": 0, "hedef_merkez_Y": 0, "hedef_genislik": 0, "hedef_yukseklik": 0}
+
+
+def _fill_time(target, dt):
+    """Zaman sözlüğünü ({"saat", "dakika", "saniye", "milisaniye"}) yerinde doldurur."""
+    target["saat"] = dt.hour
+    target["dakika"] = dt.minute
+    target["saniye"] = dt.second
+    target["milisaniye"] = dt.microsecond // 1000
+    return target
+
+
+class _StaleConnection(Exception):
+    """Yeniden kullanılan bağlantı, cevabın ilk baytı gelmeden kapandı (istek işlenmedi)."""
+
+
+def _exchange(conn, method, endpoint, body, headers):
+    """
+    Tek istek/cevap: (durum, gövde). Bağlantı isteği yazarken (BrokenPipe,
+    ConnectionReset) ya da cevap hiç başlamadan (RemoteDisconnected)
+    kapanırsa _StaleConnection; yalnızca bu durum yeniden denenebilir.
+    """
+    try:
+        conn.request(method, endpoint, body=body, headers=headers)
+    except (BrokenPipeError, ConnectionResetError) as e:
+        raise _StaleConnection() from e
+    try:
+        response = conn.getresponse()
+    except http.client.RemoteDisconnected as e:
+        raise _StaleConnection() from e
+    return response.status, response.read()
+
+
+class _CompetitorBase:
+    """
+    Senkron ve async istemcinin ortak kısmı: paket şablonları, konsol çıktısı
+    ve saat kestirimi. Taşıma (istek gönderme) alt sınıflardadır.
 
-class CompetitorClient:
-    def __init__(self, base_url="http://localhost:8000", username="rota_takim", password="parola123"):
+    Paketler her gönderimde yeniden kurulmaz; istemci başına bir kez ayrılan
+    sözlükler yerinde güncellenir (_telemetry_payload'ın döndüğü sözlük bir
+    sonraki çağrıda değişir, saklanacaksa kopyalanmalı). echo=False iken
+    paketler konsola basılmaz; tek process'te çok takım sürerken kullanılır.
+    """
+
+    def __init__(self, base_url="http://localhost:8000", username="rota_takim", password="parola123",
+                 clock_interval_s=None, echo=True):
         self.base_url = base_url
         self.username = username
         self.password = password
+        self.echo = echo
         self.takim_no = None
         self.headers = {'Content-Type': 'application/json'}
+        # Sunucu saatine göre ofset/RTT (bkz. saat_senkronu.py). clock_interval_s verilirse
+        # telemetri gönderimlerinden önce en fazla bu aralıkla bir saat örneği alınır.
+        self.clock = SaatKestirici()
+        self.clock_interval_s = clock_interval_s
+        self._last_clock_sample = None
 
-    def _send_request(self, endpoint, method="GET", data=None):
-        url = f"{self.base_url}{endpoint}"
-        try:
-            if data:
-                data_bytes = json.dumps(data).encode('utf-8')
-                req = urllib.request.Request(url, data=data_bytes, headers=self.headers, method=method)
-            else:
-                req = urllib.request.Request(url, headers=self.headers, method=method)
-            
-            with urllib.request.urlopen(req) as response:
-                resp_body = response.read().decode('utf-8')
-                return response.status, json.loads(resp_body) if resp_body else None
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8')
-            print(f"Server Error ({e.code}): {error_body}")
-            return e.code, None
-        except Exception as e:
-            print(f"Connection Error: {e}")
-            return 0, None
+        self._telemetry = {
+            "takim_numarasi": None,
+            "iha_enlem": 0.0, "iha_boylam": 0.0, "iha_irtifa": 0.0,
+            "iha_dikilme": 0.0, "iha_yonelme": 0.0, "iha_yatis": 0.0, "iha_hiz": 0.0,
+            "iha_batarya": 0.0, "iha_otonom": 0, "iha_kilitlenme": 0,
+            **_BOS_HEDEF,
+            "gps_saati": {"saat": 0, "dakika": 0, "saniye": 0, "milisaniye": 0},
+        }
+        self._lock = {
+            "takim_numarasi": None,
+            "kilitlenmeBitisZamani": {"saat": 0, "dakika": 0, "saniye": 0, "milisaniye": 0},
+            "otonom_kilitlenme": 0,
+        }
+        self._kamikaze = {
+            "takim_numarasi": None,
+            "kamikazeBaslangicZamani": {"saat": 0, "dakika": 0, "saniye": 0, "milisaniye": 0},
+            "kamikazeBitisZamani": {"saat": 0, "dakika": 0, "saniye": 0, "milisaniye": 0},
+            "qrMetni": "",
+        }
 
-    def login(self):
-        """Bölüm 5: Sisteme Giriş"""
-        print(f"Logging in as {self.username}...")
-        status, body = self._send_request("/api/giris", "POST", {
-            "kadi": self.username, 
-            "sifre": self.password
-        })
-        
+    def _print(self, *args):
+        if self.echo:
+            print(*args)
+
+    def _login_body(self):
+        self._print(f"Logging in as {self.username}...")
+        return {"kadi": self.username, "sifre": self.password}
+
+    def _login_done(self, status, body):
         if status == 200:
             self.takim_no = body
-            print(f"Login Successful! Takim No: {self.takim_no}")
+            self._print(f"Login Successful! Takim No: {self.takim_no}")
             return True
-        else:
-            print("Login Failed.")
+        self._print("Login Failed.")
+        return False
+
+    def _clock_sample_done(self, t0, status, body, t1):
+        if status != 200:
+            return None
+        self.clock.ornek_ekle(t0, body, t1)
+        self._last_clock_sample = time.monotonic()
+        return body
+
+    def _clock_due(self):
+        if self.clock_interval_s is None:
             return False
+        return self._last_clock_sample is None or time.monotonic() - self._last_clock_sample >= self.clock_interval_s
 
-    def get_server_time(self):
-        """Bölüm 6: Sunucu Saati"""
-        status, body = self._send_request("/api/sunucusaati", "GET")
-        return body if status == 200 else None
+    def server_now(self):
+        """Sunucu saatine göre şimdi (henüz örnek yoksa yerel saat)."""
+        return self.clock.simdi()
 
-    def send_telemetry(self, lat, lon, alt, pitch, heading, roll, speed, battery, autonomous, locked, target_info=None):
-        """Bölüm 7: Telemetri Gönderimi"""
+    def _telemetry_payload(self, lat, lon, alt, pitch, heading, roll, speed, battery, autonomous, locked, target_info=None):
+        if target_info is None:
+            target_info = _BOS_HEDEF
+        p = self._telemetry
+        p["takim_numarasi"] = self.takim_no
+        p["iha_enlem"] = lat
+        p["iha_boylam"] = lon
+        p["iha_irtifa"] = alt
+        p["iha_dikilme"] = pitch
+        p["iha_yonelme"] = heading
+        p["iha_yatis"] = roll
+        p["iha_hiz"] = speed
+        p["iha_batarya"] = battery
+        p["iha_otonom"] = autonomous
+        p["iha_kilitlenme"] = locked
+        p["hedef_merkez_X"] = target_info.get("hedef_merkez_X", 0)
+        p["hedef_merkez_Y"] = target_info.get("hedef_merkez_Y", 0)
+        p["hedef_genislik"] = target_info.get("hedef_genislik", 0)
+        p["hedef_yukseklik"] = target_info.get("hedef_yukseklik", 0)
+        # GPS saati örneği (sunucu saatine göre düzeltilmiş)
+        _fill_time(p["gps_saati"], self.clock.simdi())
+        return p
+
+    def _telemetry_request(self, binary, args):
+        """(endpoint, json, ham gövde) döner; giriş yapılmadıysa None."""
         if self.takim_no is None:
             print("Error: Must login first!")
             return None
-
-        # Prepare default target info if not provided
-        if target_info is None:
-            target_info = {
-                "hedef_merkez_X": 0, "hedef_merkez_Y": 0,
-                "hedef_genislik": 0, "hedef_yukseklik": 0
-            }
-
-        # Current time for GPS example
-        now = datetime.now()
-        
-        telemetry_data = {
-            "takim_numarasi": self.takim_no,
-            "iha_enlem": lat, "iha_boylam": lon, "iha_irtifa": alt,
-            "iha_dikilme": pitch, "iha_yonelme": heading, "iha_yatis": roll, "iha_hiz": speed,
-            "iha_batarya": battery, "iha_otonom": autonomous, "iha_kilitlenme": locked,
-            "hedef_merkez_X": target_info.get("hedef_merkez_X", 0),
-            "hedef_merkez_Y": target_info.get("hedef_merkez_Y", 0),
-            "hedef_genislik": target_info.get("hedef_genislik", 0),
-            "hedef_yukseklik": target_info.get("hedef_yukseklik", 0),
-            "gps_saati": {
-                "saat": now.hour, "dakika": now.minute, 
-                "saniye": now.second, "milisaniye": now.microsecond // 1000
-            }
-        }
-        
-        
+        telemetry_data = self._telemetry_payload(*args)
+        if binary:
+            return "/api/telemetri_gonder_ikili", None, self.encode_telemetry_binary(telemetry_data)
         # Dökümanda (7.2) belirtildiği gibi gönderilen veriyi konsolda gösterelim
-        print(f"\n[TELEMETRI GONDERILIYOR - Takım {self.takim_no}]:")
-        print(json.dumps(telemetry_data, indent=4, ensure_ascii=False))
+        if self.echo:
+            print(f"\n[TELEMETRI GONDERILIYOR - Takım {self.takim_no}]:")
+            print(json.dumps(telemetry_data, indent=4, ensure_ascii=False))
+        return "/api/telemetri_gonder", telemetry_data, None
 
-        status, body = self._send_request("/api/telemetri_gonder", "POST", telemetry_data)
+    def _telemetry_done(self, status, body):
         if status == 200:
             return body # Contains other teams' locations
         elif status == 400 and body == 3:
-            print("Rate Limit Exceeded (Wait 500ms)")
+            self._print("Rate Limit Exceeded (Wait 500ms)")
         return None
 
-    def send_lock_info(self, end_time_dt, is_autonomous):
-        """Bölüm 8: Kilitlenme Bilgisi"""
-        # Format time as nested dict
-        end_time_dict = {
-            "saat": end_time_dt.hour, 
-            "dakika": end_time_dt.minute, 
-            "saniye": end_time_dt.second, 
-            "milisaniye": end_time_dt.microsecond // 1000
-        }
+    @staticmethod
+    def encode_telemetry_binary(telemetry_data):
+        """Telemetri paketini (send_telemetry'deki dict) /api/telemetri_gonder_ikili düzenine kodlar."""
+        t = telemetry_data
+        gps = t["gps_saati"]
+        return TELEMETRI_IKILI_PAKET.pack(
+            TELEMETRI_IKILI_SURUM, t["takim_numarasi"],
+            t["iha_enlem"], t["iha_boylam"], t["iha_irtifa"], t["iha_dikilme"],
+            t["iha_yonelme"], t["iha_yatis"], t["iha_hiz"], t["iha_batarya"],
+            t["iha_otonom"], t["iha_kilitlenme"],
+            t["hedef_merkez_X"], t["hedef_merkez_Y"], t["hedef_genislik"], t["hedef_yukseklik"],
+            gps["saat"], gps["dakika"], gps["saniye"], gps["milisaniye"])
 
-        data = {
-            "takim_numarasi": self.takim_no,
-            "kilitlenmeBitisZamani": end_time_dict,
-            "otonom_kilitlenme": 1 if is_autonomous else 0
-        }
+    def _lock_payload(self, end_time_dt, is_autonomous):
+        """Bölüm 8: yerel an sunucu saatine çevrilir."""
+        data = self._lock
+        data["takim_numarasi"] = self.takim_no
+        _fill_time(data["kilitlenmeBitisZamani"], self.clock.sunucu_saatine_cevir(end_time_dt))
+        data["otonom_kilitlenme"] = 1 if is_autonomous else 0
 
         # Dökümanda (8.1) belirtildiği gibi gönderilen veriyi konsolda gösterelim (takim_numarasi haric)
-        print(f"\n[KILITLENME BILGISI GONDERILIYOR - Takım {self.takim_no}]:")
-        display_data = {k: v for k, v in data.items() if k != 'takim_numarasi'}
-        print(json.dumps(display_data, indent=4, ensure_ascii=False))
+        if self.echo:
+            print(f"\n[KILITLENME BILGISI GONDERILIYOR - Takım {self.takim_no}]:")
+            display_data = {k: v for k, v in data.items() if k != 'takim_numarasi'}
+            print(json.dumps(display_data, indent=4, ensure_ascii=False))
+        return data
+
+    def _kamikaze_payload(self, start_dt, end_dt, qr_text):
+        """Bölüm 9: yerel anlar sunucu saatine çevrilir."""
+        data = self._kamikaze
+        data["takim_numarasi"] = self.takim_no
+        _fill_time(data["kamikazeBaslangicZamani"], self.clock.sunucu_saatine_cevir(start_dt))
+        _fill_time(data["kamikazeBitisZamani"], self.clock.sunucu_saatine_cevir(end_dt))
+        data["qrMetni"] = qr_text
+
+        # Dökümanda (9) belirtildiği gibi gönderilen veriyi konsolda gösterelim (takim_numarasi haric)
+        if self.echo:
+            print(f"\n[KAMIKAZE BILGISI GONDERILIYOR - Takım {self.takim_no}]:")
+            display_data = {k: v for k, v in data.items() if k != 'takim_numarasi'}
+            print(json.dumps(display_data, indent=4, ensure_ascii=False))
+        return data
+
+
+class CompetitorClient(_CompetitorBase):
+    """
+    Senkron istemci. İstekler tek bir kalıcı (keep-alive) http.client
+    bağlantısından gider; sunucu boşta kalan bağlantıyı isteği okumadan
+    kapatmışsa bir kez yeniden bağlanılır (zaman aşımında tekrar
+    gönderilmez). source_address verilirse bağlantı o kaynak IP'den açılır
+    (sunucu oturumu IP ile eşleştirir; bkz. bench/olcum.kaynak_ip).
+    """
+
+    def __init__(self, base_url="http://localhost:8000", username="rota_takim", password="parola123",
+                 clock_interval_s=None, echo=True, source_address=None, timeout_s=10):
+        super().__init__(base_url, username, password, clock_interval_s, echo)
+        parts = urllib.parse.urlsplit(base_url)
+        self._address = (parts.hostname, parts.port or 80)
+        self._source_address = (source_address, 0) if source_address else None
+        self._timeout_s = timeout_s
+        self._conn = None
+
+    def _send_request(self, endpoint, method="GET", data=None, raw_body=None):
+        if raw_body is not None:
+            body, headers = raw_body, {'Content-Type': 'application/octet-stream'}
+        elif data:
+            body, headers = json.dumps(data).encode('utf-8'), self.headers
+        else:
+            body, headers = None, self.headers
+
+        for _ in range(2):
+            reused = self._conn is not None
+            try:
+                if not reused:
+                    self._conn = http.client.HTTPConnection(*self._address, timeout=self._timeout_s,
+                                                            source_address=self._source_address)
+                status, resp_body = _exchange(self._conn, method, endpoint, body, headers)
+                break
+            except (_StaleConnection, OSError, http.client.HTTPException) as e:
+                self.close()
+                # Sunucu boşta kalan keep-alive bağlantısını kapatmış: istek işlenmedi, bir kez yeniden dene.
+                # Zaman aşımı vb. hatalarda istek sunucuya ulaşmış olabilir; tekrar gönderilmez.
+                if reused and isinstance(e, _StaleConnection):
+                    continue
+                print(f"Connection Error: {e.__cause__ or e}")
+                return 0, None
+        try:
+            parsed = json.loads(resp_body) if resp_body else None
+        except ValueError:
+            parsed = None
+        if status >= 400:
+            self._print(f"Server Error ({status}): {resp_body.decode('utf-8', 'replace')}")
+        return status, parsed
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def login(self):
+        """Bölüm 5: Sisteme Giriş"""
+        status, body = self._send_request("/api/giris", "POST", self._login_body())
+        return self._login_done(status, body)
+
+    def get_server_time(self):
+        """Bölüm 6: Sunucu Saati. Her cevap saat kestiricisine örnek olarak da eklenir."""
+        t0 = time.time()
+        status, body = self._send_request("/api/sunucusaati", "GET")
+        return self._clock_sample_done(t0, status, body, time.time())
+
+    def sync_clock(self, samples=8, interval_s=0.05):
+        """Art arda örnek alıp ofset/RTT kestirimini tazeler; clock.ozet() döner."""
+        for i in range(samples):
+            if i:
+                time.sleep(interval_s)
+            self.get_server_time()
+        return self.clock.ozet()
+
+    def _send_telemetry(self, binary, args):
+        if self.takim_no is not None and self._clock_due():
+            self.get_server_time()
+        request = self._telemetry_request(binary, args)
+        if request is None:
+            return None
+        endpoint, data, raw_body = request
+        status, body = self._send_request(endpoint, "POST", data, raw_body)
+        return self._telemetry_done(status, body)
+
+    def send_telemetry(self, lat, lon, alt, pitch, heading, roll, speed, battery, autonomous, locked, target_info=None):
+        """Bölüm 7: Telemetri Gönderimi"""
+        return self._send_telemetry(False, (lat, lon, alt, pitch, heading, roll, speed,
+                                            battery, autonomous, locked, target_info))
+
+    def send_telemetry_binary(self, lat, lon, alt, pitch, heading, roll, speed, battery, autonomous, locked, target_info=None):
+        """Bölüm 7: Telemetri Gönderimi (ikili uç). Cevap JSON uçla aynıdır."""
+        return self._send_telemetry(True, (lat, lon, alt, pitch, heading, roll, speed,
+                                           battery, autonomous, locked, target_info))
 
-        status, _ = self._send_request("/api/kilitlenme_bilgisi", "POST", data)
+    def send_lock_info(self, end_time_dt, is_autonomous):
+        """Bölüm 8: Kilitlenme Bilgisi"""
+        status, _ = self._send_request("/api/kilitlenme_bilgisi", "POST",
+                                       self._lock_payload(end_time_dt, is_autonomous))
         return status == 200
 
     def send_kamikaze_info(self, start_dt, end_dt, qr_text):
         """Bölüm 9: Kamikaze Bilgisi"""
-        def format_dt(dt):
-            return {
-                "saat": dt.hour, "dakika": dt.minute,
-                "saniye": dt.second, "milisaniye": dt.microsecond // 1000
-            }
-
-        data = {
-            "takim_numarasi": self.takim_no,
-            "kamikazeBaslangicZamani": format_dt(start_dt),
-            "kamikazeBitisZamani": format_dt(end_dt),
-            "qrMetni": qr_text
-        }
-
-        # Dökümanda (9) belirtildiği gibi gönderilen veriyi konsolda gösterelim (takim_numarasi haric)
-        print(f"\n[KAMIKAZE BILGISI GONDERILIYOR - Takım {self.takim_no}]:")
-        display_data = {k: v for k, v in data.items() if k != 'takim_numarasi'}
-        print(json.dumps(display_data, indent=4, ensure_ascii=False))
-
-        status, _ = self._send_request("/api/kamikaze_bilgisi", "POST", data)
+        status, _ = self._send_request("/api/kamikaze_bilgisi", "POST",
+                                       self._kamikaze_payload(start_dt, end_dt, qr_text))
         return status == 200
 
     def get_qr_coordinate(self):
@@ -153,20 +326,121 @@ class CompetitorClient:
         status, body = self._send_request("/api/hss_koordinatlari", "GET")
         return body if status == 200 else None
 
+
+class AsyncCompetitorClient(_CompetitorBase):
+    """
+    CompetitorClient'ın async karşılığı (aynı metotlar, await ile). İstekler
+    tasima.Tasima'nın kalıcı bağlantı havuzundan gider; tek event loop'ta
+    çok sayıda takım sürülebilir. tasima verilirse takımlar aynı havuzu
+    paylaşır (aynı kaynak IP), verilmezse istemci kendi havuzunu açar.
+    httpx gerektirir; senkron istemci yalnızca standart kütüphaneyle çalışır.
+    """
+
+    def __init__(self, base_url="http://localhost:8000", username="rota_takim", password="parola123",
+                 clock_interval_s=None, echo=True, source_address=None, timeout_s=10, tasima=None):
+        super().__init__(base_url, username, password, clock_interval_s, echo)
+        try:
+            import httpx
+            from tasima import Tasima
+        except ImportError:
+            raise ImportError("AsyncCompetitorClient için httpx gerekli: pip install httpx") from None
+        self._http_errors = httpx.HTTPError
+        self._owns_tasima = tasima is None
+        self.tasima = tasima or Tasima(base_url, zaman_asimi_s=timeout_s, baglanti_sayisi=1,
+                                       yerel_adres=source_address)
+
+    async def _send_request(self, endpoint, method="GET", data=None, raw_body=None):
+        try:
+            if raw_body is not None:
+                response = await self.tasima.istek(method, endpoint, icerik=raw_body,
+                                                   basliklar={'Content-Type': 'application/octet-stream'})
+            else:
+                response = await self.tasima.istek(method, endpoint, json=data or None)
+        except self._http_errors as e:
+            print(f"Connection Error: {e}")
+            return 0, None
+        try:
+            parsed = response.json() if response.content else None
+        except ValueError:
+            parsed = None
+        if response.status_code >= 400:
+            self._print(f"Server Error ({response.status_code}): {response.text}")
+        return response.status_code, parsed
+
+    async def close(self):
+        if self._owns_tasima:
+            await self.tasima.kapat()
+
+    async def login(self):
+        """Bölüm 5: Sisteme Giriş"""
+        status, body = await self._send_request("/api/giris", "POST", self._login_body())
+        return self._login_done(status, body)
+
+    async def get_server_time(self):
+        """Bölüm 6: Sunucu Saati. Her cevap saat kestiricisine örnek olarak da eklenir."""
+        t0 = time.time()
+        status, body = await self._send_request("/api/sunucusaati", "GET")
+        return self._clock_sample_done(t0, status, body, time.time())
+
+    async def sync_clock(self, samples=8, interval_s=0.05):
+        for i in range(samples):
+            if i:
+                await asyncio.sleep(interval_s)
+            await self.get_server_time()
+        return self.clock.ozet()
+
+    async def _send_telemetry(self, binary, args):
+        if self.takim_no is not None and self._clock_due():
+            await self.get_server_time()
+        request = self._telemetry_request(binary, args)
+        if request is None:
+            return None
+        endpoint, data, raw_body = request
+        status, body = await self._send_request(endpoint, "POST", data, raw_body)
+        return self._telemetry_done(status, body)
+
+    async def send_telemetry(self, lat, lon, alt, pitch, heading, roll, speed, battery, autonomous, locked, target_info=None):
+        return await self._send_telemetry(False, (lat, lon, alt, pitch, heading, roll, speed,
+                                                  battery, autonomous, locked, target_info))
+
+    async def send_telemetry_binary(self, lat, lon, alt, pitch, heading, roll, speed, battery, autonomous, locked, target_info=None):
+        return await self._send_telemetry(True, (lat, lon, alt, pitch, heading, roll, speed,
+                                                 battery, autonomous, locked, target_info))
+
+    async def send_lock_info(self, end_time_dt, is_autonomous):
+        status, _ = await self._send_request("/api/kilitlenme_bilgisi", "POST",
+                                             self._lock_payload(end_time_dt, is_autonomous))
+        return status == 200
+
+    async def send_kamikaze_info(self, start_dt, end_dt, qr_text):
+        status, _ = await self._send_request("/api/kamikaze_bilgisi", "POST",
+                                             self._kamikaze_payload(start_dt, end_dt, qr_text))
+        return status == 200
+
+    async def get_qr_coordinate(self):
+        status, body = await self._send_request("/api/qr_koordinati", "GET")
+        return body if status == 200 else None
+
+    async def get_hss_coordinates(self):
+        status, body = await self._send_request("/api/hss_koordinatlari", "GET")
+        return body if status == 200 else None
+
+
 if __name__ == "__main__":
     # Örnek Kullanım
     client = CompetitorClient(username="rota_takim", password="parola123")
-    
+
     if client.login():
         # Sunucu Saatini Al
         print("Sunucu Saati:", client.get_server_time())
-        
+        print("Saat Senkronu:", client.sync_clock())
+
         # Telemetri Gönder (Örnek Döngü)
         print("\nSending telemetry packet...")
         response = client.send_telemetry(
             lat=41.123, lon=29.456, alt=100.5,
-            pitch=10, heading=90, roll=0, 
-            speed=15.5, battery=85, 
+            pitch=10, heading=90, roll=0,
+            speed=15.5, battery=85,
             autonomous=1, locked=0
         )
         if response:
@@ -174,6 +448,6 @@ if __name__ == "__main__":
 
         # QR Koordinatını Al
         print("\nQR Coordinate:", client.get_qr_coordinate())
-        
+
         # HSS Koordinatlarını Al
         print("HSS Coordinates:", client.get_hss_coordinates())
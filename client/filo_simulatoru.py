@@ -0,0 +1,249 @@
+"""
+Tek process'te N İHA'lık filo simülatörü.
+
+Her İHA için ayrı client_1.py kopyası açmak yerine filonun durumu NumPy
+dizilerinde tutulur ve her adımda hepsi birlikte ilerletilir
+(rastgele yürüyüş, irtifa sınırı, yönelme 0-360, batarya tüketimi,
+kilitlenme kutuları; client_1.rastgele_hareket_uret'in vektörel karşılığı).
+
+Her İHA kendi kullanıcı adı/şifresiyle giriş yapar ve telemetrisini kendi
+Zamanlayici'siyle (bkz. tasima.py) gönderir; İHA'lar periyot içine eşit
+aralıklarla yayılır. İstekler ortak, kalıcı bağlantı havuzundan gider.
+
+Sunucu oturumu IP ile eşleştirir. Varsayılan olarak tüm İHA'lar aynı
+adresten bağlanır (sunucu localhost'ta takım/IP kontrolünü atlar).
+--ayri-ip ile her İHA 127.0.x.y loopback adreslerinden birini kullanır
+(yalnızca Linux; sunucu 127.0.0.1 ile aynı makinede olmalı). Bu durumda
+kaynak adres başına ayrı bir havuz açılır.
+
+Kullanım:
+    python filo_simulatoru.py --takimlar ../server/teams.json
+    python filo_simulatoru.py --takimlar filo.json --adet 300 --hz 1 --sure 60 --cikti sonuc.json
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import time
+from datetime import datetime
+
+import httpx
+import numpy as np
+
+from tasima import Istatistik, Tasima, Zamanlayici
+
+MERKEZ = (41.508775, 36.118335)  # client_1.IhaVerisi varsayılan konumu
+# Her adımda kilitlenmeye başlama / kilitlenmeyi bırakma olasılığı
+KILIT_BASLAMA_OLASILIGI = 0.02
+KILIT_BIRAKMA_OLASILIGI = 0.1
+
+
+def zaman_objesi_olustur(dt_obj):
+    return {"saat": dt_obj.hour, "dakika": dt_obj.minute, "saniye": dt_obj.second,
+            "milisaniye": dt_obj.microsecond // 1000}
+
+
+def kaynak_ip(sira):
+    """bench/olcum.py ile aynı: 127.0.0.1 (localhost istisnası) dışındaki loopback adresleri."""
+    return f"127.0.{sira // 250 + 1}.{sira % 250 + 2}"
+
+
+class Filo:
+    """N İHA'nın durumu; her alan uzunluğu N olan bir dizi."""
+
+    def __init__(self, takim_nolari, tohum=None, yayilim_derece=0.005):
+        n = len(takim_nolari)
+        self.takim_nolari = list(takim_nolari)
+        self.rng = np.random.default_rng(tohum)
+        self.enlem = MERKEZ[0] + self.rng.uniform(-yayilim_derece, yayilim_derece, n)
+        self.boylam = MERKEZ[1] + self.rng.uniform(-yayilim_derece, yayilim_derece, n)
+        self.irtifa = np.full(n, 38.0)
+        self.dikilme = np.zeros(n)
+        self.yonelme = self.rng.uniform(0, 360, n)
+        self.yatis = np.zeros(n)
+        self.hiz = np.full(n, 10.0)
+        self.batarya = np.full(n, 100.0)
+        self.otonom = np.ones(n, dtype=np.int64)
+        self.kilitlenme = np.zeros(n, dtype=np.int64)
+        self.hedef = np.zeros((n, 4), dtype=np.int64)  # merkez X, merkez Y, genişlik, yükseklik
+        self._satirlar = None
+
+    def __len__(self):
+        return len(self.takim_nolari)
+
+    def adim(self):
+        n = len(self)
+        rng = self.rng
+        # 0.0001 derece yaklaşık 11 metre
+        self.enlem += rng.uniform(-0.0001, 0.0001, n)
+        self.boylam += rng.uniform(-0.0001, 0.0001, n)
+        self.irtifa = np.clip(self.irtifa + rng.uniform(-0.5, 0.5, n), 30.0, 50.0)
+        self.dikilme = np.round(rng.uniform(-5, 5, n), 2)
+        self.yatis = np.round(rng.uniform(-10, 10, n), 2)
+        self.yonelme = np.mod(self.yonelme + rng.uniform(-2, 2, n), 360)
+        self.batarya = np.maximum(0.0, self.batarya - 0.05)
+
+        zar = rng.random(n)
+        baslayan = (self.kilitlenme == 0) & (zar < KILIT_BASLAMA_OLASILIGI)
+        birakan = (self.kilitlenme == 1) & (zar < KILIT_BIRAKMA_OLASILIGI)
+        self.kilitlenme = np.where(baslayan, 1, np.where(birakan, 0, self.kilitlenme))
+        kutular = np.column_stack((rng.integers(100, 501, n), rng.integers(100, 401, n),
+                                   rng.integers(20, 101, n), rng.integers(20, 101, n)))
+        self.hedef = np.where(self.kilitlenme[:, None] == 1, kutular, 0)
+        self._satirlar = None
+
+    def satir(self, sira):
+        """İHA'nın güncel değerleri; diziler adım başına bir kez Python listelerine çevrilir."""
+        if self._satirlar is None:
+            self._satirlar = list(zip(
+                self.enlem.tolist(), self.boylam.tolist(), self.irtifa.tolist(), self.dikilme.tolist(),
+                self.yonelme.tolist(), self.yatis.tolist(), self.hiz.tolist(), self.batarya.tolist(),
+                self.otonom.tolist(), self.kilitlenme.tolist(), self.hedef.tolist()))
+        return self._satirlar[sira]
+
+    def paket(self, sira, gps_saati):
+        (enlem, boylam, irtifa, dikilme, yonelme, yatis, hiz, batarya,
+         otonom, kilitlenme, (merkez_x, merkez_y, genislik, yukseklik)) = self.satir(sira)
+        return {
+            "takim_numarasi": self.takim_nolari[sira],
+            "iha_enlem": enlem, "iha_boylam": boylam, "iha_irtifa": irtifa,
+            "iha_dikilme": dikilme, "iha_yonelme": yonelme, "iha_yatis": yatis,
+            "iha_hiz": hiz, "iha_batarya": batarya, "iha_otonom": otonom, "iha_kilitlenme": kilitlenme,
+            "hedef_merkez_X": merkez_x, "hedef_merkez_Y": merkez_y,
+            "hedef_genislik": genislik, "hedef_yukseklik": yukseklik,
+            "gps_saati": gps_saati,
+        }
+
+
+async def giris_yap(tasima, takim):
+    """Takım numarasını (başarısızsa None) döner."""
+    try:
+        cevap = await tasima.post("/api/giris", json={"kadi": takim["kadi"], "sifre": takim["sifre"]})
+    except httpx.HTTPError:
+        return None
+    return cevap.json() if cevap.status_code == 200 else None
+
+
+async def adim_dongusu(filo, hz):
+    """Filonun durumunu hz ile ilerletir (gönderimlerden bağımsız, kaymasız)."""
+    zamanlayici = Zamanlayici(hz, min_aralik_s=0, taban_pay_s=0)
+    while True:
+        await zamanlayici.bekle()
+        filo.adim()
+
+
+async def iha_dongusu(filo, sira, tasima, zamanlayici, sayaclar, ilk_gecikme_s):
+    await asyncio.sleep(ilk_gecikme_s)
+    while True:
+        await zamanlayici.bekle()
+        try:
+            cevap = await tasima.post("/api/telemetri_gonder",
+                                      json=filo.paket(sira, zaman_objesi_olustur(datetime.now())))
+            sayaclar[cevap.status_code] += 1
+            if cevap.status_code == 400 and cevap.content == b"3":
+                zamanlayici.red_bildir()
+        except httpx.HTTPError:
+            sayaclar["hata"] += 1
+        finally:
+            zamanlayici.tamamlandi()
+
+
+def birlesik_ozet(istatistikler):
+    birlesik = Istatistik(pencere_boyutu=None)
+    for istatistik in istatistikler:
+        birlesik.degerler.extend(istatistik.degerler)
+        birlesik.adet += istatistik.adet
+    return birlesik.ozet()
+
+
+async def simule_et(takimlar, url, hz, sure_s, ayri_ip, baglanti_sayisi, rapor_araligi_s, tohum):
+    if ayri_ip:
+        tasimalar = [Tasima(url, baglanti_sayisi=1, yerel_adres=kaynak_ip(sira)) for sira in range(len(takimlar))]
+    else:
+        ortak = Tasima(url, baglanti_sayisi=baglanti_sayisi)
+        tasimalar = [ortak] * len(takimlar)
+    tekil_tasimalar = list({id(t): t for t in tasimalar}.values())
+
+    try:
+        takim_nolari = await asyncio.gather(*(giris_yap(t, takim) for t, takim in zip(tasimalar, takimlar)))
+        girenler = [sira for sira, takim_no in enumerate(takim_nolari) if takim_no is not None]
+        print(f"{len(girenler)}/{len(takimlar)} İHA giriş yaptı")
+        if not girenler:
+            return None
+
+        filo = Filo([takim_nolari[sira] for sira in girenler], tohum=tohum)
+        tasimalar = [tasimalar[sira] for sira in girenler]
+        zamanlayicilar = [Zamanlayici(hz) for _ in girenler]
+        sayaclar = collections.Counter()
+        periyot_s = 1.0 / hz
+        gorevler = [asyncio.create_task(adim_dongusu(filo, hz))]
+        gorevler += [asyncio.create_task(iha_dongusu(filo, sira, tasimalar[sira], zamanlayicilar[sira], sayaclar,
+                                                     periyot_s * sira / len(filo)))
+                     for sira in range(len(filo))]
+
+        baslangic = time.monotonic()
+        try:
+            while sure_s <= 0 or time.monotonic() - baslangic < sure_s:
+                await asyncio.sleep(rapor_araligi_s if sure_s <= 0 else
+                                    min(rapor_araligi_s, sure_s - (time.monotonic() - baslangic)))
+                rtt = birlesik_ozet(t.rtt for t in tekil_tasimalar)
+                print(f"{time.monotonic() - baslangic:7.1f} s  gönderilen={sum(sayaclar.values())} "
+                      f"200={sayaclar[200]} 400={sayaclar[400]} hata={sayaclar['hata']} "
+                      f"rtt p50={rtt.get('p50')} p95={rtt.get('p95')} ms")
+        finally:
+            for gorev in gorevler:
+                gorev.cancel()
+            await asyncio.gather(*gorevler, return_exceptions=True)
+        gecen = time.monotonic() - baslangic
+
+        return {
+            "ayarlar": {"url": url, "iha_sayisi": len(filo), "hz": hz, "ayri_ip": ayri_ip},
+            "sure_s": round(gecen, 3),
+            "durum_kodlari": {str(kod): adet for kod, adet in sayaclar.items()},
+            "istek_hizi": round(sum(sayaclar.values()) / gecen, 2) if gecen > 0 else None,
+            "rtt_ms": birlesik_ozet(t.rtt for t in tekil_tasimalar),
+            "gonderim_sapmasi_ms": birlesik_ozet(z.sapma for z in zamanlayicilar),
+            "gonderim_araligi_ms": birlesik_ozet(z.aralik for z in zamanlayicilar),
+            "ertelenen": sum(z.ertelenen for z in zamanlayicilar),
+            "atlanan": sum(z.atlanan for z in zamanlayicilar),
+        }
+    finally:
+        for tasima in tekil_tasimalar:
+            await tasima.kapat()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--takimlar", required=True, help="Kimlik listesi (teams.json biçimi: kadi, sifre, takim_no)")
+    parser.add_argument("--adet", type=int, help="Listeden yalnızca ilk N takımı uçur")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--hz", type=float, default=1.0, help="İHA başına telemetri hızı (1-2 Hz)")
+    parser.add_argument("--sure", type=float, default=0, help="Simülasyon süresi (s); 0 = Ctrl+C'ye kadar")
+    parser.add_argument("--ayri-ip", action="store_true", help="Her İHA ayrı loopback adresinden bağlansın")
+    parser.add_argument("--baglanti", type=int, default=32, help="Ortak havuzdaki en fazla bağlantı")
+    parser.add_argument("--rapor-araligi", type=float, default=5.0)
+    parser.add_argument("--tohum", type=int, help="Tekrarlanabilir hareket için rastgele tohum")
+    parser.add_argument("--cikti", help="JSON özetin yazılacağı dosya")
+    args = parser.parse_args()
+
+    with open(args.takimlar) as f:
+        takimlar = json.load(f)
+    if args.adet:
+        takimlar = takimlar[:args.adet]
+
+    sonuc = None
+    with contextlib.suppress(KeyboardInterrupt):
+        sonuc = asyncio.run(simule_et(takimlar, args.url, args.hz, args.sure, args.ayri_ip,
+                                      args.baglanti, args.rapor_araligi, args.tohum))
+    if sonuc is None:
+        return
+    metin = json.dumps(sonuc, indent=4, ensure_ascii=False)
+    if args.cikti:
+        with open(args.cikti, "w") as f:
+            f.write(metin)
+    print(metin)
+
+
+if __name__ == "__main__":
+    main()
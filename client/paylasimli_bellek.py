@@ -0,0 +1,226 @@
+"""
+Köprü istemcisinin (client_2.py) kendi İHA durumunu ve rakip konumlarını
+aynı makinedeki otopilot / görüntü işleme process'lerine paylaşılan bellekten
+yayınlaması.
+
+Blok, /dev/shm altında (yoksa geçici dizinde) sabit boyutlu bir dosyadır;
+iki taraf da mmap ile eşler. Okuyucu her okumada sistem çağrısı yapmaz,
+JSON çözmez: bloğu kendi tamponuna kopyalar ve alanlara NumPy görünümleriyle
+erişir. HTTP ile /rakipler ve /iha/durum sorgulamanın yerine kHz hızında
+okunabilir.
+
+Düzen (little-endian, sürüm 2):
+    0    BASLIK_DTYPE   sihir "RKP1", sürüm, sıra (seqlock), yayın zamanı (ns),
+                        kendi takım no, rakip sayısı, kapasite, sağlama (CRC32)
+    64   IHA_DTYPE      kendi durumumuz (IhaVerisi alanları)
+    152  RAKIP_DTYPE x kapasite   konumBilgileri satırları
+
+Seqlock: tek yazıcı, yazmadan önce sırayı tek sayıya, bitince çift sayıya
+çıkarır. Okuyucu sıra çiftse bloğu kopyalar ve sıra değişmediyse kopyayı
+kabul eder, aksi halde tekrar dener. Python bellek bariyeri koyamadığı için
+sıra kontrolü tek başına yalnızca x86'nın (TSO) store/load sırasında
+yeterlidir; ARM gibi zayıf sıralı işlemcilerde (İHA yardımcı bilgisayarları)
+okuyucu yarım yazılmış bir kopyayı sıra değişmemiş gibi görebilir. Bu yüzden
+yazıcı yayın zamanı, takım no, rakip sayısı ve veri alanlarının CRC32'sini
+başlığa yazar; okuyucu kopyanın sağlamasını da doğrular, tutmazsa tekrar dener.
+
+Okuyucu kullanımı:
+    okuyucu = BellekOkuyucu(bellek_yolu(8002))
+    goruntu = okuyucu.oku()
+    goruntu.rakipler["iha_enlem"], goruntu.kendi["iha_irtifa"]
+"""
+import argparse
+import collections
+import mmap
+import os
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+SIHIR = b"RKP1"
+SURUM = 2
+VARSAYILAN_KAPASITE = 64
+
+BASLIK_DTYPE = np.dtype([("sihir", "S4"), ("surum", "<u4"), ("sira", "<u8"), ("yayin_zamani_ns", "<i8"),
+                         ("takim_no", "<i4"), ("rakip_sayisi", "<u4"), ("kapasite", "<u4"),
+                         ("saglama", "<u4")])
+IHA_DTYPE = np.dtype([("iha_enlem", "<f8"), ("iha_boylam", "<f8"), ("iha_irtifa", "<f8"),
+                      ("iha_dikilme", "<f8"), ("iha_yonelme", "<f8"), ("iha_yatis", "<f8"),
+                      ("iha_hiz", "<f8"), ("iha_batarya", "<f8"),
+                      ("iha_otonom", "<i4"), ("iha_kilitlenme", "<i4"),
+                      ("hedef_merkez_X", "<i4"), ("hedef_merkez_Y", "<i4"),
+                      ("hedef_genislik", "<i4"), ("hedef_yukseklik", "<i4")])
+RAKIP_DTYPE = np.dtype([("takim_numarasi", "<i4"), ("zaman_farki", "<i4"),
+                        ("iha_enlem", "<f8"), ("iha_boylam", "<f8"), ("iha_irtifa", "<f8"),
+                        ("iha_dikilme", "<f8"), ("iha_yonelme", "<f8"), ("iha_yatis", "<f8"),
+                        ("iha_hizi", "<f8")])
+
+BASLIK_OFSET = 0
+SIRA_OFSET = BASLIK_DTYPE.fields["sira"][1]
+SAGLAMA_OFSET = BASLIK_DTYPE.fields["saglama"][1]
+# Sağlamaya giren başlık alanları: yayın zamanı, takım no, rakip sayısı
+ZAMAN_OFSET = BASLIK_DTYPE.fields["yayin_zamani_ns"][1]
+KAPASITE_OFSET = BASLIK_DTYPE.fields["kapasite"][1]
+IHA_OFSET = 64
+RAKIP_OFSET = IHA_OFSET + IHA_DTYPE.itemsize
+
+# oku() sonucu; kendi ve rakipler okuyucunun tamponuna bakar, bir sonraki oku()'ya kadar geçerlidir
+Goruntu = collections.namedtuple("Goruntu", "sira yayin_zamani_ns takim_no kendi rakipler")
+
+
+def bellek_yolu(kopru_portu):
+    dizin = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(dizin, f"teknofest_kopru_{kopru_portu}")
+
+
+def blok_boyutu(kapasite):
+    return RAKIP_OFSET + kapasite * RAKIP_DTYPE.itemsize
+
+
+def saglama(blok, rakip_sayisi):
+    """Bloktaki (uint8 dizisi) yayın alanlarının CRC32'si; kullanılmayan rakip satırları dahil değil."""
+    crc = zlib.crc32(blok[ZAMAN_OFSET:KAPASITE_OFSET])
+    return zlib.crc32(blok[IHA_OFSET:RAKIP_OFSET + rakip_sayisi * RAKIP_DTYPE.itemsize], crc)
+
+
+class BellekYayinci:
+    """Bloğu oluşturur ve yayinla() ile günceller (tek yazıcı)."""
+
+    def __init__(self, yol, kapasite=VARSAYILAN_KAPASITE):
+        self.yol = yol
+        self.kapasite = kapasite
+        boyut = blok_boyutu(kapasite)
+        # O_TRUNC yok: çalışan okuyucuların eşlemesi boyut küçülüp SIGBUS almasın
+        fd = os.open(yol, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, boyut)
+            self._mm = mmap.mmap(fd, boyut)
+        finally:
+            os.close(fd)
+        self._baslik = np.ndarray((), BASLIK_DTYPE, buffer=self._mm, offset=BASLIK_OFSET)
+        self._sira = np.ndarray((), "<u8", buffer=self._mm, offset=SIRA_OFSET)
+        self._saglama = np.ndarray((), "<u4", buffer=self._mm, offset=SAGLAMA_OFSET)
+        self._blok = np.ndarray((boyut,), np.uint8, buffer=self._mm)
+        # Yayın önce bu özel tamponda hazırlanıp sağlaması alınır; yazma penceresi yalnızca kopyalamadır
+        self._hazirlik = np.zeros(boyut, np.uint8)
+        self._h_baslik = np.ndarray((), BASLIK_DTYPE, buffer=self._hazirlik, offset=BASLIK_OFSET)
+        self._h_kendi = np.ndarray((), IHA_DTYPE, buffer=self._hazirlik, offset=IHA_OFSET)
+        self._h_rakipler = np.ndarray((kapasite,), RAKIP_DTYPE, buffer=self._hazirlik, offset=RAKIP_OFSET)
+
+        self._sira[()] = 1
+        self._baslik["sihir"] = SIHIR
+        self._baslik["surum"] = SURUM
+        self._baslik["kapasite"] = kapasite
+        self._baslik["rakip_sayisi"] = 0
+        self._saglama[()] = saglama(self._blok, 0)
+        self._sira[()] = 2
+
+    def yayinla(self, takim_no, kendi, rakipler):
+        """
+        kendi: IhaVerisi alanları (dict), rakipler: konumBilgileri listesi.
+        Kapasiteden fazla rakip varsa ilk kapasite kadarı yazılır.
+        """
+        rakipler = rakipler[:self.kapasite]
+        adet = len(rakipler)
+        self._h_baslik["yayin_zamani_ns"] = time.time_ns()
+        self._h_baslik["takim_no"] = takim_no or 0
+        self._h_baslik["rakip_sayisi"] = adet
+        self._h_kendi[()] = tuple(kendi.get(ad, 0) for ad in IHA_DTYPE.names)
+        if adet:
+            self._h_rakipler[:adet] = [tuple(rakip.get(ad, 0) for ad in RAKIP_DTYPE.names) for rakip in rakipler]
+        crc = saglama(self._hazirlik, adet)
+        son = RAKIP_OFSET + adet * RAKIP_DTYPE.itemsize
+
+        sira = int(self._sira[()])
+        self._sira[()] = sira + 1
+        self._blok[ZAMAN_OFSET:KAPASITE_OFSET] = self._hazirlik[ZAMAN_OFSET:KAPASITE_OFSET]
+        self._blok[IHA_OFSET:son] = self._hazirlik[IHA_OFSET:son]
+        self._saglama[()] = crc
+        self._sira[()] = sira + 2
+
+    def kapat(self, sil=True):
+        self._baslik = self._sira = self._saglama = self._blok = None
+        self._mm.close()
+        if sil:
+            try:
+                os.unlink(self.yol)
+            except FileNotFoundError:
+                pass
+
+
+class BellekOkuyucu:
+    """Bloğu salt okunur eşler; oku() tutarlı (sıra ve sağlaması tutan) bir görüntü döner."""
+
+    def __init__(self, yol):
+        with open(yol, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        baslik = np.ndarray((), BASLIK_DTYPE, buffer=self._mm, offset=BASLIK_OFSET)
+        if bytes(baslik["sihir"]) != SIHIR or int(baslik["surum"]) != SURUM:
+            raise ValueError(f"{yol} bir köprü yayın bloğu değil (ya da sürümü farklı)")
+        self.kapasite = int(baslik["kapasite"])
+        if len(self._mm) < blok_boyutu(self.kapasite):
+            raise ValueError(f"{yol} beklenenden küçük")
+
+        self._sira = np.ndarray((), "<u8", buffer=self._mm, offset=SIRA_OFSET)
+        self._blok = np.ndarray((blok_boyutu(self.kapasite),), np.uint8, buffer=self._mm)
+        self._tampon = np.empty_like(self._blok)
+        self._baslik = np.ndarray((), BASLIK_DTYPE, buffer=self._tampon, offset=BASLIK_OFSET)
+        self._kendi = np.ndarray((), IHA_DTYPE, buffer=self._tampon, offset=IHA_OFSET)
+        self._rakipler = np.ndarray((self.kapasite,), RAKIP_DTYPE, buffer=self._tampon, offset=RAKIP_OFSET)
+        self.son_sira = None
+
+    def sira(self):
+        """Kopyalamadan güncel yayın sırası; son_sira'dan farklıysa yeni veri var."""
+        return int(self._sira[()])
+
+    def oku(self, deneme_sayisi=1000):
+        for deneme in range(deneme_sayisi):
+            if deneme:
+                # Yazıcı yazmanın ortasında kesilmiş olabilir (tek çekirdek); CPU'yu ona bırak
+                time.sleep(0)
+            sira = int(self._sira[()])
+            if sira & 1:
+                continue
+            np.copyto(self._tampon, self._blok)
+            if int(self._sira[()]) != sira:
+                continue
+            # Zayıf bellek sıralamasında sıra tutsa da kopya yarım olabilir
+            rakip_sayisi = min(int(self._baslik["rakip_sayisi"]), self.kapasite)
+            if saglama(self._tampon, rakip_sayisi) != int(self._baslik["saglama"]):
+                continue
+            self.son_sira = sira
+            return Goruntu(sira, int(self._baslik["yayin_zamani_ns"]), int(self._baslik["takim_no"]),
+                           self._kendi, self._rakipler[:rakip_sayisi])
+        raise TimeoutError("Tutarlı görüntü okunamadı (yazıcı sürekli yazıyor)")
+
+    def kapat(self):
+        self._sira = self._blok = None
+        self._mm.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Köprü yayın bloğunu okur / okuma hızını ölçer")
+    parser.add_argument("--port", type=int, default=8002, help="Köprü portu (blok adı buradan gelir)")
+    parser.add_argument("--yol", help="Blok dosyası (verilmezse --port'tan)")
+    parser.add_argument("--olc", type=float, default=0, help="Bu kadar saniye art arda okuyup hızı yaz")
+    args = parser.parse_args()
+
+    okuyucu = BellekOkuyucu(args.yol or bellek_yolu(args.port))
+    if args.olc > 0:
+        adet, bitis = 0, time.perf_counter() + args.olc
+        while time.perf_counter() < bitis:
+            okuyucu.oku()
+            adet += 1
+        print(f"{adet / args.olc:,.0f} okuma/s")
+    goruntu = okuyucu.oku()
+    yas_ms = (time.time_ns() - goruntu.yayin_zamani_ns) / 1e6
+    print(f"sıra={goruntu.sira} takım={goruntu.takim_no} yaş={yas_ms:.1f} ms")
+    print("kendi:", {ad: goruntu.kendi[ad].item() for ad in IHA_DTYPE.names})
+    for rakip in goruntu.rakipler:
+        print("rakip:", {ad: rakip[ad].item() for ad in RAKIP_DTYPE.names})
+
+
+if __name__ == "__main__":
+    main()
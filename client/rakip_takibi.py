@@ -0,0 +1,195 @@
+"""
+Rakip İHA'ların anlık konum tahmini.
+
+Sunucunun konumBilgileri listesindeki her konum, rakibin son telemetrisidir
+ve zaman_farki (ms) kadar eskidir (5 s'ye kadar). RakipTakipcisi her takım
+için son birkaç gerçek konumu (fix) saklar; ardışık fix'lerden ve rakibin
+bildirdiği iha_hizi / iha_yonelme'den hız vektörünü kestirir ve
+"X takımı şimdi / t anında nerede" sorusuna dış değerlemeyle cevap verir.
+
+Zamanlar bu makinenin time.monotonic() saatindedir: fix anı, cevabın
+alındığı an eksi zaman_farki'dır (tek yönlü ağ gecikmesi ihmal edilir).
+Sunucu aynı konumu bir sonraki telemetriye kadar tekrar tekrar döner;
+yeni bir fix sayılmaz. Tekrar, içerikten (konum ve duruş alanları son fix'le
+aynı) anlaşılır; cevap gecikmesi zamanı kaydırsa da tekrar yeni fix olmaz.
+Her güncelleme takım başına sabit sürelidir.
+
+Listeden düşen rakibin (sunucuda zaman aşımı, bağlantı kopması, düşürülme)
+izi silinir: art arda KAYIP_GUNCELLEME_SAYISI güncellemede görünmezse ya da
+son fix'i IZ_ZAMAN_ASIMI_S'den eskiyse. Bayat iz, silinmeden önce de
+sorgulara görünmez; donmuş bir tahmin rakip olarak sunulmaz.
+
+Konumlar arası fark yerel düz dünya yaklaşımıyla metreye çevrilir
+(yarışma alanı birkaç km; hata ihmal edilebilir).
+"""
+import collections
+import math
+import time
+
+METRE_PER_DERECE = 111_320.0
+# Takım başına saklanan fix sayısı (geçmişe dönük sorgular için)
+GECMIS_BOYUTU = 10
+# Bu alanların hepsi son fix'le aynıysa konum aynı paketin tekrarıdır
+FIX_ALANLARI = ("iha_enlem", "iha_boylam", "iha_irtifa", "iha_dikilme", "iha_yonelme", "iha_yatis", "iha_hizi")
+# Rakip en fazla 2 Hz gönderir; ağ gecikmesi iki fix'i bundan yakın gösterse de
+# hız bu aralıkla hesaplanır (sunucudaki TELEMETRI_MIN_ARALIK_MS)
+MIN_FIX_ARALIGI_S = 0.49
+# Fix'lerden türetilen hız ile bildirilen hızın karışım ağırlığı (1: yalnızca fix)
+FIX_AGIRLIGI = 0.5
+# Hız kestiriminin üstel yumuşatma katsayısı (1: yalnızca son ölçüm)
+YUMUSATMA = 0.6
+# Bundan uzun süre ileriye dış değerleme yapılmaz; konum bu sürede sabitlenir
+AZAMI_TAHMIN_S = 6.0
+# Art arda bu kadar konumBilgileri'nde görünmeyen takımın izi silinir
+KAYIP_GUNCELLEME_SAYISI = 3
+# Son fix'i bundan eski iz bayattır (dış değerleme sınırına dayanmış, konum donmuş)
+IZ_ZAMAN_ASIMI_S = AZAMI_TAHMIN_S
+
+
+class RakipIzi:
+    """Tek takımın fix geçmişi ve hız kestirimi (kuzey/doğu/dikey, m/s)."""
+
+    __slots__ = ("takim_numarasi", "gecmis", "son", "v_kuzey", "v_dogu", "v_dikey", "fix_sayisi", "kayip")
+
+    def __init__(self, takim_numarasi):
+        self.takim_numarasi = takim_numarasi
+        self.gecmis = collections.deque(maxlen=GECMIS_BOYUTU)  # (zaman, konum dict)
+        self.son = None
+        self.v_kuzey = self.v_dogu = self.v_dikey = 0.0
+        self.fix_sayisi = 0
+        self.kayip = 0  # Art arda görünmediği güncelleme sayısı
+
+    def bayat_mi(self, simdi):
+        return simdi - self.son[0] > IZ_ZAMAN_ASIMI_S
+
+    def fix_ekle(self, zaman, konum):
+        """Yeni fix ise ekleyip True, önceki fix'in tekrarıysa False döner."""
+        if self.son is not None:
+            onceki_zaman, onceki = self.son
+            if all(konum.get(ad) == onceki.get(ad) for ad in FIX_ALANLARI):
+                return False
+
+        hiz = konum.get("iha_hizi", 0.0)
+        yon = math.radians(konum.get("iha_yonelme", 0.0))
+        v_kuzey, v_dogu, v_dikey = hiz * math.cos(yon), hiz * math.sin(yon), 0.0
+        if self.son is not None:
+            dt = max(zaman - onceki_zaman, MIN_FIX_ARALIGI_S)
+            kuzey, dogu = _fark_metre(onceki, konum)
+            fix_kuzey, fix_dogu = kuzey / dt, dogu / dt
+            v_kuzey = FIX_AGIRLIGI * fix_kuzey + (1 - FIX_AGIRLIGI) * v_kuzey
+            v_dogu = FIX_AGIRLIGI * fix_dogu + (1 - FIX_AGIRLIGI) * v_dogu
+            v_dikey = (konum.get("iha_irtifa", 0.0) - onceki.get("iha_irtifa", 0.0)) / dt
+        if self.fix_sayisi == 0:
+            self.v_kuzey, self.v_dogu, self.v_dikey = v_kuzey, v_dogu, v_dikey
+        else:
+            self.v_kuzey += YUMUSATMA * (v_kuzey - self.v_kuzey)
+            self.v_dogu += YUMUSATMA * (v_dogu - self.v_dogu)
+            self.v_dikey += YUMUSATMA * (v_dikey - self.v_dikey)
+
+        self.son = (zaman, konum)
+        self.gecmis.append(self.son)
+        self.fix_sayisi += 1
+        return True
+
+    def tahmin(self, zaman):
+        """zaman anındaki konum: son fix'ten sonrası dış değerleme, geçmiş içi ara değerleme."""
+        fix_zamani, fix = self.son
+        if zaman < fix_zamani and len(self.gecmis) > 1:
+            return self._ara_deger(zaman)
+        dt = max(0.0, min(zaman - fix_zamani, AZAMI_TAHMIN_S))
+        enlem = fix["iha_enlem"] + self.v_kuzey * dt / METRE_PER_DERECE
+        boylam = fix["iha_boylam"] + self.v_dogu * dt / _boylam_metre_per_derece(fix["iha_enlem"])
+        return {
+            "takim_numarasi": self.takim_numarasi,
+            "iha_enlem": enlem,
+            "iha_boylam": boylam,
+            "iha_irtifa": fix.get("iha_irtifa", 0.0) + self.v_dikey * dt,
+            "iha_hizi": math.hypot(self.v_kuzey, self.v_dogu),
+            "iha_yonelme": math.degrees(math.atan2(self.v_dogu, self.v_kuzey)) % 360,
+            "dikey_hiz": self.v_dikey,
+            "fix_yasi_s": zaman - fix_zamani,
+        }
+
+    def _ara_deger(self, zaman):
+        gecmis = self.gecmis
+        if zaman <= gecmis[0][0]:
+            onceki = sonraki = gecmis[0]
+        else:
+            onceki = sonraki = gecmis[-1]
+            for sira in range(len(gecmis) - 1, 0, -1):
+                if gecmis[sira - 1][0] <= zaman:
+                    onceki, sonraki = gecmis[sira - 1], gecmis[sira]
+                    break
+        (t0, k0), (t1, k1) = onceki, sonraki
+        oran = (zaman - t0) / (t1 - t0) if t1 > t0 else 0.0
+        kuzey, dogu = _fark_metre(k0, k1)
+        dt = t1 - t0
+        return {
+            "takim_numarasi": self.takim_numarasi,
+            "iha_enlem": k0["iha_enlem"] + (k1["iha_enlem"] - k0["iha_enlem"]) * oran,
+            "iha_boylam": k0["iha_boylam"] + (k1["iha_boylam"] - k0["iha_boylam"]) * oran,
+            "iha_irtifa": k0.get("iha_irtifa", 0.0) + (k1.get("iha_irtifa", 0.0) - k0.get("iha_irtifa", 0.0)) * oran,
+            "iha_hizi": math.hypot(kuzey, dogu) / dt if dt > 0 else k0.get("iha_hizi", 0.0),
+            "iha_yonelme": math.degrees(math.atan2(dogu, kuzey)) % 360 if dt > 0 else k0.get("iha_yonelme", 0.0),
+            "dikey_hiz": (k1.get("iha_irtifa", 0.0) - k0.get("iha_irtifa", 0.0)) / dt if dt > 0 else 0.0,
+            "fix_yasi_s": zaman - self.son[0],
+        }
+
+
+class RakipTakipcisi:
+    """
+    takipci = RakipTakipcisi()
+    takipci.guncelle(cevap["konumBilgileri"])       # her telemetri cevabında
+    takipci.konum(5)                                  # 5. takım şimdi nerede
+    """
+
+    def __init__(self):
+        self.izler = {}
+        self.guncelleme_sayisi = 0
+
+    def guncelle(self, konum_bilgileri, alinma_zamani=None):
+        """Bir konumBilgileri listesini işler; listeden düşen izleri siler, yeni fix sayısını döner."""
+        if alinma_zamani is None:
+            alinma_zamani = time.monotonic()
+        yeni = 0
+        gorulen = set()
+        for konum in konum_bilgileri:
+            takim = konum["takim_numarasi"]
+            gorulen.add(takim)
+            iz = self.izler.get(takim)
+            if iz is None:
+                iz = self.izler[takim] = RakipIzi(takim)
+            iz.kayip = 0
+            if iz.fix_ekle(alinma_zamani - konum.get("zaman_farki", 0) / 1000, konum):
+                yeni += 1
+        for takim, iz in list(self.izler.items()):
+            if takim not in gorulen:
+                iz.kayip += 1
+            if iz.kayip >= KAYIP_GUNCELLEME_SAYISI or iz.bayat_mi(alinma_zamani):
+                del self.izler[takim]
+        self.guncelleme_sayisi += 1
+        return yeni
+
+    def konum(self, takim_numarasi, zaman=None):
+        """Takımın zaman (varsayılan: şimdi) anındaki tahmini konumu; bilinmiyor ya da iz bayatsa None."""
+        simdi = time.monotonic()
+        iz = self.izler.get(takim_numarasi)
+        if iz is None or iz.bayat_mi(simdi):
+            return None
+        return iz.tahmin(simdi if zaman is None else zaman)
+
+    def tum_konumlar(self, zaman=None):
+        simdi = time.monotonic()
+        zaman = simdi if zaman is None else zaman
+        return [iz.tahmin(zaman) for iz in self.izler.values() if not iz.bayat_mi(simdi)]
+
+
+def _boylam_metre_per_derece(enlem):
+    return METRE_PER_DERECE * math.cos(math.radians(enlem))
+
+
+def _fark_metre(k0, k1):
+    """k0'dan k1'e (kuzey, doğu) metre."""
+    kuzey = (k1["iha_enlem"] - k0["iha_enlem"]) * METRE_PER_DERECE
+    dogu = (k1["iha_boylam"] - k0["iha_boylam"]) * _boylam_metre_per_derece((k0["iha_enlem"] + k1["iha_enlem"]) / 2)
+    return kuzey, dogu
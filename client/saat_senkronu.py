@@ -0,0 +1,108 @@
+"""
+Sunucu saatine göre yerel saat farkı (ofset) ve gidiş-dönüş süresi (RTT)
+kestirimi; NTP'nin saat filtresi yaklaşımı.
+
+Her örnek: isteğin gönderildiği (t0) ve cevabın alındığı (t1) yerel an ile
+sunucunun /api/sunucusaati cevabı (T). Sunucu saati isteğin ortasında
+okunmuş kabul edilir:
+
+    ofset = T - (t0 + t1) / 2,   rtt = t1 - t0,   hata <= rtt / 2 (+ 0.5 ms)
+
+Son pencere_boyutu örnekten RTT'si en küçük olanın ofseti kullanılır:
+kuyrukta / event loop'ta bekleyen örnekler daha büyük RTT'ye ve daha geniş
+hata sınırına sahiptir, seçilmez. Pencere kaydıkça saat kayması izlenir.
+
+Sunucu saati milisaniyeye kırpılmıştır (ve yıl/ay içermez); ms'nin ortası
+alınır, gün değişimi en yakın güne yuvarlanarak çözülür.
+
+Yalnızca standart kütüphane: competitor_client.py da kullanır. Köprü
+istemcileri saat_takip_dongusu ile örnekleri arka planda toplar.
+"""
+import asyncio
+import collections
+import time
+from datetime import datetime, timedelta
+
+
+def sunucu_saatini_coz(sunucu_saati, referans):
+    """{"gun", "saat", "dakika", "saniye", "milisaniye"} -> referans'a en yakın datetime."""
+    aday = referans.replace(hour=sunucu_saati["saat"], minute=sunucu_saati["dakika"],
+                            second=sunucu_saati["saniye"],
+                            microsecond=sunucu_saati["milisaniye"] * 1000 + 500)
+    fark = aday - referans
+    if fark > timedelta(hours=12):
+        aday -= timedelta(days=1)
+    elif fark < -timedelta(hours=12):
+        aday += timedelta(days=1)
+    return aday
+
+
+class SaatKestirici:
+    """
+    saat = SaatKestirici()
+    t0 = time.time(); cevap = ...GET /api/sunucusaati...; t1 = time.time()
+    saat.ornek_ekle(t0, cevap, t1)
+    saat.simdi()        # sunucu saatine göre şimdi (datetime)
+    """
+
+    def __init__(self, pencere_boyutu=16):
+        self.ornekler = collections.deque(maxlen=pencere_boyutu)  # (orta, ofset_s, rtt_s)
+        self.ofset_s = 0.0
+        self.rtt_s = None
+        self.ornek_sayisi = 0
+
+    @property
+    def hazir(self):
+        return self.rtt_s is not None
+
+    def ornek_ekle(self, gonderim, sunucu_saati, alinma):
+        """gonderim/alinma: time.time() cinsinden yerel anlar."""
+        if alinma < gonderim:
+            return  # yerel saat geri atlamış; örnek anlamsız
+        orta = (gonderim + alinma) / 2
+        sunucu = sunucu_saatini_coz(sunucu_saati, datetime.fromtimestamp(orta)).timestamp()
+        self.ornekler.append((orta, sunucu - orta, alinma - gonderim))
+        self.ornek_sayisi += 1
+        _, self.ofset_s, self.rtt_s = min(self.ornekler, key=lambda ornek: ornek[2])
+
+    def simdi(self):
+        return datetime.fromtimestamp(time.time() + self.ofset_s)
+
+    def sunucu_saatine_cevir(self, yerel_dt):
+        """Yerel saatle alınmış bir anı sunucu saatine çevirir (ör. kilitlenme bitişi)."""
+        return yerel_dt + timedelta(seconds=self.ofset_s)
+
+    def ozet(self):
+        if not self.hazir:
+            return {"ornek_sayisi": self.ornek_sayisi}
+        rttler = sorted(ornek[2] * 1000 for ornek in self.ornekler)
+        ofsetler = [ornek[1] * 1000 for ornek in self.ornekler]
+        ortalama = sum(ofsetler) / len(ofsetler)
+        return {
+            "ornek_sayisi": self.ornek_sayisi,
+            "ofset_ms": round(self.ofset_s * 1000, 3),
+            "belirsizlik_ms": round(self.rtt_s * 1000 / 2 + 0.5, 3),
+            "rtt_ms": {"secilen": round(self.rtt_s * 1000, 3), "min": round(rttler[0], 3),
+                       "p50": round(rttler[len(rttler) // 2], 3), "max": round(rttler[-1], 3)},
+            # Penceredeki ofsetlerin standart sapması (ağ gecikmesi dalgalanması)
+            "ofset_sapmasi_ms": round((sum((o - ortalama) ** 2 for o in ofsetler) / len(ofsetler)) ** 0.5, 3),
+        }
+
+
+async def saat_takip_dongusu(tasima, saat, aralik_s=2.0, ilk_ornek_sayisi=8, ilk_aralik_s=0.05):
+    """
+    tasima (bkz. tasima.py) üzerinden /api/sunucusaati'yi örnekler: önce
+    kısa aralıklarla ilk_ornek_sayisi kez, sonra aralik_s'de bir.
+    """
+    sayac = 0
+    while True:
+        gonderim = time.time()
+        try:
+            cevap = await tasima.get("/api/sunucusaati", zaman_asimi_s=1.0)
+            alinma = time.time()
+            if cevap.status_code == 200:
+                saat.ornek_ekle(gonderim, cevap.json(), alinma)
+        except Exception:
+            pass
+        sayac += 1
+        await asyncio.sleep(ilk_aralik_s if sayac < ilk_ornek_sayisi else aralik_s)
@@ -0,0 +1,204 @@
+"""
+Köprü istemcilerinin (client_1.py, client_2.py) ortak taşıma katmanı.
+
+- Tasima: kalıcı, havuzlanmış bağlantılarla async HTTP (httpx.AsyncClient).
+  Her paket için yeni TCP bağlantısı açılmaz; her isteğin gidiş-dönüş
+  süresi (RTT) kaydedilir.
+- Zamanlayici: telemetriyi mutlak zaman çizelgesine (t0 + k * periyot)
+  göre gönderir. Gönderim/cevap süresi periyoda eklenmez, hız kaymaz.
+  Sunucu aynı takımın iki paketi arasında en az SUNUCU_MIN_ARALIK_S ister;
+  bir önceki paket gecikmiş ya da ağ gecikmesi dalgalanıyorsa o gönderim
+  gereken kadar ertelenir ve sonraki paket yine çizelgeye döner.
+"""
+import asyncio
+import collections
+import time
+
+import httpx
+
+# Sunucunun 2 Hz kuralında iki paket arasında istediği en kısa süre (TELEMETRI_MIN_ARALIK_MS)
+SUNUCU_MIN_ARALIK_S = 0.490
+# Ardışık paketlerin sunucuya varış aralığı için en az güvenlik payı
+TABAN_PAY_S = 0.005
+# 400 (hız sınırı) alındıkça payın artırılabileceği üst sınır
+AZAMI_PAY_S = 0.100
+
+
+def ulasmis_olabilir(hata):
+    """
+    İstek gönderildi ama cevap süresinde gelmedi mi (httpx.ReadTimeout).
+    Bu durumda sunucu paketi işlemiş olabilir; bağlantı kurulamadıysa işlememiştir.
+    """
+    return isinstance(hata, httpx.ReadTimeout)
+
+
+class Istatistik:
+    """Son pencere_boyutu ölçümün özeti (ms)."""
+
+    def __init__(self, pencere_boyutu=1000):
+        self.degerler = collections.deque(maxlen=pencere_boyutu)
+        self.adet = 0
+
+    def ekle(self, deger_ms):
+        self.degerler.append(deger_ms)
+        self.adet += 1
+
+    def ozet(self):
+        if not self.degerler:
+            return {"adet": self.adet}
+        sirali = sorted(self.degerler)
+        n = len(sirali)
+        return {
+            "adet": self.adet,
+            "ortalama": round(sum(sirali) / n, 3),
+            "min": round(sirali[0], 3),
+            "p50": round(sirali[n // 2], 3),
+            "p95": round(sirali[min(n - 1, int(n * 0.95))], 3),
+            "p99": round(sirali[min(n - 1, int(n * 0.99))], 3),
+            "max": round(sirali[-1], 3),
+        }
+
+
+class Tasima:
+    """
+    Kalıcı bağlantılı async HTTP istemcisi; istekler RTT istatistiğine yazılır.
+    yerel_adres verilirse bağlantılar o kaynak IP'den açılır (sunucu oturumu
+    IP ile eşleştirir).
+    """
+
+    def __init__(self, taban_url, zaman_asimi_s=2.0, baglanti_sayisi=4, yerel_adres=None):
+        self.rtt = Istatistik()
+        self.hata_sayisi = 0
+        sinirlar = httpx.Limits(max_connections=baglanti_sayisi, max_keepalive_connections=baglanti_sayisi,
+                                keepalive_expiry=30.0)
+        self._istemci = httpx.AsyncClient(
+            base_url=taban_url,
+            timeout=zaman_asimi_s,
+            transport=httpx.AsyncHTTPTransport(limits=sinirlar, local_address=yerel_adres),
+        )
+
+    async def istek(self, yontem, yol, json=None, zaman_asimi_s=None, icerik=None, basliklar=None):
+        """
+        httpx.Response döner; bağlantı/zaman aşımı hatasında httpx.HTTPError fırlatır.
+        icerik: JSON yerine ham gövde (bytes; ör. /api/telemetri_gonder_ikili).
+        """
+        secenekler = {} if zaman_asimi_s is None else {"timeout": zaman_asimi_s}
+        if icerik is not None:
+            secenekler.update(content=icerik, headers=basliklar)
+        baslangic = time.perf_counter()
+        try:
+            cevap = await self._istemci.request(yontem, yol, json=json, **secenekler)
+        except httpx.HTTPError:
+            self.hata_sayisi += 1
+            raise
+        self.rtt.ekle((time.perf_counter() - baslangic) * 1000)
+        return cevap
+
+    async def post(self, yol, json=None, zaman_asimi_s=None):
+        return await self.istek("POST", yol, json, zaman_asimi_s)
+
+    async def get(self, yol, zaman_asimi_s=None):
+        return await self.istek("GET", yol, None, zaman_asimi_s)
+
+    async def kapat(self):
+        await self._istemci.aclose()
+
+
+class Zamanlayici:
+    """
+    Mutlak son tarihli periyodik zamanlayıcı.
+
+        zamanlayici = Zamanlayici(hz=2)
+        while True:
+            await zamanlayici.bekle()
+            ... gönder ...
+            zamanlayici.tamamlandi()
+
+    bekle() bir sonraki çizelge anına kadar uyur. Önceki gönderimden bu yana
+    min_aralik_s + pay geçmemişse biraz daha bekler. pay, taban payın
+    üstüne önceki paketin RTT'sidir: önceki paket sunucuya en fazla bu kadar
+    geç varmış olabilir; bu paket hızlı varsa bile sunucu ikisini 490 ms'den
+    yakın görmez.
+    Bir periyottan fazla geride kalınırsa kaçırılan anlar toplu gönderilmez,
+    atlanır.
+
+    Periyot min_aralik_s + pay'dan kısaysa (ör. 2 Hz'de RTT ~5 ms'yi
+    aşarsa) sunucu kuralı önceliklidir; gerçekleşen hız biraz düşer.
+    """
+
+    def __init__(self, hz, min_aralik_s=SUNUCU_MIN_ARALIK_S, taban_pay_s=TABAN_PAY_S):
+        if hz <= 0:
+            raise ValueError("hz pozitif olmalı")
+        self.periyot_s = 1.0 / hz
+        self.min_aralik_s = min_aralik_s
+        self.taban_pay_s = taban_pay_s
+        self._sonraki = None
+        self._son_gonderim = None
+        self._son_rtt_ms = None
+        self._ilk_gonderim = None
+        self.gonderim_sayisi = 0
+        self.atlanan = 0
+        self.ertelenen = 0
+        self.sapma = Istatistik()   # gönderim anı - çizelge anı (ms)
+        self.aralik = Istatistik()  # ardışık iki gönderim arası (ms)
+
+    def _pay_s(self):
+        pay = self.taban_pay_s
+        if self._son_rtt_ms is not None:
+            # Önceki paketin gidiş süresi en fazla RTT'si kadardır; bu paketinki 0'a yakın olabilir
+            pay += self._son_rtt_ms / 1000
+        return pay
+
+    async def bekle(self):
+        simdi = time.monotonic()
+        if self._sonraki is None:
+            self._sonraki = simdi
+        elif simdi - self._sonraki > self.periyot_s:
+            kacan = int((simdi - self._sonraki) / self.periyot_s)
+            self._sonraki += kacan * self.periyot_s
+            self.atlanan += kacan
+
+        hedef = self._sonraki
+        if self._son_gonderim is not None:
+            en_erken = self._son_gonderim + self.min_aralik_s + self._pay_s()
+            if en_erken > hedef:
+                hedef = en_erken
+                self.ertelenen += 1
+        bekle_s = hedef - time.monotonic()
+        if bekle_s > 0:
+            await asyncio.sleep(bekle_s)
+
+        simdi = time.monotonic()
+        self.sapma.ekle((simdi - self._sonraki) * 1000)
+        if self._son_gonderim is not None:
+            self.aralik.ekle((simdi - self._son_gonderim) * 1000)
+        else:
+            self._ilk_gonderim = simdi
+        self._son_gonderim = simdi
+        self._sonraki += self.periyot_s
+        self.gonderim_sayisi += 1
+        return simdi
+
+    def tamamlandi(self):
+        """
+        Gönderim bitince (cevap ya da hata) çağrılır. bekle()'den bu yana geçen
+        süre paketin RTT'si sayılır ve bir sonraki payı belirler.
+        """
+        self._son_rtt_ms = (time.monotonic() - self._son_gonderim) * 1000
+
+    def red_bildir(self):
+        """Sunucu yine de 400 (hız sınırı) döndüyse taban pay artırılır."""
+        self.taban_pay_s = min(AZAMI_PAY_S, self.taban_pay_s * 2)
+
+    def ozet(self):
+        gecen = (self._son_gonderim - self._ilk_gonderim) if self.gonderim_sayisi > 1 else 0
+        return {
+            "hedef_hz": round(1.0 / self.periyot_s, 3),
+            "gerceklesen_hz": round((self.gonderim_sayisi - 1) / gecen, 3) if gecen > 0 else None,
+            "gonderim": self.gonderim_sayisi,
+            "atlanan": self.atlanan,
+            "ertelenen": self.ertelenen,
+            "pay_ms": round(self._pay_s() * 1000, 3),
+            "sapma_ms": self.sapma.ozet(),
+            "aralik_ms": self.aralik.ozet(),
+        }
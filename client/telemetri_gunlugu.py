@@ -0,0 +1,238 @@
+"""
+Köprü istemcilerinin yerel telemetri günlüğü.
+
+- TelemetriGunlugu: üretilen her telemetri paketini ve sunucunun cevabını
+  yalnızca-ekleme bir SQLite tablosuna yazar. Event loop'taki maliyet bir
+  kuyruğa koymaktır; JSON'a çevirme ve toplu yazma (executemany + tek
+  commit) arka plandaki thread'de yapılır (sunucudaki TelemetriYazici gibi).
+- Gönderilemeyen paketler sunucuya tekrar gönderilmez; yalnızca
+  --gonderilemeyen ile dışa aktarılır.
+- tara / ozet / disa_aktar: uçuş sonrası analiz (komut satırından da).
+
+Kullanım:
+    python telemetri_gunlugu.py telemetri_gunlugu_8002.db
+    python telemetri_gunlugu.py telemetri_gunlugu_8002.db --gonderilemeyen --disa-aktar kayip.csv
+"""
+import argparse
+import csv
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+SEMA = """
+CREATE TABLE IF NOT EXISTS gunluk (
+    id INTEGER PRIMARY KEY,
+    olusturma_ms INTEGER NOT NULL,          -- paketin hazırlandığı an (yerel saat, epoch ms)
+    rtt_ms REAL,
+    durum INTEGER,                          -- HTTP durum kodu; 0: cevap yok; -1: cevap zaman aşımı; NULL: WebSocket
+    paket TEXT NOT NULL,
+    cevap BLOB
+)"""
+EKLE_SQL = "INSERT INTO gunluk (olusturma_ms, rtt_ms, durum, paket, cevap) VALUES (?, ?, ?, ?, ?)"
+# İstek gönderildi ama cevap süresinde gelmedi; sunucu paketi işlemiş olabilir
+ZAMAN_ASIMI = -1
+# gonderilemedi() ile aynı kural
+GONDERILEMEYEN_KOSULU = f"durum IS NOT NULL AND durum NOT IN (200, 400, {ZAMAN_ASIMI})"
+
+
+def simdi_ms():
+    return time.time_ns() // 1_000_000
+
+
+def gonderilemedi(durum):
+    """
+    Paket sunucuya ulaşmadı ya da işlenmedi mi (bağlantı yok, 401, 5xx).
+    400 paketin kendisi hakkında bir karardır (format / hız sınırı). Cevap
+    zaman aşımında (ZAMAN_ASIMI) paket işlenmiş olabilir; gönderilemedi sayılmaz.
+    """
+    return durum is not None and durum not in (200, 400, ZAMAN_ASIMI)
+
+
+class TelemetriGunlugu:
+    """Yalnızca-ekleme paket günlüğü; kaydet() event loop'tan çağrılır, yazma ayrı thread'dedir."""
+
+    _DUR = object()
+
+    def __init__(self, db_yolu, kuyruk_boyutu=10000, parti_boyutu=200, yazma_araligi_s=1.0):
+        self.db_yolu = db_yolu
+        self.parti_boyutu = parti_boyutu
+        self.yazma_araligi_s = yazma_araligi_s
+        self.kuyruk = queue.Queue(maxsize=kuyruk_boyutu)
+        self.atilan = 0
+        self._thread = None
+
+    def baslat(self):
+        if self._thread is not None:
+            return
+        # Tablo thread başlamadan oluşsun: tara() hemen çağrılabilir
+        conn = sqlite3.connect(self.db_yolu)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(SEMA)
+        conn.close()
+        self._thread = threading.Thread(target=self._calis, name="telemetri-gunlugu", daemon=True)
+        self._thread.start()
+
+    def kaydet(self, olusturma_ms, paket, durum, rtt_ms=None, cevap=None):
+        """paket: gönderilen dict (sonradan değiştirilmemeli); cevap: ham gövde (bytes)."""
+        try:
+            self.kuyruk.put_nowait((olusturma_ms, rtt_ms, durum, paket, cevap))
+        except queue.Full:
+            # Event loop disk için beklemez; yazıcı yetişemiyorsa kayıt atılır ve sayılır
+            self.atilan += 1
+
+    def durdur(self):
+        """Kuyrukta kalanları yazıp thread'i kapatır."""
+        if self._thread is None:
+            return
+        self.kuyruk.put(self._DUR)
+        self._thread.join()
+        self._thread = None
+
+    def _calis(self):
+        conn = sqlite3.connect(self.db_yolu)
+        # Günlük kaybı en fazla son commit'ler; her partide fsync beklenmez
+        conn.execute("PRAGMA synchronous=NORMAL")
+        calisiyor = True
+        while calisiyor:
+            kayit = self.kuyruk.get()
+            if kayit is self._DUR:
+                break
+            parti = [kayit]
+            son_zaman = time.monotonic() + self.yazma_araligi_s
+            while len(parti) < self.parti_boyutu:
+                kalan = son_zaman - time.monotonic()
+                try:
+                    kayit = self.kuyruk.get(timeout=kalan) if kalan > 0 else self.kuyruk.get_nowait()
+                except queue.Empty:
+                    break
+                if kayit is self._DUR:
+                    calisiyor = False
+                    break
+                parti.append(kayit)
+            self._yaz(conn, parti)
+
+        kalanlar = []
+        while True:
+            try:
+                kayit = self.kuyruk.get_nowait()
+            except queue.Empty:
+                break
+            if kayit is not self._DUR:
+                kalanlar.append(kayit)
+        if kalanlar:
+            self._yaz(conn, kalanlar)
+        conn.close()
+
+    def _yaz(self, conn, parti):
+        satirlar = [(olusturma_ms, rtt_ms, durum, json.dumps(paket, separators=(",", ":")), cevap)
+                    for olusturma_ms, rtt_ms, durum, paket, cevap in parti]
+        try:
+            conn.executemany(EKLE_SQL, satirlar)
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"Telemetri günlüğü yazılamadı ({len(parti)} satır): {e}")
+
+
+def tara(db_yolu, baslangic_ms=None, bitis_ms=None, yalnizca_gonderilemeyen=False):
+    """Günlük satırlarını (sqlite3.Row) eklenme sırasıyla verir; dosya salt okunur açılır."""
+    kosullar, parametreler = [], []
+    if baslangic_ms is not None:
+        kosullar.append("olusturma_ms >= ?")
+        parametreler.append(baslangic_ms)
+    if bitis_ms is not None:
+        kosullar.append("olusturma_ms < ?")
+        parametreler.append(bitis_ms)
+    if yalnizca_gonderilemeyen:
+        kosullar.append(GONDERILEMEYEN_KOSULU)
+    sql = "SELECT * FROM gunluk"
+    if kosullar:
+        sql += " WHERE " + " AND ".join(kosullar)
+    conn = sqlite3.connect(f"file:{db_yolu}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield from conn.execute(sql + " ORDER BY id", parametreler)
+    finally:
+        conn.close()
+
+
+def ozet(db_yolu):
+    conn = sqlite3.connect(f"file:{db_yolu}?mode=ro", uri=True)
+    try:
+        adet, ilk, son = conn.execute("SELECT COUNT(*), MIN(olusturma_ms), MAX(olusturma_ms) FROM gunluk").fetchone()
+        durumlar = {str(durum): sayi for durum, sayi in
+                    conn.execute("SELECT durum, COUNT(*) FROM gunluk GROUP BY durum ORDER BY durum")}
+        gonderilemeyen = conn.execute(f"SELECT COUNT(*) FROM gunluk WHERE {GONDERILEMEYEN_KOSULU}").fetchone()[0]
+        rtt_adet = conn.execute("SELECT COUNT(*) FROM gunluk WHERE rtt_ms IS NOT NULL").fetchone()[0]
+        rtt = {}
+        for ad, oran in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)):
+            if rtt_adet:
+                sira = min(rtt_adet - 1, int(rtt_adet * oran))
+                rtt[ad] = round(conn.execute("SELECT rtt_ms FROM gunluk WHERE rtt_ms IS NOT NULL "
+                                             "ORDER BY rtt_ms LIMIT 1 OFFSET ?", (sira,)).fetchone()[0], 3)
+    finally:
+        conn.close()
+    return {
+        "paket": adet,
+        "sure_s": round((son - ilk) / 1000, 3) if adet else 0,
+        "durum_kodlari": durumlar,
+        "gonderilemeyen": gonderilemeyen,
+        "rtt_ms": rtt,
+    }
+
+
+def _duzlestir(paket, onek=""):
+    duz = {}
+    for anahtar, deger in paket.items():
+        if isinstance(deger, dict):
+            duz.update(_duzlestir(deger, f"{onek}{anahtar}_"))
+        else:
+            duz[f"{onek}{anahtar}"] = deger
+    return duz
+
+
+def disa_aktar(db_yolu, cikti_yolu, **tarama):
+    """.csv: paket alanları sütun olarak (iç içe alanlar alt_çizgiyle); diğer uzantılar: JSON satırları."""
+    adet = 0
+    with open(cikti_yolu, "w", newline="", encoding="utf-8") as f:
+        yazici = None
+        for satir in tara(db_yolu, **tarama):
+            kayit = {"id": satir["id"], "olusturma_ms": satir["olusturma_ms"], "durum": satir["durum"],
+                     "rtt_ms": satir["rtt_ms"]}
+            paket = json.loads(satir["paket"])
+            if cikti_yolu.endswith(".csv"):
+                kayit.update(_duzlestir(paket))
+                if yazici is None:
+                    yazici = csv.DictWriter(f, fieldnames=list(kayit), extrasaction="ignore")
+                    yazici.writeheader()
+                yazici.writerow(kayit)
+            else:
+                kayit["paket"] = paket
+                cevap = satir["cevap"]
+                kayit["cevap"] = cevap.decode("utf-8", "replace") if cevap is not None else None
+                f.write(json.dumps(kayit, ensure_ascii=False) + "\n")
+            adet += 1
+    return adet
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db", help="Günlük dosyası (telemetri_gunlugu_<port>.db)")
+    parser.add_argument("--disa-aktar", help="Çıktı dosyası (.csv ya da .jsonl)")
+    parser.add_argument("--baslangic-ms", type=int, help="olusturma_ms alt sınırı (epoch ms)")
+    parser.add_argument("--bitis-ms", type=int, help="olusturma_ms üst sınırı (epoch ms, hariç)")
+    parser.add_argument("--gonderilemeyen", action="store_true", help="Yalnızca sunucuya ulaşmayan paketler")
+    args = parser.parse_args()
+
+    if args.disa_aktar:
+        adet = disa_aktar(args.db, args.disa_aktar, baslangic_ms=args.baslangic_ms, bitis_ms=args.bitis_ms,
+                          yalnizca_gonderilemeyen=args.gonderilemeyen)
+        print(f"{adet} satır -> {args.disa_aktar}")
+    else:
+        print(json.dumps(ozet(args.db), indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import asyncio
+import collections
+
+
+class AkisKutusu:
+    """
+    Bir /api/telemetri_akisi bağlantısının giden kutusu. Sokete yalnızca bu
+    kutunun kendi görevi yazar; böylece paket cevapları ile konumBilgileri
+    yayını aynı sokette iç içe geçmez ve yavaş bir abone yayın turunu
+    (diğer aboneleri) bekletmez.
+
+    - cevap(): paket cevapları sırayla gider; kutuda kapasite kadar cevap
+      birikmişse en eskisi atılır.
+    - yayinla(): yalnızca en son yayın saklanır; abone geride kaldıysa
+      gönderilmemiş eski yayın yenisiyle değiştirilir.
+
+    Cevaplar bekleyen yayından önce gönderilir. Gönderim hata verirse görev
+    biter; bağlantının kapandığını handler'ın receive() döngüsü görür.
+    """
+
+    def __init__(self, websocket, kapasite=32):
+        self.websocket = websocket
+        self.atilan = 0  # Abone geride kaldığı için gönderilmeyen mesajlar
+        self._cevaplar = collections.deque()
+        self._kapasite = kapasite
+        self._yayin = None
+        self._uyandir = asyncio.Event()
+        self._gorev = asyncio.create_task(self._gonder())
+
+    def cevap(self, mesaj):
+        if len(self._cevaplar) >= self._kapasite:
+            self._cevaplar.popleft()
+            self.atilan += 1
+        self._cevaplar.append(mesaj)
+        self._uyandir.set()
+
+    def yayinla(self, mesaj):
+        if self._yayin is not None:
+            self.atilan += 1
+        self._yayin = mesaj
+        self._uyandir.set()
+
+    def kapat(self):
+        self._gorev.cancel()
+
+    async def _gonder(self):
+        try:
+            while True:
+                await self._uyandir.wait()
+                self._uyandir.clear()
+                while self._cevaplar or self._yayin is not None:
+                    if self._cevaplar:
+                        mesaj = self._cevaplar.popleft()
+                    else:
+                        mesaj, self._yayin = self._yayin, None
+                    await self.websocket.send_text(mesaj)
+        except Exception:
+            # Bağlantı koptu; kalan mesajların gidecek yeri yok
+            self._cevaplar.clear()
+            self._yayin = None
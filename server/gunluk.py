@@ -0,0 +1,118 @@
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+
+GUNLUKCU_ADI = "hakem"
+gunlukcu = logging.getLogger(GUNLUKCU_ADI)
+
+
+def olay(ad, seviye=logging.INFO, **alanlar):
+    """
+    Tek satırlık JSON olay kaydı: {"zaman": ..., "seviye": ..., "olay": ad, **alanlar}.
+    Seviye kapalıysa kayıt oluşturulmaz; açıksa yalnızca kuyruğa eklenir.
+    """
+    if gunlukcu.isEnabledFor(seviye):
+        gunlukcu.log(seviye, ad, extra={"alanlar": alanlar})
+
+
+class JsonSatirBicimi(logging.Formatter):
+    """Kaydı kompakt tek satırlık JSON'a çevirir (yazıcı thread'inde çalışır)."""
+
+    def format(self, record):
+        satir = {
+            "zaman": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "seviye": record.levelname,
+            "olay": record.getMessage(),
+        }
+        satir.update(getattr(record, "alanlar", {}))
+        if record.exc_info:
+            satir["hata"] = self.formatException(record.exc_info)
+        return json.dumps(satir, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class OrneklemeFiltresi(logging.Filter):
+    """Seviye başına örnekleme: {logging.DEBUG: 0.01} DEBUG kayıtlarının ~%1'ini geçirir."""
+
+    def __init__(self, oranlar):
+        super().__init__()
+        self.oranlar = oranlar
+
+    def filter(self, record):
+        oran = self.oranlar.get(record.levelno)
+        return oran is None or random.random() < oran
+
+
+class KuyrukIsleyici(logging.handlers.QueueHandler):
+    """
+    İstek yolunda yalnızca kuyruğa ekler. Biçimlendirme (json.dumps) ve yazma
+    QueueListener thread'inde yapılır; kuyruk doluysa kayıt atılır ve sayılır,
+    istek asla bloklanmaz.
+    """
+
+    def __init__(self, kuyruk):
+        super().__init__(kuyruk)
+        self.atilan = 0
+
+    def prepare(self, record):
+        # Varsayılan prepare mesajı burada biçimlendirir; aynı process'teki
+        # dinleyici kaydı olduğu gibi kullanabilir
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.atilan += 1
+
+
+def atilan_kayit_sayisi():
+    """Kuyruk dolu olduğu için atılan kayıtların toplamı."""
+    return sum(isleyici.atilan for isleyici in gunlukcu.handlers if isinstance(isleyici, KuyrukIsleyici))
+
+
+def ornekleme_oranlari(metin):
+    """"DEBUG=0.01,INFO=1" -> {logging.DEBUG: 0.01, logging.INFO: 1.0}"""
+    oranlar = {}
+    for parca in filter(None, (p.strip() for p in metin.split(","))):
+        seviye, oran = parca.split("=")
+        oranlar[logging.getLevelName(seviye.strip().upper())] = float(oran)
+    return oranlar
+
+
+def gunlugu_kur(dosya_yolu, seviye="INFO", max_byte=10 * 1024 * 1024, yedek_sayisi=5,
+                ornekleme=None, konsol=True, kuyruk_boyutu=10000):
+    """
+    "hakem" günlükçüsünü kuyruk + arka plan yazıcısı ile kurar ve dinleyiciyi
+    başlatıp döner (kapanışta dinleyici.stop() kalanları yazar).
+    Dosya boyut sınırında döndürülür (dosya_yolu.1 ... .yedek_sayisi).
+    """
+    os.makedirs(os.path.dirname(dosya_yolu) or ".", exist_ok=True)
+    bicim = JsonSatirBicimi()
+    isleyiciler = []
+    dosya = logging.handlers.RotatingFileHandler(dosya_yolu, maxBytes=max_byte, backupCount=yedek_sayisi,
+                                                 encoding="utf-8")
+    dosya.setFormatter(bicim)
+    isleyiciler.append(dosya)
+    if konsol:
+        # Hakem konsolu: örneklenmiş telemetri kayıtları (DEBUG) konsola basılmaz
+        ekran = logging.StreamHandler()
+        ekran.setLevel(logging.INFO)
+        ekran.setFormatter(bicim)
+        isleyiciler.append(ekran)
+
+    kuyruk_isleyici = KuyrukIsleyici(queue.Queue(maxsize=kuyruk_boyutu))
+    if ornekleme:
+        kuyruk_isleyici.addFilter(OrneklemeFiltresi(ornekleme))
+    for eski in list(gunlukcu.handlers):
+        gunlukcu.removeHandler(eski)
+    gunlukcu.addHandler(kuyruk_isleyici)
+    gunlukcu.setLevel(seviye)
+    gunlukcu.propagate = False
+
+    dinleyici = logging.handlers.QueueListener(kuyruk_isleyici.queue, *isleyiciler, respect_handler_level=True)
+    dinleyici.start()
+    return dinleyici
@@ -0,0 +1,259 @@
+"""
+HSS (hava savunma sistemi) yasak bölge ihlali tespiti.
+
+Canlı mod (HssMotoru): sunucu her telemetri paketinde takımın konumunu aktif
+HSS dairelerine karşı kontrol eder. Bölgeler başlangıçta bir ızgaraya
+işlenir; her hücre "tamamen bölge içinde", "sınırda (tam kontrol gerekir)"
+veya "bölgelerden uzak" olarak önceden sınıflandırıldığı için paket başına
+maliyet bir sözlük aramasıdır (sınır hücrelerinde birkaç çarpma).
+Takımın bir bölgeye girişi ile ilk dışarıdaki paketi arası bir ihlal
+aralığıdır ve hss_ihlalleri tablosuna yazılır.
+
+Toplu mod (toplu_kontrol): kayıtlı bir maçın tüm telemetri tablosunu parça
+parça NumPy ile vektörel olarak yeniden kontrol eder; canlı modla aynı
+aralıkları üretir.
+
+    python hss_motoru.py [--db yarisma_verileri.db] [--hss bolgeler.json] [--yaz] [--parca 500000]
+"""
+import argparse
+import itertools
+import json
+import math
+import sqlite3
+
+from uzamsal_indeks import METRE_PER_DERECE_BOYLAM_EKVATOR, METRE_PER_DERECE_ENLEM
+
+# /api/hss_koordinatlari'nin döndüğü bölgeler.
+# Hakemler duyuru yapana kadar boş liste dönebilir; test için dolu.
+HSS_BOLGELERI = [
+    {"id": 1, "hssEnlem": 41.5130, "hssBoylam": 36.1200, "hssYaricap": 50},
+]
+
+# Toplu modda telemetri tablosundan parça başına okunan satır sayısı
+PARCA_BOYUTU = 500000
+
+HSS_IHLAL_TABLO_SQL = """CREATE TABLE IF NOT EXISTS hss_ihlalleri (
+    takim_no INTEGER, hss_id INTEGER, giris_ms INTEGER, cikis_ms INTEGER, sure_ms INTEGER)"""
+
+HSS_IHLAL_INSERT_SQL = """INSERT INTO hss_ihlalleri (
+    takim_no, hss_id, giris_ms, cikis_ms, sure_ms
+) VALUES (?, ?, ?, ?, ?)"""
+
+
+class HssMotoru:
+    """
+    Takım başına açık HSS ihlal aralıklarını tutan artımlı kontrol motoru.
+
+    Yatay mesafe, ilk bölgenin merkezi referans alınarak yerel metrik düzlemde
+    (equirectangular) hesaplanır; HSS dikey olarak sınırsız kabul edilir.
+    """
+
+    def __init__(self, bolgeler=(), hucre_m=25.0):
+        self.hucre_m = hucre_m
+        self.bolgeler = list(bolgeler)
+        self._acik = {}    # {takim_no: {hss_id: giris_ms}}
+        self._son_ms = {}  # {takim_no: son paket sunucu_saati_ms}; yalnızca açık aralığı olanlar
+        self._izgara = {}  # {(hx, hy): (tam_idler, ((hss_id, x, y, yaricap_kare), ...))}
+        self._referans = None
+        if self.bolgeler:
+            ilk = self.bolgeler[0]
+            self._referans = (ilk["hssEnlem"], ilk["hssBoylam"],
+                              METRE_PER_DERECE_BOYLAM_EKVATOR * math.cos(math.radians(ilk["hssEnlem"])))
+        for bolge in self.bolgeler:
+            self._izgaraya_isle(bolge)
+
+    def _metrik(self, enlem, boylam):
+        ref_enlem, ref_boylam, boylam_carpani = self._referans
+        return (boylam - ref_boylam) * boylam_carpani, (enlem - ref_enlem) * METRE_PER_DERECE_ENLEM
+
+    def _izgaraya_isle(self, bolge):
+        cx, cy = self._metrik(bolge["hssEnlem"], bolge["hssBoylam"])
+        r = bolge["hssYaricap"]
+        h = self.hucre_m
+        for hx in range(math.floor((cx - r) / h), math.floor((cx + r) / h) + 1):
+            x0, x1 = hx * h, (hx + 1) * h
+            dx_min = max(x0 - cx, 0.0, cx - x1)
+            dx_max = max(abs(cx - x0), abs(cx - x1))
+            for hy in range(math.floor((cy - r) / h), math.floor((cy + r) / h) + 1):
+                y0, y1 = hy * h, (hy + 1) * h
+                dy_min = max(y0 - cy, 0.0, cy - y1)
+                dy_max = max(abs(cy - y0), abs(cy - y1))
+                if dx_min ** 2 + dy_min ** 2 > r * r:
+                    continue  # Hücrenin hiçbir noktası bölgede değil
+                tam, sinir = self._izgara.get((hx, hy), ((), ()))
+                if dx_max ** 2 + dy_max ** 2 <= r * r:
+                    tam = tam + (bolge["id"],)
+                else:
+                    sinir = sinir + ((bolge["id"], cx, cy, r * r),)
+                self._izgara[(hx, hy)] = (tam, sinir)
+
+    def kontrol(self, takim_no, enlem, boylam, simdi_ms):
+        """
+        Paketi kontrol eder; bu paketle kapanan ihlalleri
+        [(takim_no, hss_id, giris_ms, cikis_ms, sure_ms)] olarak döner.
+        """
+        acik = self._acik.get(takim_no)
+        if self._referans is None:
+            return ()
+        x, y = self._metrik(enlem, boylam)
+        hucre = self._izgara.get((math.floor(x / self.hucre_m), math.floor(y / self.hucre_m)))
+        if hucre is None and not acik:
+            return ()  # Bölgelerden uzak ve açık ihlal yok: en sık yol
+
+        icinde = set()
+        if hucre is not None:
+            tam, sinir = hucre
+            icinde.update(tam)
+            for hss_id, bx, by, yaricap_kare in sinir:
+                if (x - bx) ** 2 + (y - by) ** 2 <= yaricap_kare:
+                    icinde.add(hss_id)
+
+        kapananlar = []
+        if acik:
+            for hss_id, giris_ms in list(acik.items()):
+                if hss_id not in icinde:
+                    del acik[hss_id]
+                    kapananlar.append((takim_no, hss_id, giris_ms, simdi_ms, simdi_ms - giris_ms))
+        if icinde:
+            acik = self._acik.setdefault(takim_no, {})
+            for hss_id in icinde:
+                acik.setdefault(hss_id, simdi_ms)
+        if acik:
+            self._son_ms[takim_no] = simdi_ms
+        else:
+            self._acik.pop(takim_no, None)
+            self._son_ms.pop(takim_no, None)
+        return kapananlar
+
+    def acik_ihlaller(self):
+        """Henüz kapanmamış ihlaller: [(takim_no, hss_id, giris_ms)]."""
+        return [(takim_no, hss_id, giris_ms)
+                for takim_no, acik in self._acik.items() for hss_id, giris_ms in acik.items()]
+
+    def tumunu_kapat(self):
+        """
+        Açık ihlalleri takımın son paket zamanıyla kapatır (maç sonu / kapanış).
+        Toplu moddaki "takımın son paketi bölge içindeyse" kuralıyla aynıdır.
+        """
+        kapananlar = [(takim_no, hss_id, giris_ms, self._son_ms[takim_no], self._son_ms[takim_no] - giris_ms)
+                      for takim_no, hss_id, giris_ms in self.acik_ihlaller()]
+        self._acik.clear()
+        self._son_ms.clear()
+        return kapananlar
+
+
+def toplu_kontrol(conn, bolgeler, parca_boyutu=PARCA_BOYUTU):
+    """
+    telemetri tablosunun tamamını NumPy ile yeniden kontrol eder ve ihlalleri
+    [(takim_no, hss_id, giris_ms, cikis_ms, sure_ms)] olarak döner.
+    Canlı modla aynı kural: aralık bölge içindeki ilk paketle başlar, dışarıdaki
+    ilk paketle (takımın paketleri bittiyse son paketle) biter.
+
+    Satırlar takım ve zaman sırasıyla parça parça (mac_analizi.py gibi
+    np.fromiter ile) okunur. Parçanın sonundaki takımın satırları bir sonraki
+    parçayla birlikte işlenir; böylece hiçbir takımın aralığı bölünmez ve
+    bellekte en fazla bir parça ile tek bir takımın satırları bulunur.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise SystemExit("Toplu mod için numpy gerekli: pip install numpy")
+
+    if not bolgeler:
+        return []
+    dtype = np.dtype([("takim_no", "i8"), ("zaman", "i8"), ("enlem", "f8"), ("boylam", "f8")])
+    imlec = conn.execute("SELECT takim_no, sunucu_saati_ms, enlem, boylam FROM telemetri "
+                         "ORDER BY takim_no, sunucu_saati_ms")
+    ihlaller = []
+    tasinan = np.empty(0, dtype=dtype)  # Bir önceki parçanın son takımının satırları
+    while True:
+        parca = np.fromiter(itertools.islice(imlec, parca_boyutu), dtype=dtype)
+        if len(parca) == 0:
+            break
+        satirlar = np.concatenate((tasinan, parca))
+        son_takim_basi = np.searchsorted(satirlar["takim_no"], satirlar["takim_no"][-1])
+        tasinan = satirlar[son_takim_basi:]
+        if son_takim_basi:
+            ihlaller.extend(_parca_ihlalleri(np, satirlar[:son_takim_basi], bolgeler))
+    if len(tasinan):
+        ihlaller.extend(_parca_ihlalleri(np, tasinan, bolgeler))
+    ihlaller.sort(key=lambda i: (i[0], i[2], i[1]))
+    return ihlaller
+
+
+def _parca_ihlalleri(np, veri, bolgeler):
+    """Takımları eksiksiz, takım ve zamana göre sıralı satırlardaki ihlaller."""
+    takim = veri["takim_no"]
+    zaman = veri["zaman"]
+
+    ref = bolgeler[0]
+    boylam_carpani = METRE_PER_DERECE_BOYLAM_EKVATOR * math.cos(math.radians(ref["hssEnlem"]))
+    x = (veri["boylam"] - ref["hssBoylam"]) * boylam_carpani
+    y = (veri["enlem"] - ref["hssEnlem"]) * METRE_PER_DERECE_ENLEM
+
+    # Satır i, kendinden önceki/sonraki satırla aynı takıma mı ait
+    yeni_takim = np.empty(len(takim), dtype=bool)
+    yeni_takim[0] = True
+    yeni_takim[1:] = takim[1:] != takim[:-1]
+    son_satir = np.empty(len(takim), dtype=bool)
+    son_satir[:-1] = yeni_takim[1:]
+    son_satir[-1] = True
+
+    ihlaller = []
+    for bolge in bolgeler:
+        bx = (bolge["hssBoylam"] - ref["hssBoylam"]) * boylam_carpani
+        by = (bolge["hssEnlem"] - ref["hssEnlem"]) * METRE_PER_DERECE_ENLEM
+        ic = (x - bx) ** 2 + (y - by) ** 2 <= bolge["hssYaricap"] ** 2
+        onceki_ic = np.zeros_like(ic)
+        onceki_ic[1:] = ic[:-1]
+        onceki_ic &= ~yeni_takim
+        sonraki_ic = np.zeros_like(ic)
+        sonraki_ic[:-1] = ic[1:]
+        sonraki_ic &= ~son_satir
+
+        girisler = np.flatnonzero(ic & ~onceki_ic)
+        sonlar = np.flatnonzero(ic & ~sonraki_ic)  # Her aralığın bölge içindeki son satırı
+        # Çıkış zamanı: aynı takımın bir sonraki (dışarıdaki) paketi, yoksa son paketi
+        cikis_satiri = np.where(son_satir[sonlar], sonlar, sonlar + 1)
+        giris_ms = zaman[girisler]
+        cikis_ms = zaman[cikis_satiri]
+        ihlaller.extend(zip(takim[girisler].tolist(), [bolge["id"]] * len(girisler),
+                            giris_ms.tolist(), cikis_ms.tolist(), (cikis_ms - giris_ms).tolist()))
+    return ihlaller
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="yarisma_verileri.db")
+    parser.add_argument("--hss", help="HSS bölgeleri JSON dosyası (verilmezse HSS_BOLGELERI)")
+    parser.add_argument("--yaz", action="store_true",
+                        help="hss_ihlalleri tablosunu toplu kontrol sonucuyla değiştir")
+    parser.add_argument("--parca", type=int, default=PARCA_BOYUTU, help="Parça başına okunacak satır sayısı")
+    args = parser.parse_args()
+
+    bolgeler = HSS_BOLGELERI
+    if args.hss:
+        with open(args.hss) as f:
+            bolgeler = json.load(f)
+
+    conn = sqlite3.connect(args.db)
+    conn.execute(HSS_IHLAL_TABLO_SQL)
+    ihlaller = toplu_kontrol(conn, bolgeler, args.parca)
+    for takim_no, hss_id, giris_ms, cikis_ms, sure_ms in ihlaller:
+        print(f"Takım {takim_no} HSS {hss_id}: {giris_ms} -> {cikis_ms} ({sure_ms} ms)")
+    print(f"{len(ihlaller)} ihlal bulundu.")
+
+    kayitli = conn.execute("SELECT takim_no, hss_id, giris_ms, cikis_ms, sure_ms FROM hss_ihlalleri "
+                           "ORDER BY takim_no, giris_ms, hss_id").fetchall()
+    if [tuple(k) for k in kayitli] != ihlaller:
+        print(f"Uyarı: hss_ihlalleri tablosunda {len(kayitli)} kayıt var, toplu kontrolle uyuşmuyor.")
+    if args.yaz:
+        with conn:
+            conn.execute("DELETE FROM hss_ihlalleri")
+            conn.executemany(HSS_IHLAL_INSERT_SQL, ihlaller)
+        print("hss_ihlalleri tablosu güncellendi.")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+GUN_MS = 24 * 3600 * 1000
+
+
+def saat_metni(gps_ms):
+    """Gün içi ms'yi kilitlenmeler tablosundaki "saat:dakika:saniye:milisaniye" biçimine çevirir."""
+    saat, kalan = divmod(gps_ms, 3600000)
+    dakika, kalan = divmod(kalan, 60000)
+    saniye, milisaniye = divmod(kalan, 1000)
+    return f"{saat}:{dakika}:{saniye}:{milisaniye}"
+
+
+class KilitlenmeTakibi:
+    """
+    Takım başına kilitlenme aralığı durum makinesi.
+
+    Her telemetri paketinin iha_kilitlenme alanıyla beslenir:
+      kilitli değil -> kilitli  : aralık açılır (başlangıç = paketin gps_saati)
+      kilitli -> kilitli değil  : aralık kapanır, rapor gelirse kullanılmak üzere saklanır
+    /api/kilitlenme_bilgisi geldiğinde açık (yoksa en son kapanan) aralığın
+    başlangıcı raporla eşleştirilir; telemetri tablosunu geriye dönük taramaya
+    gerek kalmaz. Raporlanan kilitlenme, telemetri tekrar "kilitli değil"
+    diyene kadar yeniden açılmaz.
+    """
+
+    def __init__(self):
+        self._durumlar = {}  # {takim_no: [acik_baslangic_ms, son_kapanan_baslangic_ms, raporlandi]}
+
+    def guncelle(self, takim_no, kilitli, gps_ms):
+        durum = self._durumlar.get(takim_no)
+        if durum is None:
+            if not kilitli:
+                return  # En sık yol: hiç kilitlenmemiş takım
+            durum = self._durumlar[takim_no] = [None, None, False]
+        if kilitli:
+            if durum[0] is None and not durum[2]:
+                durum[0] = gps_ms
+        else:
+            if durum[0] is not None:
+                durum[1] = durum[0]
+                durum[0] = None
+            durum[2] = False
+
+    def raporla(self, takim_no, bitis_ms):
+        """
+        Rapor edilen kilitlenmenin (baslangic_ms, sure_ms) değerini döner;
+        telemetride eşleşen bir kilitlenme yoksa (None, None).
+        """
+        durum = self._durumlar.get(takim_no)
+        if durum is None:
+            return None, None
+        if durum[0] is not None:
+            baslangic_ms = durum[0]
+            durum[0] = None
+            durum[2] = True
+        elif durum[1] is not None:
+            baslangic_ms = durum[1]
+        else:
+            return None, None
+        durum[1] = None
+        # gps saati gün içi ms; gece yarısını geçen kilitlenme için mod
+        return baslangic_ms, (bitis_ms - baslangic_ms) % GUN_MS
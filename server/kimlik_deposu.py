@@ -0,0 +1,90 @@
+import hmac
+import json
+import logging
+import os
+
+from gunluk import olay
+
+
+class KimlikDeposu:
+    """
+    Takım kimlik bilgilerini bellekte {kadi: (sifre, takim_no)} olarak tutar.
+
+    Giriş doğrulaması tek bir sözlük aramasıdır; DB'ye veya diske gidilmez.
+    teams.json değiştiğinde (mtime/boyut/inode) yeni sözlük baştan kurulur ve
+    referans tek atamayla değiştirilir; yarıda kalan bir okuma eski ya da yeni
+    sözlüğün tamamını görür. Dosya okunamaz/bozuksa eski kimlikler korunur.
+    """
+
+    def __init__(self, dosya_yolu, varsayilan_takimlar=()):
+        self.dosya_yolu = dosya_yolu
+        self.varsayilan_takimlar = list(varsayilan_takimlar)
+        self._kimlikler = {}
+        self._imza = None
+
+    def _dosya_imzasi(self):
+        try:
+            bilgi = os.stat(self.dosya_yolu)
+        except FileNotFoundError:
+            return None
+        return (bilgi.st_mtime_ns, bilgi.st_size, bilgi.st_ino)
+
+    def degisti_mi(self):
+        return self._dosya_imzasi() != self._imza
+
+    def yukle(self):
+        """
+        teams.json'ı (yoksa varsayılan takımları) yükler; yüklenen takım
+        listesini döner. Hata olursa mevcut kimlikler değişmez ve None döner.
+        """
+        imza = self._dosya_imzasi()
+        if imza is None and self._imza is not None:
+            # Maç sırasında silinen/taşınan dosya yüzünden varsayılan takıma dönülmez
+            olay("takim_dosyasi_yok", logging.WARNING, dosya=self.dosya_yolu, islem="yuklu takimlar korunuyor")
+            self._imza = None
+            return None
+        try:
+            if imza is None:
+                olay("takim_dosyasi_yok", logging.WARNING, dosya=self.dosya_yolu, islem="varsayilan takim")
+                takimlar = self.varsayilan_takimlar
+            else:
+                with open(self.dosya_yolu, "r") as f:
+                    takimlar = json.load(f)
+            takimlar = self._gecerli_takimlar(takimlar)
+            kimlikler = {takim["kadi"]: (takim["sifre"], takim["takim_no"]) for takim in takimlar}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            olay("takim_yukleme_hatasi", logging.ERROR, dosya=self.dosya_yolu, hata=str(e))
+            # Bozuk dosya tekrar tekrar denenmesin; düzeltilince imza yine değişir
+            self._imza = imza
+            return None
+        if imza is not None:
+            olay("takimlar_yuklendi", dosya=self.dosya_yolu, adet=len(takimlar))
+        self._kimlikler = kimlikler
+        self._imza = imza
+        return takimlar
+
+    def _gecerli_takimlar(self, takimlar):
+        """
+        kadi/sifre metin olmayan kayıtları (örn. sayı olarak yazılmış şifre)
+        atar ve bildirir; bunlar yüklenirse o takımın her girişi hata verirdi.
+        """
+        gecerliler = []
+        for takim in takimlar:
+            if not isinstance(takim["kadi"], str) or not isinstance(takim["sifre"], str):
+                olay("takim_yukleme_hatasi", logging.ERROR, dosya=self.dosya_yolu, kadi=takim["kadi"],
+                     takim_no=takim.get("takim_no"), hata="kadi ve sifre metin olmali")
+                continue
+            gecerliler.append(takim)
+        return gecerliler
+
+    def dogrula(self, kadi, sifre):
+        """Kimlik doğruysa takım numarasını, değilse None döner."""
+        kayit = self._kimlikler.get(kadi)
+        if kayit is None or not isinstance(sifre, str):
+            return None
+        if not hmac.compare_digest(kayit[0].encode("utf-8"), sifre.encode("utf-8")):
+            return None
+        return kayit[1]
+
+    def __len__(self):
+        return len(self._kimlikler)
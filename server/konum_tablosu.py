@@ -0,0 +1,106 @@
+import json
+
+from uzamsal_indeks import KonumIzgarasi
+
+
+def _json(deger):
+    # Starlette JSONResponse ile aynı (kompakt) biçim
+    return json.dumps(deger, ensure_ascii=False, separators=(",", ":"))
+
+
+class KonumTablosu:
+    """
+    Her takımın en son konumunu bellekte tutar ve konumBilgileri cevabını üretir.
+
+    Bir takımın konumu paket geldiğinde bir kez JSON'a kodlanır ve
+    '{"takim_numarasi":..,...,"zaman_farki":' önekiyle saklanır. Cevap
+    oluşturulurken yalnızca isteğe özel kısımlar (zaman_farki ve sunucusaati)
+    eklenir; rakip başına dict kurup tekrar kodlama yapılmaz.
+
+    Konumlar ayrıca bir ızgara indeksinde tutulur; yarıçap / en yakın K
+    filtreli cevaplar tüm listeyi taramadan üretilir.
+    """
+
+    def __init__(self, zaman_asimi_ms, hucre_m=100.0):
+        self.zaman_asimi_ms = zaman_asimi_ms
+        self.izgara = KonumIzgarasi(hucre_m)
+        self._konumlar = {}   # {takim_no: (sunucu_saati_ms, {konum alanları})}
+        self._onekler = {}    # {takim_no: (sunucu_saati_ms, b'{...,"zaman_farki":')}
+        self._anlik = None    # [(sunucu_saati_ms, önek)]; değişiklikte yeniden kurulur
+        self._en_eski_ms = None
+        self.surum = 0        # Tablo her değiştiğinde artar
+
+    def __len__(self):
+        return len(self._konumlar)
+
+    def guncelle(self, takim_no, sunucu_saati_ms, konum):
+        """konum: zaman_farki hariç konumBilgileri alanları."""
+        self._konumlar[takim_no] = (sunucu_saati_ms, konum)
+        onek = _json(konum)[:-1] + ',"zaman_farki":'
+        self._onekler[takim_no] = (sunucu_saati_ms, onek.encode("utf-8"))
+        self.izgara.guncelle(takim_no, konum["iha_enlem"], konum["iha_boylam"], konum["iha_irtifa"])
+        if self._en_eski_ms is None:
+            self._en_eski_ms = sunucu_saati_ms
+        self._anlik = None
+        self.surum += 1
+
+    def suresi_dolanlari_sil(self, simdi_ms):
+        """zaman_asimi_ms içinde paket göndermeyen takımları siler."""
+        esik_zaman = simdi_ms - self.zaman_asimi_ms
+        # _en_eski_ms en eski kaydın alt sınırıdır; eşiği geçmediyse taramaya gerek yok
+        if self._en_eski_ms is None or self._en_eski_ms > esik_zaman:
+            return
+        for takim_no, (kayit_ms, _) in list(self._konumlar.items()):
+            if kayit_ms <= esik_zaman:
+                del self._konumlar[takim_no]
+                del self._onekler[takim_no]
+                self.izgara.sil(takim_no)
+                self._anlik = None
+                self.surum += 1
+        self._en_eski_ms = min((ms for ms, _ in self._konumlar.values()), default=None)
+
+    def anlik_goruntu(self, simdi_ms):
+        """Süresi dolanlar atılmış [(sunucu_saati_ms, önek)] listesi."""
+        self.suresi_dolanlari_sil(simdi_ms)
+        if self._anlik is None:
+            self._anlik = list(self._onekler.values())
+        return self._anlik
+
+    def konumlar(self, simdi_ms):
+        """konumBilgileri listesini dict olarak döner."""
+        self.suresi_dolanlari_sil(simdi_ms)
+        return [{**konum, "zaman_farki": simdi_ms - kayit_ms}
+                for kayit_ms, konum in self._konumlar.values()]
+
+    def konum(self, takim_no):
+        """Takımın son konum alanları (yoksa None)."""
+        kayit = self._konumlar.get(takim_no)
+        return kayit[1] if kayit else None
+
+    def yakindakiler(self, simdi_ms, enlem, boylam, irtifa, yaricap_m=None, en_yakin=None, haric=None):
+        """
+        Verilen noktaya göre filtrelenmiş takım numaralarını yakından uzağa döner.
+        yaricap_m: bu mesafedeki (metre, 3B) takımlar; en_yakin: en yakın K takım.
+        İkisi birlikte verilirse yarıçap içindeki en yakın K takım döner.
+        """
+        self.suresi_dolanlari_sil(simdi_ms)
+        if yaricap_m is not None:
+            sonuc = self.izgara.yaricap_icinde(enlem, boylam, irtifa, yaricap_m, haric)
+            if en_yakin is not None:
+                sonuc = sonuc[:en_yakin]
+        else:
+            sonuc = self.izgara.en_yakinlar(enlem, boylam, irtifa, en_yakin, haric)
+        return [takim_no for _, takim_no in sonuc]
+
+    def cevap_govdesi(self, simdi_ms, sunucu_saati, takimlar=None):
+        """
+        {"sunucusaati": ..., "konumBilgileri": [...]} cevabını JSON byte olarak üretir.
+        takimlar verilirse (yakindakiler() sonucu) yalnızca o takımlar o sırayla yer alır.
+        """
+        if takimlar is None:
+            secilenler = self.anlik_goruntu(simdi_ms)
+        else:
+            secilenler = [self._onekler[takim_no] for takim_no in takimlar]
+        parcalar = [onek + b"%d}" % (simdi_ms - kayit_ms) for kayit_ms, onek in secilenler]
+        return (b'{"sunucusaati":' + _json(sunucu_saati).encode("utf-8") +
+                b',"konumBilgileri":[' + b",".join(parcalar) + b"]}")
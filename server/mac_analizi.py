@@ -0,0 +1,214 @@
+"""
+Maç sonrası takım istatistikleri ve puanlama raporu.
+
+yarisma_verileri.db'deki telemetri tablosu yazılma sırasıyla parça parça
+(varsayılan 500 000 satır) NumPy dizilerine okunur; bellek kullanımı maçın
+uzunluğundan bağımsızdır. Her parça takım ve zamana göre NumPy'da sıralanır,
+ardışık paket çiftleri vektörel işlenir ve takım toplamları parçalar arasında
+biriktirilir. Parçalar arası çiftler için her takımın son satırı bir sonraki
+parçaya taşınır; bu, bir takımın sonraki parçalardaki satırlarının taşınan
+satırdan yeni olmasını gerektirir. Çoklu worker'la yazılmış veritabanında
+bu tutmayabilir; o zaman telemetri zaman sırasıyla baştan okunur.
+
+Takım başına: paket sayısı, uçuş süresi, uçulan mesafe, otonom uçuş yüzdesi,
+geçerli kilitlenmeler, kamikaze süreleri ve HSS ihlalleri.
+
+    python mac_analizi.py [--db yarisma_verileri.db] [--cikti rapor.json]
+"""
+import argparse
+import itertools
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+from uzamsal_indeks import METRE_PER_DERECE_BOYLAM_EKVATOR, METRE_PER_DERECE_ENLEM
+
+PARCA_BOYUTU = 500000
+# Aynı takımın iki paketi arasında bu süreden uzun boşluk uçuş sayılmaz
+# (sunucudaki konum zaman aşımıyla aynı)
+BOSLUK_MS = 5000
+# Şartname: kilitlenme en az 4 saniye sürmeli
+GECERLI_KILITLENME_MS = 4000
+
+# ORDER BY takim_no, sunucu_saati_ms indeks üzerinden satır satır tabloya
+# gittiği için okumanın yarısından fazlasını tutuyordu. Tek worker'da satırlar
+# tek yazıcı thread'i tarafından geliş (sunucu saati) sırasıyla eklenir; rowid
+# sırasıyla okunup parça içinde sıralanır. Çoklu worker'da (--workers N) her
+# worker'ın kendi yazıcısı vardır ve partiler yazılma anına göre iç içe geçer:
+# bir takımın eski satırı sonraki bir parçaya düşebilir. Bu görülürse
+# TELEMETRI_ZAMAN_SIRALI_SQL ile (idx_telemetri_zaman) yeniden okunur.
+TELEMETRI_SQL = "SELECT takim_no, sunucu_saati_ms, enlem, boylam, irtifa, otonom FROM telemetri"
+TELEMETRI_ZAMAN_SIRALI_SQL = TELEMETRI_SQL + " ORDER BY sunucu_saati_ms"
+TELEMETRI_ALANLARI = ("paket", "ilk_ms", "son_ms", "ucus_ms", "mesafe_m", "otonom_ms")
+TELEMETRI_DTYPE = np.dtype([("takim_no", "i8"), ("zaman", "i8"), ("enlem", "f8"),
+                            ("boylam", "f8"), ("irtifa", "f8"), ("otonom", "i8")])
+
+
+def parcalar(conn, sql, dtype, parca_boyutu=PARCA_BOYUTU):
+    """Sorgu sonucunu en fazla parca_boyutu satırlık yapılandırılmış dizilerle verir."""
+    imlec = conn.execute(sql)
+    while True:
+        parca = np.fromiter(itertools.islice(imlec, parca_boyutu), dtype=dtype)
+        if len(parca) == 0:
+            return
+        yield parca
+
+
+def _biriktir(toplamlar, alan, takimlar, degerler):
+    for takim_no, deger in zip(takimlar.tolist(), degerler.tolist()):
+        takim = toplamlar.setdefault(takim_no, _bos_istatistik())
+        takim[alan] += deger
+
+
+def _bos_istatistik():
+    return {"paket": 0, "ilk_ms": None, "son_ms": None, "ucus_ms": 0, "mesafe_m": 0.0, "otonom_ms": 0,
+            "kilitlenme": 0, "gecerli_kilitlenme": 0, "otonom_kilitlenme": 0,
+            "kamikaze": 0, "kamikaze_sureleri_ms": [], "hss_ihlali": 0, "hss_ihlal_ms": 0}
+
+
+class _SiraBozuk(Exception):
+    """Bir takımın satırı, önceki parçadan taşınan son satırından eski."""
+
+
+def telemetri_istatistikleri(conn, toplamlar, parca_boyutu=PARCA_BOYUTU):
+    yerel = {}
+    try:
+        _telemetri_topla(conn, TELEMETRI_SQL, yerel, parca_boyutu)
+    except _SiraBozuk:
+        yerel = {}
+        _telemetri_topla(conn, TELEMETRI_ZAMAN_SIRALI_SQL, yerel, parca_boyutu)
+    for takim_no, takim in yerel.items():
+        hedef = toplamlar.setdefault(takim_no, _bos_istatistik())
+        hedef.update((alan, takim[alan]) for alan in TELEMETRI_ALANLARI)
+
+
+def _telemetri_topla(conn, sql, toplamlar, parca_boyutu):
+    onceki = None  # Bir önceki parçada her takımın son satırı
+    for parca in parcalar(conn, sql, TELEMETRI_DTYPE, parca_boyutu):
+        takimlar, adetler = np.unique(parca["takim_no"], return_counts=True)
+        _biriktir(toplamlar, "paket", takimlar, adetler)
+
+        satirlar = parca if onceki is None else np.concatenate((onceki, parca))
+        sira = np.lexsort((satirlar["zaman"], satirlar["takim_no"]))
+        satirlar = satirlar[sira]
+        takim_sonu = np.empty(len(satirlar), dtype=bool)
+        takim_sonu[:-1] = satirlar["takim_no"][1:] != satirlar["takim_no"][:-1]
+        takim_sonu[-1] = True
+        takim_basi = np.r_[True, takim_sonu[:-1]]
+        if onceki is not None and not takim_basi[sira < len(onceki)].all():
+            # Taşınan satırdan eski bir satır geldi; o çift önceki parçada sayıldı
+            raise _SiraBozuk()
+        onceki = satirlar[takim_sonu]
+
+        # İlk/son paket (taşınan satır önceki parçada zaten sayıldı, min/max değişmez)
+        baslar = np.flatnonzero(takim_basi)
+        for takim_no, ilk, son in zip(satirlar["takim_no"][baslar].tolist(), satirlar["zaman"][baslar].tolist(),
+                                      satirlar["zaman"][takim_sonu].tolist()):
+            takim = toplamlar[takim_no]
+            takim["ilk_ms"] = ilk if takim["ilk_ms"] is None else min(takim["ilk_ms"], ilk)
+            takim["son_ms"] = son if takim["son_ms"] is None else max(takim["son_ms"], son)
+
+        # Ardışık paket çiftleri (i-1, i)
+        a, b = satirlar[:-1], satirlar[1:]
+        dt = b["zaman"] - a["zaman"]
+        gecerli = (a["takim_no"] == b["takim_no"]) & (dt <= BOSLUK_MS)
+        dx = (b["boylam"] - a["boylam"]) * METRE_PER_DERECE_BOYLAM_EKVATOR * np.cos(np.radians(a["enlem"]))
+        dy = (b["enlem"] - a["enlem"]) * METRE_PER_DERECE_ENLEM
+        dz = b["irtifa"] - a["irtifa"]
+        mesafe = np.sqrt(dx * dx + dy * dy + dz * dz)
+
+        dt = np.where(gecerli, dt, 0)
+        cift_takimlari = b["takim_no"][gecerli]
+        if len(cift_takimlari) == 0:
+            continue
+        takimlar, baslar = np.unique(cift_takimlari, return_index=True)
+        _biriktir(toplamlar, "ucus_ms", takimlar, np.add.reduceat(dt[gecerli], baslar))
+        _biriktir(toplamlar, "mesafe_m", takimlar, np.add.reduceat(mesafe[gecerli], baslar))
+        # Çift arasındaki süre, çiftin ilk paketindeki otonomi durumuna sayılır
+        otonom_dt = np.where(a["otonom"] == 1, dt, 0)
+        _biriktir(toplamlar, "otonom_ms", takimlar, np.add.reduceat(otonom_dt[gecerli], baslar))
+
+
+def kilitlenme_istatistikleri(conn, toplamlar, parca_boyutu=PARCA_BOYUTU):
+    dtype = np.dtype([("takim_no", "i8"), ("otonom_mu", "i8"), ("sure_ms", "i8")])
+    # sure_ms sütunu olmayan eski veritabanlarında hiçbir kilitlenme geçerli sayılamaz
+    sutunlar = [satir[1] for satir in conn.execute("PRAGMA table_info(kilitlenmeler)")]
+    sure = "COALESCE(sure_ms, -1)" if "sure_ms" in sutunlar else "-1"
+    sql = f"SELECT takim_no, COALESCE(otonom_mu, 0), {sure} FROM kilitlenmeler ORDER BY takim_no"
+    for parca in parcalar(conn, sql, dtype, parca_boyutu):
+        takimlar, baslar = np.unique(parca["takim_no"], return_index=True)
+        gecerli = (parca["sure_ms"] >= GECERLI_KILITLENME_MS).astype(np.int64)
+        _biriktir(toplamlar, "kilitlenme", takimlar, np.add.reduceat(np.ones(len(parca), np.int64), baslar))
+        _biriktir(toplamlar, "gecerli_kilitlenme", takimlar, np.add.reduceat(gecerli, baslar))
+        _biriktir(toplamlar, "otonom_kilitlenme", takimlar,
+                  np.add.reduceat(gecerli * (parca["otonom_mu"] == 1), baslar))
+
+
+def _saat_ms(metin):
+    saat, dakika, saniye, milisaniye = (int(parca) for parca in metin.split(":"))
+    return (saat * 3600000) + (dakika * 60000) + (saniye * 1000) + milisaniye
+
+
+def kamikaze_istatistikleri(conn, toplamlar):
+    # Maç başına birkaç satır; saat metinleri Python'da çözülür
+    for takim_no, baslangic, bitis in conn.execute(
+            "SELECT takim_no, baslangic_saati, bitis_saati FROM kamikaze ORDER BY takim_no, bitis_saati"):
+        takim = toplamlar.setdefault(takim_no, _bos_istatistik())
+        takim["kamikaze"] += 1
+        try:
+            takim["kamikaze_sureleri_ms"].append(_saat_ms(bitis) - _saat_ms(baslangic))
+        except ValueError:
+            takim["kamikaze_sureleri_ms"].append(None)
+
+
+def hss_istatistikleri(conn, toplamlar):
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='hss_ihlalleri'").fetchone() is None:
+        return
+    for takim_no, adet, toplam_ms in conn.execute(
+            "SELECT takim_no, COUNT(*), COALESCE(SUM(sure_ms), 0) FROM hss_ihlalleri GROUP BY takim_no"):
+        takim = toplamlar.setdefault(takim_no, _bos_istatistik())
+        takim["hss_ihlali"] = adet
+        takim["hss_ihlal_ms"] = toplam_ms
+
+
+def mac_raporu(conn, parca_boyutu=PARCA_BOYUTU):
+    toplamlar = {}
+    telemetri_istatistikleri(conn, toplamlar, parca_boyutu)
+    kilitlenme_istatistikleri(conn, toplamlar, parca_boyutu)
+    kamikaze_istatistikleri(conn, toplamlar)
+    hss_istatistikleri(conn, toplamlar)
+    for takim in toplamlar.values():
+        takim["mesafe_m"] = round(takim["mesafe_m"], 1)
+        takim["otonom_yuzde"] = round(100.0 * takim["otonom_ms"] / takim["ucus_ms"], 1) if takim["ucus_ms"] else 0.0
+    return {str(takim_no): toplamlar[takim_no] for takim_no in sorted(toplamlar)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="yarisma_verileri.db")
+    parser.add_argument("--cikti", help="JSON raporun yazılacağı dosya")
+    parser.add_argument("--parca", type=int, default=PARCA_BOYUTU, help="Parça başına okunacak satır sayısı")
+    args = parser.parse_args()
+
+    baslangic = time.perf_counter()
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    rapor = mac_raporu(conn, args.parca)
+    conn.close()
+
+    print(f"{'Takım':>6} {'Paket':>8} {'Uçuş(s)':>9} {'Mesafe(m)':>11} {'Otonom%':>8} "
+          f"{'Kilit':>6} {'Geçerli':>8} {'Kamikaze':>9} {'HSS':>4} {'HSS(s)':>7}")
+    for takim_no, t in rapor.items():
+        print(f"{takim_no:>6} {t['paket']:>8} {t['ucus_ms'] / 1000:>9.1f} {t['mesafe_m']:>11.1f} "
+              f"{t['otonom_yuzde']:>8.1f} {t['kilitlenme']:>6} {t['gecerli_kilitlenme']:>8} "
+              f"{t['kamikaze']:>9} {t['hss_ihlali']:>4} {t['hss_ihlal_ms'] / 1000:>7.1f}")
+    print(f"{len(rapor)} takım, {time.perf_counter() - baslangic:.2f} s")
+
+    if args.cikti:
+        with open(args.cikti, "w") as f:
+            json.dump(rapor, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
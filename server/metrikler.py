@@ -0,0 +1,180 @@
+"""
+Hakem sunucusu metrikleri, Prometheus metin biçiminde (/metrics).
+
+prometheus_client'a bağımlı olmadan yalnızca gereken üç tür: sayaç,
+sabit kovalı histogram ve okunduğu anda hesaplanan gösterge. İstek yolundaki
+maliyet bir sözlük araması, bir bisect ve kilit altında iki toplamadır;
+metin yalnızca /metrics okunurken üretilir. Kuyruk derinliği gibi değerler
+göstergelerde okuma anında hesaplanır, istek yolunda hiç güncellenmez.
+
+Metrikler process başınadır: çoklu worker modunda her okuma isteği
+karşılayan worker'ın değerlerini döner.
+"""
+import bisect
+import threading
+import time
+
+# Saniye cinsinden kova üst sınırları (le)
+ISTEK_SURE_KOVALARI = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+DOGRULAMA_SURE_KOVALARI = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025)
+SQLITE_SURE_KOVALARI = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+ICERIK_TURU = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _kacis(deger):
+    return str(deger).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiket_metni(adlar, degerler, ek=""):
+    parcalar = [f'{ad}="{_kacis(deger)}"' for ad, deger in zip(adlar, degerler)]
+    if ek:
+        parcalar.append(ek)
+    return "{" + ",".join(parcalar) + "}" if parcalar else ""
+
+
+def _sayi(deger):
+    if deger == float("inf"):
+        return "+Inf"
+    return repr(float(deger)) if isinstance(deger, float) else str(deger)
+
+
+class Sayac:
+    """Yalnızca artan sayaç; etiket değerleri artir()'a sırasıyla verilir."""
+
+    tur = "counter"
+
+    def __init__(self, ad, aciklama, etiketler=()):
+        self.ad = ad
+        self.aciklama = aciklama
+        self.etiketler = tuple(etiketler)
+        self._degerler = {}
+        self._kilit = threading.Lock()
+
+    def artir(self, *etiket_degerleri, miktar=1):
+        with self._kilit:
+            self._degerler[etiket_degerleri] = self._degerler.get(etiket_degerleri, 0) + miktar
+
+    def satirlar(self):
+        with self._kilit:
+            degerler = list(self._degerler.items())
+        return [f"{self.ad}{_etiket_metni(self.etiketler, etiket)} {_sayi(deger)}" for etiket, deger in degerler]
+
+
+class Histogram:
+    """Sabit kovalı histogram (kümülatif le kovaları, _sum ve _count)."""
+
+    tur = "histogram"
+
+    def __init__(self, ad, aciklama, etiketler=(), kovalar=ISTEK_SURE_KOVALARI):
+        self.ad = ad
+        self.aciklama = aciklama
+        self.etiketler = tuple(etiketler)
+        self.kovalar = tuple(kovalar)
+        self._seriler = {}  # etiket değerleri -> [kova sayıları (+Inf dahil), toplam]
+        self._kilit = threading.Lock()
+
+    def gozlemle(self, deger, *etiket_degerleri):
+        sira = bisect.bisect_left(self.kovalar, deger)
+        with self._kilit:
+            seri = self._seriler.get(etiket_degerleri)
+            if seri is None:
+                seri = self._seriler[etiket_degerleri] = [[0] * (len(self.kovalar) + 1), 0.0]
+            seri[0][sira] += 1
+            seri[1] += deger
+
+    def satirlar(self):
+        with self._kilit:
+            seriler = [(etiket, list(sayilar), toplam) for etiket, (sayilar, toplam) in self._seriler.items()]
+        satirlar = []
+        for etiket, sayilar, toplam in seriler:
+            kumulatif = 0
+            for ust, adet in zip(self.kovalar + (float("inf"),), sayilar):
+                kumulatif += adet
+                le = 'le="' + _sayi(ust) + '"'
+                satirlar.append(f"{self.ad}_bucket{_etiket_metni(self.etiketler, etiket, le)} {kumulatif}")
+            satirlar.append(f"{self.ad}_sum{_etiket_metni(self.etiketler, etiket)} {_sayi(toplam)}")
+            satirlar.append(f"{self.ad}_count{_etiket_metni(self.etiketler, etiket)} {kumulatif}")
+        return satirlar
+
+
+class Gosterge:
+    """
+    Okuma anında okuyucu() çağrılarak hesaplanan değer. Etiketliyse okuyucu
+    {etiket değerleri: değer} döner. Başka yerde tutulan bir sayacı yayınlamak
+    için tur="counter" verilebilir.
+    """
+
+    def __init__(self, ad, aciklama, okuyucu, etiketler=(), tur="gauge"):
+        self.ad = ad
+        self.aciklama = aciklama
+        self.okuyucu = okuyucu
+        self.etiketler = tuple(etiketler)
+        self.tur = tur
+
+    def satirlar(self):
+        deger = self.okuyucu()
+        if not self.etiketler:
+            return [f"{self.ad} {_sayi(deger)}"]
+        return [f"{self.ad}{_etiket_metni(self.etiketler, etiket)} {_sayi(d)}" for etiket, d in deger.items()]
+
+
+class MetrikKaydi:
+    def __init__(self):
+        self._metrikler = []
+
+    def _ekle(self, metrik):
+        self._metrikler.append(metrik)
+        return metrik
+
+    def sayac(self, ad, aciklama, etiketler=()):
+        return self._ekle(Sayac(ad, aciklama, etiketler))
+
+    def histogram(self, ad, aciklama, etiketler=(), kovalar=ISTEK_SURE_KOVALARI):
+        return self._ekle(Histogram(ad, aciklama, etiketler, kovalar))
+
+    def gosterge(self, ad, aciklama, okuyucu, etiketler=(), tur="gauge"):
+        return self._ekle(Gosterge(ad, aciklama, okuyucu, etiketler, tur))
+
+    def metin(self):
+        satirlar = []
+        for metrik in self._metrikler:
+            satirlar.append(f"# HELP {metrik.ad} {metrik.aciklama}")
+            satirlar.append(f"# TYPE {metrik.ad} {metrik.tur}")
+            satirlar.extend(metrik.satirlar())
+        return "\n".join(satirlar) + "\n"
+
+
+class MetrikAraKatmani:
+    """
+    HTTP isteklerini rota şablonu (/api/telemetri_gonder), yöntem ve durum
+    koduna göre sayar ve süresini ölçer. Saf ASGI: BaseHTTPMiddleware gibi
+    gövdeyi ayrı bir göreve/akışa sarmaz, yalnızca send'i sarar.
+    Hiçbir rotayla eşleşmeyen yollar tek etikette toplanır.
+    """
+
+    def __init__(self, app, istek_sayaci, istek_suresi):
+        self.app = app
+        self.istek_sayaci = istek_sayaci
+        self.istek_suresi = istek_suresi
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        baslangic = time.perf_counter()
+        kod = 500
+
+        async def send_olcumlu(mesaj):
+            nonlocal kod
+            if mesaj["type"] == "http.response.start":
+                kod = mesaj["status"]
+            await send(mesaj)
+
+        try:
+            await self.app(scope, receive, send_olcumlu)
+        finally:
+            # FastAPI eşleşen rotayı scope'a yazar
+            yol = getattr(scope.get("route"), "path", "eslesmeyen")
+            self.istek_suresi.gozlemle(time.perf_counter() - baslangic, yol)
+            self.istek_sayaci.artir(yol, scope["method"], kod)
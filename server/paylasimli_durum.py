@@ -0,0 +1,164 @@
+import asyncio
+import contextlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+# Durum deposu geçicidir (sunucu her açılışta yeniden kurar); fsync gerekmez.
+# busy_timeout bağlantı açılırken bekleme_ms ile ayrıca verilir.
+DURUM_PRAGMALARI = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=OFF",
+)
+
+
+class DurumMesgul(Exception):
+    """Depo bekleme_ms içinde kilitlenemedi (SQLITE_BUSY); istek reddedilmeli."""
+
+
+@contextlib.contextmanager
+def _mesgul_kontrolu():
+    try:
+        yield
+    except sqlite3.OperationalError as e:
+        if "locked" in str(e) or "busy" in str(e):
+            raise DurumMesgul(str(e)) from e
+        raise
+
+
+class PaylasimliDurum:
+    """
+    Birden fazla uvicorn worker'ı arasında paylaşılan oturum / hız sınırı durumu
+    ve olay günlüğü (yerel SQLite dosyası).
+
+    - oturumlar: IP -> takım no. Bir worker'daki giriş diğerlerinde hemen geçerlidir.
+    - son_telemetri: takım başına son kabul edilen paket zamanı. 2 Hz kuralı
+      tek bir UPSERT ile (SQLite yazma kilidi altında) atomik uygulanır; iki
+      worker aynı takımın iki paketini aynı anda kabul edemez.
+    - olay_gunlugu: kabul edilen telemetri ve kilitlenme raporları sırayla
+      eklenir. Her worker günlüğü okuyup kendi bellekteki konum tablosunu,
+      HSS motorunu ve kilitlenme takibini aynı sırayla günceller; böylece
+      konumBilgileri tüm takımları içerir. Yan etkileri (DB yazımı) yalnızca
+      olayı ekleyen worker yapar.
+
+    Yazan metotlar (oturum_ac, telemetri_kabul_et, olay_ekle, gunlugu_kirp)
+    ve günlük okuma (yeni_olaylar) calistir() ile worker'a ait tek thread'lik
+    havuzda ve kendi bağlantısıyla çalışır; başka bir worker yazma kilidini
+    tutarken bekleyen event loop değil o thread'dir. Tek thread sayesinde
+    olay_ekle'den sonra kuyruğa giren yeni_olaylar o olayı mutlaka görür.
+    Kısa okumalar (oturum, hiz_siniri_asildi) event loop'ta ayrı bir
+    bağlantıyla yapılır; WAL'de okuyucu yazıcıyı beklemez. Kilit bekleme_ms
+    içinde alınamazsa DurumMesgul yükselir.
+    """
+
+    def __init__(self, db_yolu, bekleme_ms=50):
+        self.db_yolu = db_yolu
+        self.bekleme_ms = bekleme_ms
+        self.isci = os.getpid()
+        self.son_sira = 0  # Bu worker'ın uyguladığı son olay
+        self._conn = None        # Okuma bağlantısı (event loop thread'i)
+        self._yazma_conn = None  # Yazma bağlantısı (durum thread'i)
+        self._havuz = None
+
+    def _ac(self):
+        with _mesgul_kontrolu():
+            conn = sqlite3.connect(self.db_yolu, check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout={int(self.bekleme_ms)}")
+            for pragma in DURUM_PRAGMALARI:
+                conn.execute(pragma)
+            conn.execute("CREATE TABLE IF NOT EXISTS oturumlar (ip TEXT PRIMARY KEY, takim_no INTEGER)")
+            conn.execute("CREATE TABLE IF NOT EXISTS son_telemetri (takim_no INTEGER PRIMARY KEY, zaman_ms INTEGER)")
+            conn.execute("""CREATE TABLE IF NOT EXISTS olay_gunlugu (
+                sira INTEGER PRIMARY KEY AUTOINCREMENT, isci INTEGER, zaman_ms INTEGER,
+                tur TEXT, veri TEXT)""")
+            conn.commit()
+        return conn
+
+    def baglanti(self):
+        if self._conn is None:
+            self._conn = self._ac()
+        return self._conn
+
+    def _yazma_baglantisi(self):
+        if self._yazma_conn is None:
+            self._yazma_conn = self._ac()
+        return self._yazma_conn
+
+    async def calistir(self, metot, *args):
+        """Yazan bir metodu (örn. durum.olay_ekle) durum thread'inde çalıştırıp sonucunu döner."""
+        if self._havuz is None:
+            self._havuz = ThreadPoolExecutor(max_workers=1, thread_name_prefix="durum")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._havuz, metot, *args)
+
+    def oturum_ac(self, ip, takim_no):
+        conn = self._yazma_baglantisi()
+        with _mesgul_kontrolu(), conn:
+            conn.execute("INSERT OR REPLACE INTO oturumlar (ip, takim_no) VALUES (?, ?)", (ip, takim_no))
+
+    def oturum(self, ip):
+        """IP'nin takım numarası; giriş yapılmadıysa None."""
+        with _mesgul_kontrolu():
+            satir = self.baglanti().execute("SELECT takim_no FROM oturumlar WHERE ip=?", (ip,)).fetchone()
+        return satir[0] if satir else None
+
+    def hiz_siniri_asildi(self, takim_no, simdi_ms, min_aralik_ms):
+        """Salt okuma: paket şimdi gelse 2 Hz kuralına takılır mıydı."""
+        with _mesgul_kontrolu():
+            satir = self.baglanti().execute("SELECT zaman_ms FROM son_telemetri WHERE takim_no=?",
+                                            (takim_no,)).fetchone()
+        return satir is not None and simdi_ms - satir[0] < min_aralik_ms
+
+    def telemetri_kabul_et(self, takim_no, simdi_ms, min_aralik_ms, kayit):
+        """
+        2 Hz kuralını atomik uygular; paket kabul edilirse günlüğe ekler ve
+        True döner. Başka bir worker bu takımın paketini son min_aralik_ms
+        içinde kabul ettiyse False.
+        """
+        conn = self._yazma_baglantisi()
+        with _mesgul_kontrolu(), conn:
+            imlec = conn.execute(
+                "INSERT INTO son_telemetri (takim_no, zaman_ms) VALUES (?, ?) "
+                "ON CONFLICT(takim_no) DO UPDATE SET zaman_ms=excluded.zaman_ms "
+                "WHERE excluded.zaman_ms - son_telemetri.zaman_ms >= ?",
+                (takim_no, simdi_ms, min_aralik_ms))
+            if imlec.rowcount != 1:
+                return False
+            conn.execute("INSERT INTO olay_gunlugu (isci, zaman_ms, tur, veri) VALUES (?, ?, 't', ?)",
+                         (self.isci, simdi_ms, json.dumps(kayit)))
+        return True
+
+    def olay_ekle(self, tur, veri, simdi_ms):
+        """Günlüğe olay ekler ve sırasını döner."""
+        conn = self._yazma_baglantisi()
+        with _mesgul_kontrolu(), conn:
+            imlec = conn.execute("INSERT INTO olay_gunlugu (isci, zaman_ms, tur, veri) VALUES (?, ?, ?, ?)",
+                                 (self.isci, simdi_ms, tur, json.dumps(veri)))
+        return imlec.lastrowid
+
+    def yeni_olaylar(self):
+        """Son okunandan sonraki olaylar: [(sira, kendi_olayi_mi, tur, veri)]."""
+        with _mesgul_kontrolu():
+            satirlar = self._yazma_baglantisi().execute(
+                "SELECT sira, isci, tur, veri FROM olay_gunlugu WHERE sira > ? ORDER BY sira",
+                (self.son_sira,)).fetchall()
+        if satirlar:
+            self.son_sira = satirlar[-1][0]
+        return [(sira, isci == self.isci, tur, json.loads(veri)) for sira, isci, tur, veri in satirlar]
+
+    def gunlugu_kirp(self, esik_ms):
+        """esik_ms'den eski olayları siler (tüm worker'lar bunları çoktan uyguladı)."""
+        conn = self._yazma_baglantisi()
+        with _mesgul_kontrolu(), conn:
+            conn.execute("DELETE FROM olay_gunlugu WHERE zaman_ms < ?", (esik_ms,))
+
+    def kapat(self):
+        if self._havuz is not None:
+            self._havuz.shutdown(wait=True)
+            self._havuz = None
+        for conn in (self._conn, self._yazma_conn):
+            if conn is not None:
+                conn.close()
+        self._conn = None
+        self._yazma_conn = None
@@ -0,0 +1,164 @@
+"""
+Maç sırasında sunucuyu yeniden başlatmadan profil çıkarma.
+
+İki tür:
+- cprofile: cProfile event loop thread'inde açılır; tüm async handler'lar
+  (telemetri_gonder, WebSocket, diğer uçlar) fonksiyon bazında ölçülür.
+  Sonuç pstats dosyasıdır (python -m pstats, snakeviz).
+- ornekleme: ayrı bir thread aralik_ms'de bir tüm thread'lerin yığınını
+  örnekler (DB ve yazıcı thread'leri dahil). Sonuç collapsed-stack metnidir
+  (flamegraph.pl, speedscope).
+
+Oturum sure_s dolunca veya (verildiyse) istek_sayisi kadar HTTP isteği
+bitince kapanır; yol verilirse yalnızca o rotanın istekleri sayılır.
+Kapalıyken hiçbir profil/örnekleme çalışmaz; istek yolundaki tek maliyet
+ProfilAraKatmani'ndaki bir bool kontrolüdür.
+"""
+import cProfile
+import collections
+import datetime
+import os
+import sys
+import threading
+import time
+
+from gunluk import olay
+
+PROFIL_TURLERI = ("cprofile", "ornekleme")
+
+
+class Ornekleyici(threading.Thread):
+    """sys._current_frames() ile yığın örnekler; {"thread;dış;...;iç": adet} biriktirir."""
+
+    def __init__(self, aralik_s):
+        super().__init__(name="profil-ornekleyici", daemon=True)
+        self.aralik_s = aralik_s
+        self.sayimlar = collections.Counter()
+        self.ornek_sayisi = 0
+        self._dur = threading.Event()
+
+    def run(self):
+        kendi = threading.get_ident()
+        while not self._dur.wait(self.aralik_s):
+            adlar = {t.ident: t.name for t in threading.enumerate()}
+            for ident, cerceve in sys._current_frames().items():
+                if ident == kendi:
+                    continue
+                yigin = []
+                while cerceve is not None:
+                    kod = cerceve.f_code
+                    yigin.append(f"{kod.co_name} ({os.path.basename(kod.co_filename)}:{kod.co_firstlineno})")
+                    cerceve = cerceve.f_back
+                yigin.append(adlar.get(ident, str(ident)))
+                self.sayimlar[";".join(reversed(yigin))] += 1
+            self.ornek_sayisi += 1
+
+    def durdur(self):
+        self._dur.set()
+        self.join()
+
+    def yaz(self, dosya_yolu):
+        with open(dosya_yolu, "w", encoding="utf-8") as f:
+            for yigin, adet in self.sayimlar.most_common():
+                f.write(f"{yigin} {adet}\n")
+
+
+class Profilleyici:
+    """
+    Aynı anda en fazla bir profil oturumu. baslat/durdur/istek_bitti event
+    loop thread'inden çağrılır (cProfile açıldığı thread'de kapatılmalı).
+    """
+
+    def __init__(self, klasor, azami_sure_s=300):
+        self.klasor = klasor
+        self.azami_sure_s = azami_sure_s
+        self.aktif = False
+        self.son_dosya = None
+        self._oturum = None
+        self._zamanlayici = None
+
+    def baslat(self, loop, tur, sure_s, istek_sayisi=None, yol=None, aralik_ms=5):
+        """Oturumu açar; tür bilinmiyorsa ValueError, oturum zaten açıksa RuntimeError."""
+        if tur not in PROFIL_TURLERI:
+            raise ValueError(f"Bilinmeyen profil türü: {tur}")
+        if self.aktif:
+            raise RuntimeError("Profil oturumu zaten açık")
+        sure_s = min(sure_s, self.azami_sure_s)
+        oturum = {"tur": tur, "baslangic": time.time(), "sure_s": sure_s, "istek_sayisi": istek_sayisi,
+                  "yol": yol, "biten_istek": 0}
+        if tur == "cprofile":
+            oturum["profil"] = cProfile.Profile()
+            oturum["profil"].enable()
+        else:
+            oturum["ornekleyici"] = Ornekleyici(aralik_ms / 1000)
+            oturum["ornekleyici"].start()
+        self._oturum = oturum
+        self._zamanlayici = loop.call_later(sure_s, self.durdur)
+        self.aktif = True
+        return self.durum()
+
+    def istek_bitti(self, yol):
+        oturum = self._oturum
+        if oturum is None or oturum["istek_sayisi"] is None:
+            return
+        if oturum["yol"] is not None and yol != oturum["yol"]:
+            return
+        oturum["biten_istek"] += 1
+        if oturum["biten_istek"] >= oturum["istek_sayisi"]:
+            self.durdur()
+
+    def durdur(self):
+        """Açık oturumu kapatıp sonucu diske yazar; dosya yolunu (yoksa None) döner."""
+        oturum = self._oturum
+        if oturum is None:
+            return None
+        self.aktif = False
+        self._oturum = None
+        if self._zamanlayici is not None:
+            self._zamanlayici.cancel()
+            self._zamanlayici = None
+
+        os.makedirs(self.klasor, exist_ok=True)
+        zaman = datetime.datetime.fromtimestamp(oturum["baslangic"]).strftime("%Y%m%d_%H%M%S")
+        if oturum["tur"] == "cprofile":
+            oturum["profil"].disable()
+            dosya_yolu = os.path.join(self.klasor, f"profil_{zaman}_{os.getpid()}.prof")
+            oturum["profil"].dump_stats(dosya_yolu)
+        else:
+            oturum["ornekleyici"].durdur()
+            dosya_yolu = os.path.join(self.klasor, f"profil_{zaman}_{os.getpid()}.folded")
+            oturum["ornekleyici"].yaz(dosya_yolu)
+        self.son_dosya = dosya_yolu
+        olay("profil_bitti", tur=oturum["tur"], dosya=dosya_yolu, biten_istek=oturum["biten_istek"])
+        return dosya_yolu
+
+    def durum(self):
+        oturum = self._oturum
+        durum = {"aktif": self.aktif, "son_dosya": self.son_dosya, "pid": os.getpid()}
+        if oturum is not None:
+            durum.update({
+                "tur": oturum["tur"],
+                "gecen_s": round(time.time() - oturum["baslangic"], 3),
+                "sure_s": oturum["sure_s"],
+                "istek_sayisi": oturum["istek_sayisi"],
+                "yol": oturum["yol"],
+                "biten_istek": oturum["biten_istek"],
+            })
+        return durum
+
+
+class ProfilAraKatmani:
+    """Profil oturumu açıkken biten HTTP isteklerini Profilleyici'ye bildirir."""
+
+    def __init__(self, app, profilleyici):
+        self.app = app
+        self.profilleyici = profilleyici
+
+    async def __call__(self, scope, receive, send):
+        if not self.profilleyici.aktif or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profilleyici.istek_bitti(getattr(scope.get("route"), "path", None))
@@ -1,22 +1,116 @@
-from fastapi import FastAPI, HTTPException, status, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, status, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, ValidationError, model_validator, validator
 from typing import List, Dict, Optional
-import sqlite3
+import asyncio
 import time
 import datetime
 import uvicorn
+import hmac
 import json
+import logging
 import os
 
+from akis_kutusu import AkisKutusu
+from gunluk import atilan_kayit_sayisi, gunlugu_kur, gunlukcu, olay, ornekleme_oranlari
+from hss_motoru import HSS_BOLGELERI, HSS_IHLAL_INSERT_SQL, HSS_IHLAL_TABLO_SQL, HssMotoru
+from kilitlenme_takibi import KilitlenmeTakibi, saat_metni
+from kimlik_deposu import KimlikDeposu
+from konum_tablosu import KonumTablosu
+from metrikler import (DOGRULAMA_SURE_KOVALARI, ICERIK_TURU, SQLITE_SURE_KOVALARI, MetrikAraKatmani,
+                       MetrikKaydi)
+from paylasimli_durum import DurumMesgul, PaylasimliDurum
+from profilleyici import ProfilAraKatmani, Profilleyici
+from telemetri_kaydi import TelemetriKaydi
+from telemetri_yazici import TelemetriYazici
+from veritabani import BaglantiYoneticisi
+
+# --- AYARLAR ---
+# Telemetri satırları arka planda toplu yazılır (bkz. telemetri_yazici.py)
+TELEMETRI_KUYRUK_BOYUTU = int(os.environ.get("TELEMETRI_KUYRUK_BOYUTU", 10000))
+TELEMETRI_PARTI_BOYUTU = int(os.environ.get("TELEMETRI_PARTI_BOYUTU", 500))
+TELEMETRI_YAZMA_ARALIGI_S = float(os.environ.get("TELEMETRI_YAZMA_ARALIGI_S", 0.2))
+# Giriş/kilitlenme/kamikaze sorgularını çalıştıran DB thread sayısı
+DB_ISCI_SAYISI = int(os.environ.get("DB_ISCI_SAYISI", 4))
+# WebSocket abonelerine konumBilgileri yayın aralığı (saniye)
+KONUM_YAYIN_ARALIGI_S = float(os.environ.get("KONUM_YAYIN_ARALIGI_S", 0.2))
+# WebSocket bağlantısı başına gönderilmeyi bekleyen en fazla paket cevabı (bkz. akis_kutusu.py)
+AKIS_KUTUSU_KAPASITESI = int(os.environ.get("AKIS_KUTUSU_KAPASITESI", 32))
+# Rakip yarıçap / en yakın K sorguları için ızgara hücre kenarı (metre)
+KONUM_IZGARA_HUCRE_M = float(os.environ.get("KONUM_IZGARA_HUCRE_M", 100.0))
+# Aynı takımın iki telemetri paketi arasındaki en kısa süre (2 Hz kuralı, tolerans payıyla).
+# Yalnızca hızlandırılmış tekrar oynatma testlerinde düşürülür (bkz. bench/tekrar_oynatici.py)
+TELEMETRI_MIN_ARALIK_MS = int(os.environ.get("TELEMETRI_MIN_ARALIK_MS", 490))
+# Çoklu worker modu: >1 ise sunucu bu kadar uvicorn process'iyle açılır (bkz. __main__).
+# Worker'lar oturum, 2 Hz ve konum durumunu PAYLASIMLI_DURUM_DB'deki SQLite deposundan paylaşır;
+# değişken tanımlı değilse durum process içindedir (tek worker).
+SUNUCU_ISCI_SAYISI = int(os.environ.get("SUNUCU_ISCI_SAYISI", 1))
+PAYLASIMLI_DURUM_DB = os.environ.get("PAYLASIMLI_DURUM_DB")
+# Paylaşılan depoda başka bir worker'ın yazma kilidi için en fazla bekleme (ms); dolarsa istek 503 ile reddedilir
+PAYLASIMLI_DURUM_BEKLEME_MS = int(os.environ.get("PAYLASIMLI_DURUM_BEKLEME_MS", 50))
+# Kilitlenme raporu kendi olayı uygulanana kadar günlüğü en çok bu kadar kez okur; olmazsa 503
+KILITLENME_UYGULAMA_DENEME = int(os.environ.get("KILITLENME_UYGULAMA_DENEME", 5))
+# teams.json değişiklik kontrolü aralığı (saniye); değişince kimlikler yeniden yüklenir
+KIMLIK_KONTROL_ARALIGI_S = float(os.environ.get("KIMLIK_KONTROL_ARALIGI_S", 1.0))
+# Olay günlüğü: JSON satırları, arka plan thread'iyle yazılır (bkz. gunluk.py).
+# Telemetri paketleri DEBUG seviyesindedir; GUNLUK_SEVIYE=DEBUG ile örneklenerek yazılır.
+GUNLUK_DOSYASI = os.environ.get("GUNLUK_DOSYASI", os.path.join("logs", "hakem_olaylari.jsonl"))
+GUNLUK_SEVIYE = os.environ.get("GUNLUK_SEVIYE", "INFO")
+GUNLUK_MAX_BYTE = int(os.environ.get("GUNLUK_MAX_BYTE", 10 * 1024 * 1024))
+GUNLUK_YEDEK_SAYISI = int(os.environ.get("GUNLUK_YEDEK_SAYISI", 5))
+GUNLUK_ORNEKLEME = os.environ.get("GUNLUK_ORNEKLEME", "DEBUG=0.01")
+GUNLUK_KONSOL = os.environ.get("GUNLUK_KONSOL", "1") == "1"
+# HSS ihlal kontrolü için önceden sınıflandırılan ızgaranın hücre kenarı (metre)
+HSS_IZGARA_HUCRE_M = float(os.environ.get("HSS_IZGARA_HUCRE_M", 25.0))
+# Hakem kontrol uçları (/hakem/...) X-Hakem-Anahtari başlığında bu anahtarı ister;
+# tanımlı değilse uçlar kapalıdır (404)
+HAKEM_ANAHTARI = os.environ.get("HAKEM_ANAHTARI")
+# İsteğe bağlı profil çıktıları (bkz. profilleyici.py)
+PROFIL_KLASORU = os.environ.get("PROFIL_KLASORU", "profiller")
+PROFIL_AZAMI_SURE_S = float(os.environ.get("PROFIL_AZAMI_SURE_S", 300))
+
 app = FastAPI(title="TEKNOFEST 2025 Savaşan İHA Sunucusu (Strict Mode)")
 
+# --- GÜNLÜK ---
+# İstek yolu yalnızca kuyruğa ekler; konsol ve dosya yazımı dinleyici thread'inde.
+# Çoklu worker'da her process kendi dosyasını döndürür.
+_gunluk_dosyasi = GUNLUK_DOSYASI
+if PAYLASIMLI_DURUM_DB:
+    _gunluk_kok, _gunluk_uzanti = os.path.splitext(GUNLUK_DOSYASI)
+    _gunluk_dosyasi = f"{_gunluk_kok}.{os.getpid()}{_gunluk_uzanti}"
+gunluk_dinleyici = gunlugu_kur(_gunluk_dosyasi, seviye=GUNLUK_SEVIYE, max_byte=GUNLUK_MAX_BYTE,
+                               yedek_sayisi=GUNLUK_YEDEK_SAYISI,
+                               ornekleme=ornekleme_oranlari(GUNLUK_ORNEKLEME), konsol=GUNLUK_KONSOL)
+
+# --- METRİKLER ---
+# GET /metrics, Prometheus metin biçimi (bkz. metrikler.py). İstek yolunda yalnızca
+# sayaç/histogram güncellenir; kuyruk derinlikleri ve takım sayısı okunurken hesaplanır.
+metrik_kaydi = MetrikKaydi()
+http_istekleri = metrik_kaydi.sayac("hakem_http_istek_toplam", "Rota, yöntem ve durum koduna göre HTTP istekleri",
+                                    ("yol", "yontem", "kod"))
+http_sureleri = metrik_kaydi.histogram("hakem_http_istek_suresi_saniye", "Rota başına HTTP istek süresi", ("yol",))
+dogrulama_sureleri = metrik_kaydi.histogram("hakem_dogrulama_suresi_saniye", "Pydantic model doğrulama süresi",
+                                            ("model",), DOGRULAMA_SURE_KOVALARI)
+sqlite_sureleri = metrik_kaydi.histogram("hakem_sqlite_suresi_saniye",
+                                         "SQLite süreleri: yazıcı partisi insert/commit, DB havuzundaki işler",
+                                         ("hedef", "islem"), SQLITE_SURE_KOVALARI)
+telemetri_redleri = metrik_kaydi.sayac("hakem_telemetri_red_toplam",
+                                       "Reddedilen telemetri paketleri (HTTP, ikili ve WebSocket)", ("kod", "sebep"))
+app.add_middleware(MetrikAraKatmani, istek_sayaci=http_istekleri, istek_suresi=http_sureleri)
+
+# --- PROFİL ---
+# Hakem ucundan açılıp kapatılır; kapalıyken istek başına tek bool kontrolü
+profilleyici = Profilleyici(PROFIL_KLASORU, azami_sure_s=PROFIL_AZAMI_SURE_S)
+app.add_middleware(ProfilAraKatmani, profilleyici=profilleyici)
+
 # --- VERİTABANI BAŞLATMA ---
+# Bağlantılar thread başına bir kez açılıp yeniden kullanılır (bkz. veritabani.py)
+db_yoneticisi = BaglantiYoneticisi('yarisma_verileri.db', isci_sayisi=DB_ISCI_SAYISI,
+                                   olcum=lambda ad, sure: sqlite_sureleri.gozlemle(sure, ad, "sorgu"))
+
 def get_db():
-    conn = sqlite3.connect('yarisma_verileri.db', check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db_yoneticisi.baglanti()
 
 def init_db():
     conn = get_db()
@@ -30,41 +124,139 @@ def init_db():
         gps_saati_ms INTEGER, sunucu_saati_ms INTEGER)''')
     
     cursor.execute('''CREATE TABLE IF NOT EXISTS kilitlenmeler (
-        takim_no INTEGER, baslangic_saati TEXT, bitis_saati TEXT, otonom_mu INTEGER)''')
+        takim_no INTEGER, baslangic_saati TEXT, bitis_saati TEXT, otonom_mu INTEGER,
+        sure_ms INTEGER)''')
+    # Eski veritabanları: sure_ms sütunu sonradan eklendi
+    kilitlenme_sutunlari = [satir[1] for satir in cursor.execute("PRAGMA table_info(kilitlenmeler)")]
+    if "sure_ms" not in kilitlenme_sutunlari:
+        cursor.execute("ALTER TABLE kilitlenmeler ADD COLUMN sure_ms INTEGER")
 
     cursor.execute('''CREATE TABLE IF NOT EXISTS kamikaze (
         takim_no INTEGER, baslangic_saati TEXT, bitis_saati TEXT, qr_metni TEXT)''')
 
     cursor.execute("CREATE TABLE IF NOT EXISTS takimlar (kadi TEXT, sifre TEXT, takim_no INTEGER)")
-    
-    # Takımları JSON dosyasından yükle
-    try:
-        if os.path.exists("teams.json"):
-            with open("teams.json", "r") as f:
-                teams = json.load(f)
-                for team in teams:
-                    cursor.execute("INSERT OR IGNORE INTO takimlar (kadi, sifre, takim_no) VALUES (?, ?, ?)",
-                                   (team['kadi'], team['sifre'], team['takim_no']))
-                print(f"{len(teams)} teams loaded from teams.json.")
-        else:
-            print("Warning: teams.json not found. Using default team.")
-            cursor.execute("INSERT OR IGNORE INTO takimlar VALUES ('rota_takim', 'parola123', 1)")
-    except Exception as e:
-        print(f"Error loading teams: {e}")
+    # Eski veritabanları: INSERT OR IGNORE tekil anahtar olmadığı için her açılışta
+    # takımları yeniden ekliyordu. Tekrarları silip kadi'yi tekil yap.
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE name='idx_takimlar_kadi_tekil'").fetchone() is None:
+        cursor.execute("DELETE FROM takimlar WHERE rowid NOT IN (SELECT MIN(rowid) FROM takimlar GROUP BY kadi)")
+        cursor.execute("DROP INDEX IF EXISTS idx_takimlar_kadi")
+        cursor.execute("CREATE UNIQUE INDEX idx_takimlar_kadi_tekil ON takimlar (kadi)")
+
+    cursor.execute(HSS_IHLAL_TABLO_SQL)
+
+    # İndeksler: maç sonrası okumalar takım ve zaman ile yapılır
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_telemetri_takim_zaman ON telemetri (takim_no, sunucu_saati_ms)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_telemetri_zaman ON telemetri (sunucu_saati_ms)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_hss_ihlalleri_takim ON hss_ihlalleri (takim_no, giris_ms)")
 
     conn.commit()
-    conn.close()
+
+def takimlari_kaydet(conn, takimlar):
+    """Yüklenen takımları takimlar tablosuna ekler/günceller (maç sonrası araçlar buradan okur)."""
+    with conn:
+        conn.executemany("INSERT INTO takimlar (kadi, sifre, takim_no) VALUES (?, ?, ?) "
+                         "ON CONFLICT(kadi) DO UPDATE SET sifre=excluded.sifre, takim_no=excluded.takim_no",
+                         [(takim['kadi'], takim['sifre'], takim['takim_no']) for takim in takimlar])
 
 init_db()
 
+# --- KİMLİK BİLGİLERİ ---
+# Giriş DB'ye gitmeden bellekteki kadi -> (sifre, takim_no) sözlüğünden doğrulanır.
+# teams.json maç sırasında değişirse yeniden başlatmadan yüklenir (bkz. kimlik_yenileme_dongusu).
+kimlik_deposu = KimlikDeposu("teams.json", [{"kadi": "rota_takim", "sifre": "parola123", "takim_no": 1}])
+_takimlar = kimlik_deposu.yukle()
+if _takimlar is not None:
+    takimlari_kaydet(get_db(), _takimlar)
+
+TELEMETRI_INSERT_SQL = """INSERT INTO telemetri (
+    takim_no, enlem, boylam, irtifa, dikilme, yonelme, yatis, hiz,
+    batarya, otonom, kilitlenme, hedef_merkez_X, hedef_merkez_Y,
+    hedef_genislik, hedef_yukseklik, gps_saati_ms, sunucu_saati_ms
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+telemetri_yazici = TelemetriYazici(get_db, TELEMETRI_INSERT_SQL,
+                                   kuyruk_boyutu=TELEMETRI_KUYRUK_BOYUTU,
+                                   parti_boyutu=TELEMETRI_PARTI_BOYUTU,
+                                   yazma_araligi_s=TELEMETRI_YAZMA_ARALIGI_S,
+                                   olcum=lambda islem, sure: sqlite_sureleri.gozlemle(sure, "telemetri", islem))
+# Kapanan HSS ihlal aralıkları da aynı şekilde arka planda yazılır
+hss_yazici = TelemetriYazici(get_db, HSS_IHLAL_INSERT_SQL, ad="hss-yazici",
+                             olcum=lambda islem, sure: sqlite_sureleri.gozlemle(sure, "hss_ihlalleri", islem))
+
+@app.on_event("startup")
+async def startup_event():
+    telemetri_yazici.baslat()
+    hss_yazici.baslat()
+    asyncio.create_task(konum_yayini_dongusu())
+    asyncio.create_task(kimlik_yenileme_dongusu())
+    if paylasimli_durum is not None:
+        asyncio.create_task(paylasimli_senkron_dongusu())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Kuyrukta bekleyen telemetri satırlarını diske yazmadan kapanma
+    telemetri_yazici.durdur()
+    # Açık HSS ihlalleri takımın son paketiyle kapatılır; çoklu worker'da
+    # yalnızca takımın son paketini kabul eden worker yazar
+    if paylasimli_durum is not None:
+        try:
+            await paylasimli_olaylari_uygula()
+        except DurumMesgul:
+            pass  # Diğer worker'ların son paketleri bu worker'ın kapanışında işlenmez
+    for ihlal in hss_motoru.tumunu_kapat():
+        if son_paket_sahibi.get(ihlal[0], True):
+            hss_yazici.ekle(ihlal)
+    hss_yazici.durdur()
+    if paylasimli_durum is not None:
+        paylasimli_durum.kapat()
+    profilleyici.durdur()
+    gunluk_dinleyici.stop()
+    db_yoneticisi.kapat()
+
 # --- BELLEKTE TAKİP (IP TABANLI OTURUM) ---
 # Döküman[cite: 17]: "Sisteme yalnızca belirtilen ip adresleri üzerinden bağlantıya izin verilecektir."
 # Bu yüzden session yönetimini IP üzerinden yapıyoruz.
 ip_session_map = {}  # { "127.0.0.1": takim_no }
 son_telemetri_zamanlari = {} # {takim_no: ms_timestamp}
 
+# Çoklu worker modunda yukarıdaki iki sözlüğün yerine paylaşılan depo kullanılır
+paylasimli_durum = (PaylasimliDurum(PAYLASIMLI_DURUM_DB, bekleme_ms=PAYLASIMLI_DURUM_BEKLEME_MS)
+                    if PAYLASIMLI_DURUM_DB else None)
+son_paket_sahibi = {}       # {takim_no: son paketi bu worker mı kabul etti}
+kilitlenme_sonuclari = {}   # {olay sırası: (baslangic_ms, sure_ms)}; cevabı bekleyen raporlar
+kilitlenme_vazgecilen = set()  # 503 dönen raporların sıraları; uygulanınca sonucu saklanmaz
+
+# --- SON KONUM TABLOSU ---
+# konumBilgileri her pakette tüm telemetri tablosu taranarak üretiliyordu (GROUP BY).
+# Artık her takımın en son paketi bellekte, önceden JSON'a kodlanmış halde
+# tutuluyor; cevap SQL'siz ve rakip başına yeniden kodlama yapmadan oluşturuluyor.
+TIMEOUT_MS = 5000 # Bu süreden eski konumlar listeden düşer
+konum_tablosu = KonumTablosu(TIMEOUT_MS, hucre_m=KONUM_IZGARA_HUCRE_M)
+konum_aboneleri = set() # /api/telemetri_akisi bağlantılarının giden kutuları (AkisKutusu)
+
+# --- HSS İHLAL TAKİBİ ---
+# Her paket aktif HSS bölgelerine karşı kontrol edilir (bkz. hss_motoru.py)
+hss_motoru = HssMotoru(HSS_BOLGELERI, hucre_m=HSS_IZGARA_HUCRE_M)
+
+# --- KİLİTLENME ARALIKLARI ---
+# Telemetrideki iha_kilitlenme ile açılan aralıklar kilitlenme raporu gelince
+# kapatılır; baslangic_saati ve sure_ms buradan gelir (bkz. kilitlenme_takibi.py)
+kilitlenme_takibi = KilitlenmeTakibi()
+
 # --- MODELLER (Strict Validation) ---
 
+class OlculenModel(BaseModel):
+    """Doğrulama süresi hakem_dogrulama_suresi_saniye{model=...} histogramına yazılır."""
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _dogrulama_suresi(cls, deger, isleyici):
+        baslangic = time.perf_counter()
+        try:
+            return isleyici(deger)
+        finally:
+            dogrulama_sureleri.gozlemle(time.perf_counter() - baslangic, cls.__name__)
+
 class SaatModel(BaseModel):
     saat: int
     dakika: int
@@ -72,16 +264,16 @@ class SaatModel(BaseModel):
     milisaniye: int
 
 # Kilitlenme ve Kamikaze paketlerinde Takım No YOK 
-class KilitlenmeModel(BaseModel):
+class KilitlenmeModel(OlculenModel):
     kilitlenmeBitisZamani: SaatModel
     otonom_kilitlenme: int # Dökümanda snake_case [cite: 182]
 
-class KamikazeModel(BaseModel):
+class KamikazeModel(OlculenModel):
     kamikazeBaslangicZamani: SaatModel
     kamikazeBitisZamani: SaatModel
     qrMetni: str
 
-class TelemetriModel(BaseModel):
+class TelemetriModel(OlculenModel):
     takim_numarasi: int # Telemetride Var [cite: 101]
     iha_enlem: float
     iha_boylam: float
@@ -106,6 +298,13 @@ async def validation_exception_handler(request, exc):
     # Pydantic bir model hatası (format hatası) yakalarsa 204 dönüyoruz.
     return JSONResponse(status_code=204, content={"detail": "Format Yanlış"})
 
+@app.exception_handler(DurumMesgul)
+async def durum_mesgul_handler(request, exc):
+    # Çoklu worker: paylaşılan depo PAYLASIMLI_DURUM_BEKLEME_MS içinde kilitlenemedi.
+    # Event loop'u bekletmek yerine istek reddedilir; istemci sonraki denemede gönderir.
+    olay("durum_mesgul", logging.WARNING, yol=request.url.path)
+    return JSONResponse(status_code=503, content={"detail": "Sunucu mesgul"})
+
 # --- YARDIMCI FONKSİYONLAR ---
 def mevcut_sunucu_saati():
     n = datetime.datetime.now()
@@ -118,6 +317,135 @@ def mevcut_sunucu_saati():
 def format_time_str(t: SaatModel):
     return f"{t.saat}:{t.dakika}:{t.saniye}:{t.milisaniye}"
 
+# --- VERİTABANI İŞLERİ ---
+# Bu fonksiyonlar event loop'ta değil, db_yoneticisi.calistir() ile DB thread
+# havuzunda çalışır.
+
+def kilitlenme_kaydet(conn, takim_no, baslangic_str, bitis_str, otonom_mu, sure_ms):
+    conn.execute("INSERT INTO kilitlenmeler (takim_no, baslangic_saati, bitis_saati, otonom_mu, sure_ms) "
+                 "VALUES (?, ?, ?, ?, ?)",
+                 (takim_no, baslangic_str, bitis_str, otonom_mu, sure_ms))
+    conn.commit()
+
+def kamikaze_kaydet(conn, takim_no, baslangic_str, bitis_str, qr_metni):
+    conn.execute("INSERT INTO kamikaze (takim_no, baslangic_saati, bitis_saati, qr_metni) VALUES (?, ?, ?, ?)",
+                 (takim_no, baslangic_str, bitis_str, qr_metni))
+    conn.commit()
+
+def hss_ihlalleri_sorgula(conn, takim_no):
+    if takim_no is None:
+        return conn.execute("SELECT * FROM hss_ihlalleri ORDER BY giris_ms").fetchall()
+    return conn.execute("SELECT * FROM hss_ihlalleri WHERE takim_no=? ORDER BY giris_ms",
+                        (takim_no,)).fetchall()
+
+# --- OTURUM VE DURUM ---
+def oturum_takimi(client_ip):
+    """IP'nin oturum açtığı takım no; giriş yapılmadıysa None."""
+    if paylasimli_durum is not None:
+        return paylasimli_durum.oturum(client_ip)
+    return ip_session_map.get(client_ip)
+
+async def oturum_ac(client_ip, takim_no):
+    if paylasimli_durum is not None:
+        await paylasimli_durum.calistir(paylasimli_durum.oturum_ac, client_ip, takim_no)
+    else:
+        ip_session_map[client_ip] = takim_no
+
+def telemetri_uygula(data: TelemetriKaydi, simdi_ms, sahip=True):
+    """
+    Kabul edilen paketi bellekteki durumlara işler. Çoklu worker'da her worker
+    tüm takımların paketlerini günlükten aynı sırayla uygular; DB yan etkisi
+    (HSS ihlali yazımı) yalnızca paketi kabul eden worker'da (sahip) olur.
+    """
+    son_telemetri_zamanlari[data.takim_numarasi] = simdi_ms
+    son_paket_sahibi[data.takim_numarasi] = sahip
+    konum_tablosu.guncelle(data.takim_numarasi, simdi_ms, {
+        "takim_numarasi": data.takim_numarasi,
+        "iha_enlem": data.iha_enlem,
+        "iha_boylam": data.iha_boylam,
+        "iha_irtifa": data.iha_irtifa,
+        "iha_dikilme": data.iha_dikilme,
+        "iha_yonelme": data.iha_yonelme,
+        "iha_yatis": data.iha_yatis,
+        "iha_hizi": data.iha_hiz,
+    })
+    for ihlal in hss_motoru.kontrol(data.takim_numarasi, data.iha_enlem, data.iha_boylam, simdi_ms):
+        if sahip:
+            hss_yazici.ekle(ihlal)
+            olay("hss_ihlali", takim_no=ihlal[0], hss_id=ihlal[1], giris_ms=ihlal[2], cikis_ms=ihlal[3],
+                 sure_ms=ihlal[4])
+    kilitlenme_takibi.guncelle(data.takim_numarasi, data.iha_kilitlenme == 1, data.gps_saati_ms)
+
+async def paylasimli_olaylari_uygula():
+    """
+    Diğer worker'ların (ve bu worker'ın) günlüğe eklediği olayları sırayla uygular.
+    Günlük durum thread'inde okunur; depo meşgulse DurumMesgul yükselir ve
+    olaylar bir sonraki çağrıda (en geç senkron döngüsünde) uygulanır.
+    """
+    olaylar = await paylasimli_durum.calistir(paylasimli_durum.yeni_olaylar)
+    # Uygulama await içermez: eşzamanlı çağrılar olayları okundukları sırayla işler
+    for sira, sahip, tur, veri in olaylar:
+        if tur == "t":
+            telemetri_uygula(TelemetriKaydi(*veri[:-1]), veri[-1], sahip)
+        elif tur == "k":
+            sonuc = kilitlenme_takibi.raporla(*veri)
+            if sahip:
+                if sira in kilitlenme_vazgecilen:
+                    kilitlenme_vazgecilen.discard(sira)
+                else:
+                    kilitlenme_sonuclari[sira] = sonuc
+
+async def kilitlenme_sonucunu_bekle(sira):
+    """
+    Bu worker'ın günlüğe eklediği kilitlenme raporu uygulanana kadar günlüğü
+    okur ve (baslangic_ms, sure_ms) döner. KILITLENME_UYGULAMA_DENEME denemede
+    uygulanamazsa DurumMesgul yükselir (503); olay daha sonra yine uygulanır
+    ama sonucunu bekleyen olmadığı için saklanmaz.
+    """
+    sonuc = None
+    try:
+        for deneme in range(KILITLENME_UYGULAMA_DENEME):
+            if deneme:
+                await asyncio.sleep(PAYLASIMLI_DURUM_BEKLEME_MS / 1000)
+            try:
+                await paylasimli_olaylari_uygula()
+            except DurumMesgul:
+                continue
+            if sira in kilitlenme_sonuclari:
+                sonuc = kilitlenme_sonuclari.pop(sira)
+                return sonuc
+        raise DurumMesgul(f"kilitlenme olayı {sira} uygulanamadı")
+    finally:
+        if sonuc is None and kilitlenme_sonuclari.pop(sira, None) is None:
+            # Henüz uygulanmadı: uygulandığında sonucu saklanmasın
+            kilitlenme_vazgecilen.add(sira)
+
+async def kimlik_yenileme_dongusu():
+    """teams.json değiştiyse kimlikleri yeniden yükler ve takimlar tablosunu günceller."""
+    while True:
+        await asyncio.sleep(KIMLIK_KONTROL_ARALIGI_S)
+        if not kimlik_deposu.degisti_mi():
+            continue
+        takimlar = kimlik_deposu.yukle()
+        if takimlar is not None:
+            await db_yoneticisi.calistir(takimlari_kaydet, takimlar)
+
+async def paylasimli_senkron_dongusu():
+    """İstek gelmese de diğer worker'ların paketlerini uygular, eski günlüğü kırpar."""
+    son_kirpma = time.monotonic()
+    while True:
+        await asyncio.sleep(KONUM_YAYIN_ARALIGI_S)
+        try:
+            await paylasimli_olaylari_uygula()
+        except DurumMesgul:
+            pass  # Sonraki turda yeniden denenir
+        if time.monotonic() - son_kirpma > 10:
+            son_kirpma = time.monotonic()
+            try:
+                await paylasimli_durum.calistir(paylasimli_durum.gunlugu_kirp, int(time.time() * 1000) - 60000)
+            except DurumMesgul:
+                pass  # Sonraki turda yeniden denenir
+
 # --- API UÇ NOKTALARI ---
 
 @app.post("/api/giris") # [cite: 45-57]
@@ -125,16 +453,13 @@ async def giris(data: Dict, request: Request):
     """
     Giriş başarılı olursa, İSTEĞİ YAPAN IP ADRESİ ile TAKIM NO eşleştirilir.
     """
-    conn = get_db()
-    res = conn.execute("SELECT takim_no FROM takimlar WHERE kadi=? AND sifre=?",
-                       (data.get("kadi"), data.get("sifre"))).fetchone()
-    if res:
-        takim_no = res['takim_no']
+    takim_no = kimlik_deposu.dogrula(data.get("kadi"), data.get("sifre"))
+    if takim_no is not None:
         # IP'yi kaydet (Localhost testlerinde hepsi 127.0.0.1 olabilir, dikkat)
         client_ip = request.client.host
-        ip_session_map[client_ip] = takim_no
+        await oturum_ac(client_ip, takim_no)
         
-        print(f"[GIRIS] IP: {client_ip} -> Takım: {takim_no}")
+        olay("giris", ip=client_ip, takim_no=takim_no)
         return takim_no # 200 OK
     
     # [cite: 57] Kullanıcı adı/şifre geçersiz ise 400
@@ -144,14 +469,29 @@ async def giris(data: Dict, request: Request):
 async def sunucu_saati():
     return mevcut_sunucu_saati()
 
-@app.post("/api/telemetri_gonder") # [cite: 69-165]
-async def telemetri_gonder(data: TelemetriModel, request: Request):
+async def telemetri_isle(data: TelemetriKaydi, client_ip, yaricap=None, en_yakin=None):
+    """
+    Doğrulanmış telemetri paketini işler; JSON, ikili ve WebSocket uçları ortak kullanır.
+    (durum_kodu, içerik) döner; 200 ise içerik sunucusaati + konumBilgileri'nin
+    hazır JSON gövdesidir (bytes).
+    yaricap (metre) / en_yakin (K) verilirse konumBilgileri paketin konumuna göre
+    filtrelenir, yakından uzağa sıralanır ve takımın kendisi listeden çıkarılır.
+    Çoklu worker'da paylaşılan depo meşgulse paket 503 ile reddedilir.
+    """
+    try:
+        return await _telemetri_isle(data, client_ip, yaricap, en_yakin)
+    except DurumMesgul:
+        telemetri_redleri.artir(503, "durum_mesgul")
+        return 503, {"detail": "Sunucu mesgul"}
+
+async def _telemetri_isle(data: TelemetriKaydi, client_ip, yaricap, en_yakin):
     # 1. Oturum Kontrolü (IP Bazlı)
     # Telemetri paketinde takım no olsa da güvenlik IP ile sağlanır [cite: 49]
-    client_ip = request.client.host
-    if client_ip not in ip_session_map:
+    oturum_takim_no = oturum_takimi(client_ip)
+    if oturum_takim_no is None:
         # [cite: 27] 401: Kimliksiz erişim
-        raise HTTPException(status_code=401, detail="Oturum acilmadi")
+        telemetri_redleri.artir(401, "oturum_yok")
+        return 401, {"detail": "Oturum acilmadi"}
     
     # 2. Takım Numarası Doğrulama
     # IP'deki takım ile paketteki takım uyuşuyor mu?
@@ -160,15 +500,22 @@ async def telemetri_gonder(data: TelemetriModel, request: Request):
     # DÜZELTME: Localhost testlerinde (aynı bilgisayarda) IP çakışmasını göz ardı et
     is_localhost = client_ip in ["127.0.0.1", "::1", "localhost"]
     
-    if not is_localhost and ip_session_map[client_ip] != data.takim_numarasi:
-         raise HTTPException(status_code=403, detail="IP ve Takim No uyusmuyor")
+    if not is_localhost and oturum_takim_no != data.takim_numarasi:
+         telemetri_redleri.artir(403, "takim_uyusmuyor")
+         return 403, {"detail": "IP ve Takim No uyusmuyor"}
     # 3. Frekans Kontrolü [cite: 72]
     simdi_ms = int(time.time() * 1000)
-    if data.takim_numarasi in son_telemetri_zamanlari:
+    if paylasimli_durum is not None:
+        # Çoklu worker: son paket zamanı depodan okunur, kabul aşağıda atomik yapılır
+        if paylasimli_durum.hiz_siniri_asildi(data.takim_numarasi, simdi_ms, TELEMETRI_MIN_ARALIK_MS):
+            telemetri_redleri.artir(400, "hiz_siniri")
+            return 400, 3
+    elif data.takim_numarasi in son_telemetri_zamanlari:
         # 500ms'den daha sık gelirse (2 Hz üzeri)
-        if (simdi_ms - son_telemetri_zamanlari[data.takim_numarasi]) < 490: # Tolerans payı
+        if (simdi_ms - son_telemetri_zamanlari[data.takim_numarasi]) < TELEMETRI_MIN_ARALIK_MS: # Tolerans payı
             # [cite: 72] 400 durum kodu ile sayfa içeriği olarak 3
-            return JSONResponse(status_code=400, content=3)
+            telemetri_redleri.artir(400, "hiz_siniri")
+            return 400, 3
             
     # 4. Veri Aralığı Kontrolü [cite: 77, 83-85]
     # Aralık dışı ise tüm paket hatalı sayılır. 
@@ -179,90 +526,208 @@ async def telemetri_gonder(data: TelemetriModel, request: Request):
         (-90 <= data.iha_yatis <= 90)
     )
     if not valid_range:
-         return JSONResponse(status_code=400, content="Aralik Disi Veri")
+         telemetri_redleri.artir(400, "aralik_disi")
+         return 400, "Aralik Disi Veri"
 
-    # Veritabanı İşlemleri
-    conn = get_db()
-    gps_ms = (data.gps_saati.saat * 3600000) + (data.gps_saati.dakika * 60000) + \
-             (data.gps_saati.saniye * 1000) + data.gps_saati.milisaniye
-             
-    conn.execute("""INSERT INTO telemetri (
-        takim_no, enlem, boylam, irtifa, dikilme, yonelme, yatis, hiz,
-        batarya, otonom, kilitlenme, hedef_merkez_X, hedef_merkez_Y, 
-        hedef_genislik, hedef_yukseklik, gps_saati_ms, sunucu_saati_ms
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", 
-    (data.takim_numarasi, data.iha_enlem, data.iha_boylam, data.iha_irtifa,
-     data.iha_dikilme, data.iha_yonelme, data.iha_yatis, data.iha_hiz,
-     data.iha_batarya, data.iha_otonom, data.iha_kilitlenme, 
-     data.hedef_merkez_X, data.hedef_merkez_Y, data.hedef_genislik, 
-     data.hedef_yukseklik, gps_ms, simdi_ms))
-    
-    conn.commit()
-    son_telemetri_zamanlari[data.takim_numarasi] = simdi_ms
+    if paylasimli_durum is not None and not await paylasimli_durum.calistir(
+            paylasimli_durum.telemetri_kabul_et,
+            data.takim_numarasi, simdi_ms, TELEMETRI_MIN_ARALIK_MS, (*data, simdi_ms)):
+        # Okuma ile kabul arasında başka bir worker bu takımın paketini kabul etti
+        telemetri_redleri.artir(400, "hiz_siniri")
+        return 400, 3
+
+    # Veritabanı İşlemleri (arka plan yazıcısına devredilir, commit beklenmez)
+    telemetri_yazici.ekle((*data, simdi_ms))
+    if gunlukcu.isEnabledFor(logging.DEBUG):
+        # Yüksek frekanslı; GUNLUK_ORNEKLEME oranında yazılır
+        olay("telemetri", logging.DEBUG, sunucu_saati_ms=simdi_ms, **data._asdict())
+
+    if paylasimli_durum is None:
+        telemetri_uygula(data, simdi_ms)
+    else:
+        # Bu paket ve diğer worker'ların araya giren paketleri günlük sırasıyla uygulanır.
+        # Paket zaten kabul edildi; depo meşgulse senkron döngüsü uygular.
+        try:
+            await paylasimli_olaylari_uygula()
+        except DurumMesgul:
+            pass
 
     # 5. Cevap Oluşturma [cite: 132-162]
-    TIMEOUT_MS = 5000
-    esik_zaman = simdi_ms - TIMEOUT_MS
-    rows = conn.execute("SELECT * FROM telemetri WHERE sunucu_saati_ms > ? GROUP BY takim_no HAVING MAX(sunucu_saati_ms)", (esik_zaman,)).fetchall()
-    
-    konumlar = []
-    for r in rows:
-        # --- EKLENECEK FİLTRE BAŞLANGICI ---
-        # Eğer veritabanından gelen takım no, isteği gönderen takım no ile aynıysa;
-        # bu benim kendi takımımdır, listeye ekleme ve sonraki satıra geç.
-            
-        konumlar.append({
-            "takim_numarasi": r['takim_no'],
-            "iha_enlem": r['enlem'],
-            "iha_boylam": r['boylam'],
-            "iha_irtifa": r['irtifa'],
-            "iha_dikilme": r['dikilme'],
-            "iha_yonelme": r['yonelme'],
-            "iha_yatis": r['yatis'],
-            "iha_hizi": r['hiz'],
-            "zaman_farki": simdi_ms - r['sunucu_saati_ms']
-        })
-
-    return {"sunucusaati": mevcut_sunucu_saati(), "konumBilgileri": konumlar}
+    takimlar = None
+    if yaricap is not None or en_yakin is not None:
+        takimlar = konum_tablosu.yakindakiler(simdi_ms, data.iha_enlem, data.iha_boylam, data.iha_irtifa,
+                                              yaricap, en_yakin, haric=data.takim_numarasi)
+    return 200, konum_tablosu.cevap_govdesi(simdi_ms, mevcut_sunucu_saati(), takimlar)
+
+@app.post("/api/telemetri_gonder") # [cite: 69-165]
+async def telemetri_gonder(data: TelemetriModel, request: Request,
+                           yaricap: Optional[float] = Query(None, gt=0),
+                           en_yakin: Optional[int] = Query(None, gt=0)):
+    # yaricap / en_yakin isteğe bağlıdır; verilmezse tüm aktif takımlar döner
+    kod, icerik = await telemetri_isle(TelemetriKaydi.modelden(data), request.client.host, yaricap, en_yakin)
+    if kod != 200:
+        return JSONResponse(status_code=kod, content=icerik)
+    return Response(content=icerik, media_type="application/json")
+
+@app.post("/api/telemetri_gonder_ikili")
+async def telemetri_gonder_ikili(request: Request,
+                                 yaricap: Optional[float] = Query(None, gt=0),
+                                 en_yakin: Optional[int] = Query(None, gt=0)):
+    """
+    telemetri_gonder'in sabit düzenli ikili karşılığı (application/octet-stream).
+    Paket düzeni telemetri_kaydi.py'de; kontroller, filtreler ve cevap JSON uçla aynıdır.
+    """
+    try:
+        kayit = TelemetriKaydi.ikiliden(await request.body())
+    except ValueError:
+        return JSONResponse(status_code=204, content={"detail": "Format Yanlış"})
+    kod, icerik = await telemetri_isle(kayit, request.client.host, yaricap, en_yakin)
+    if kod != 200:
+        return JSONResponse(status_code=kod, content=icerik)
+    return Response(content=icerik, media_type="application/json")
+
+@app.get("/api/rakip_sorgu")
+async def rakip_sorgu(request: Request,
+                      yaricap: Optional[float] = Query(None, gt=0),
+                      en_yakin: Optional[int] = Query(None, gt=0),
+                      enlem: Optional[float] = None, boylam: Optional[float] = None,
+                      irtifa: Optional[float] = None):
+    """
+    Telemetri göndermeden rakip sorgusu: verilen noktaya (verilmezse takımın
+    son telemetri konumuna) yaricap metre içindeki ve/veya en yakın en_yakin
+    takımı telemetri cevabıyla aynı biçimde döner. Filtre verilmezse tüm liste.
+    irtifa verilmezse takımın son irtifası kullanılır.
+    """
+    takim_no = oturum_takimi(request.client.host)
+    if takim_no is None:
+        raise HTTPException(status_code=401, detail="Oturum acilmadi")
+    simdi_ms = int(time.time() * 1000)
+
+    takimlar = None
+    if yaricap is not None or en_yakin is not None:
+        konum = konum_tablosu.konum(takim_no)
+        if enlem is None or boylam is None:
+            if konum is None:
+                # Merkez verilmedi ve takımın güncel konumu yok
+                return JSONResponse(status_code=400, content="Konum bilinmiyor")
+            enlem, boylam = konum["iha_enlem"], konum["iha_boylam"]
+        if irtifa is None:
+            irtifa = konum["iha_irtifa"] if konum is not None else 0.0
+        takimlar = konum_tablosu.yakindakiler(simdi_ms, enlem, boylam, irtifa,
+                                              yaricap, en_yakin, haric=takim_no)
+    return Response(content=konum_tablosu.cevap_govdesi(simdi_ms, mevcut_sunucu_saati(), takimlar),
+                    media_type="application/json")
+
+def akis_mesaji(kod, icerik, yayin=False):
+    """WebSocket çerçevesi: {"kod": ..., "icerik": ...}; 200 içeriği hazır JSON gövdesidir."""
+    if kod != 200:
+        return json.dumps({"kod": kod, "icerik": icerik})
+    basi = '{"kod":200,"yayin":true,"icerik":' if yayin else '{"kod":200,"icerik":'
+    return basi + icerik.decode("utf-8") + "}"
+
+@app.websocket("/api/telemetri_akisi")
+async def telemetri_akisi(websocket: WebSocket):
+    """
+    Kalıcı bağlantı üzerinden telemetri alır; her pakete telemetri_gonder ile
+    aynı cevabı {"kod": ..., "icerik": ...} çerçevesinde döner. Bağlı her
+    istemciye ayrıca konum değiştikçe konumBilgileri yayınlanır (kod 200, "yayin": true).
+    Oturum ve 2 Hz kuralları HTTP ucuyla aynıdır.
+    """
+    client_ip = websocket.client.host
+    try:
+        oturum_takim_no = oturum_takimi(client_ip)
+    except DurumMesgul:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Sunucu mesgul")
+        return
+    if oturum_takim_no is None:
+        # Giriş HTTP üzerinden yapılır (IP eşleştirmesi)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Oturum acilmadi")
+        return
+
+    await websocket.accept()
+    # Cevaplar ve yayınlar sokete yalnızca kutunun görevinden yazılır
+    kutu = AkisKutusu(websocket, AKIS_KUTUSU_KAPASITESI)
+    konum_aboneleri.add(kutu)
+    try:
+        while True:
+            mesaj = await websocket.receive()
+            if mesaj["type"] == "websocket.disconnect":
+                break
+            metin = mesaj.get("text")
+            if metin is None:
+                # İkili çerçeve: paket JSON metni olmalı
+                kutu.cevap(json.dumps({"kod": 204, "icerik": "Format Yanlış"}))
+                continue
+            try:
+                kayit = TelemetriKaydi.modelden(TelemetriModel.model_validate_json(metin))
+            except ValidationError:
+                kutu.cevap(json.dumps({"kod": 204, "icerik": "Format Yanlış"}))
+                continue
+            kutu.cevap(akis_mesaji(*await telemetri_isle(kayit, client_ip)))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        konum_aboneleri.discard(kutu)
+        kutu.kapat()
+
+async def konum_yayini_dongusu():
+    """
+    Konumlar değiştiyse tek seferde kodlanan konumBilgileri'ni tüm abonelerin
+    kutusuna bırakır; gönderimi her kutunun kendi görevi yapar, bu tur hiçbir
+    soketi beklemez.
+    """
+    yayinlanan_surum = konum_tablosu.surum
+    while True:
+        await asyncio.sleep(KONUM_YAYIN_ARALIGI_S)
+        if not konum_aboneleri:
+            continue
+        simdi_ms = int(time.time() * 1000)
+        konum_tablosu.suresi_dolanlari_sil(simdi_ms)
+        if konum_tablosu.surum == yayinlanan_surum:
+            continue
+        yayinlanan_surum = konum_tablosu.surum
+        mesaj = akis_mesaji(200, konum_tablosu.cevap_govdesi(simdi_ms, mevcut_sunucu_saati()), yayin=True)
+        for kutu in konum_aboneleri:
+            kutu.yayinla(mesaj)
+
 @app.post("/api/kilitlenme_bilgisi") # [cite: 166-182]
 async def kilitlenme_bilgisi(data: KilitlenmeModel, request: Request):
     # Pakette Takım No YOK. IP'den buluyoruz.
-    client_ip = request.client.host
-    if client_ip not in ip_session_map:
+    takim_no = oturum_takimi(request.client.host)
+    if takim_no is None:
         raise HTTPException(status_code=401, detail="Oturum acilmadi")
-    
-    takim_no = ip_session_map[client_ip]
-    
-    print(f"\n[KILITLENME] Takım {takim_no} kilitlendi.")
-    print(json.dumps(data.dict(), indent=4))
+    bitis = data.kilitlenmeBitisZamani
+    bitis_str = format_time_str(bitis)
+    bitis_ms = (bitis.saat * 3600000) + (bitis.dakika * 60000) + (bitis.saniye * 1000) + bitis.milisaniye
 
-    conn = get_db()
-    bitis_str = format_time_str(data.kilitlenmeBitisZamani)
-    
-    conn.execute("INSERT INTO kilitlenmeler (takim_no, baslangic_saati, bitis_saati, otonom_mu) VALUES (?, ?, ?, ?)",
-                 (takim_no, "Unknown", bitis_str, data.otonom_kilitlenme))
-    conn.commit()
+    # Başlangıç, telemetride açılan kilitlenme aralığından gelir
+    if paylasimli_durum is None:
+        baslangic_ms, sure_ms = kilitlenme_takibi.raporla(takim_no, bitis_ms)
+    else:
+        # Rapor da günlüğe girer ki tüm worker'ların kilitlenme durumu aynı kalsın
+        sira = await paylasimli_durum.calistir(paylasimli_durum.olay_ekle, "k", [takim_no, bitis_ms],
+                                               int(time.time() * 1000))
+        baslangic_ms, sure_ms = await kilitlenme_sonucunu_bekle(sira)
+    baslangic_str = saat_metni(baslangic_ms) if baslangic_ms is not None else "Unknown"
+
+    olay("kilitlenme", takim_no=takim_no, baslangic=baslangic_str, bitis=bitis_str,
+         sure_ms=sure_ms, otonom=data.otonom_kilitlenme)
+    await db_yoneticisi.calistir(kilitlenme_kaydet, takim_no,
+                                 baslangic_str, bitis_str, data.otonom_kilitlenme, sure_ms)
     return status.HTTP_200_OK
 
 @app.post("/api/kamikaze_bilgisi") # [cite: 183-205]
 async def kamikaze_bilgisi(data: KamikazeModel, request: Request):
     # Pakette Takım No YOK. IP'den buluyoruz.
-    client_ip = request.client.host
-    if client_ip not in ip_session_map:
+    takim_no = oturum_takimi(request.client.host)
+    if takim_no is None:
         raise HTTPException(status_code=401, detail="Oturum acilmadi")
-    
-    takim_no = ip_session_map[client_ip]
-    
-    print(f"\n[KAMIKAZE] Takım {takim_no} kamikaze yaptı.")
-    print(json.dumps(data.model_dump(), indent=4))
-
-    conn = get_db()
     baslangic_str = format_time_str(data.kamikazeBaslangicZamani)
     bitis_str = format_time_str(data.kamikazeBitisZamani)
-    
-    conn.execute("INSERT INTO kamikaze (takim_no, baslangic_saati, bitis_saati, qr_metni) VALUES (?, ?, ?, ?)",
-                 (takim_no, baslangic_str, bitis_str, data.qrMetni))
-    conn.commit()
+
+    olay("kamikaze", takim_no=takim_no, baslangic=baslangic_str, bitis=bitis_str, qr_metni=data.qrMetni)
+    await db_yoneticisi.calistir(kamikaze_kaydet, takim_no,
+                                 baslangic_str, bitis_str, data.qrMetni)
     return status.HTTP_200_OK
 
 @app.get("/api/qr_koordinati") # [cite: 208-216]
@@ -272,14 +737,107 @@ async def qr_koordinati():
 @app.get("/api/hss_koordinatlari") # [cite: 217-226]
 async def hss_koordinatlari():
     # Hakemler duyuru yapana kadar boş liste dönebilir [cite: 225]
-    # Test için dolu dönüyoruz
-    hss_listesi = [
-        {"id": 1, "hssEnlem": 41.5130, "hssBoylam": 36.1200, "hssYaricap": 50},
-    ]
-    return {"sunucusaati": mevcut_sunucu_saati(), "hss_koordinat_bilgileri": hss_listesi}
+    # Bölgeler hss_motoru.py'de; ihlal kontrolü aynı listeyle yapılır
+    return {"sunucusaati": mevcut_sunucu_saati(), "hss_koordinat_bilgileri": hss_motoru.bolgeler}
+
+@app.get("/api/hss_ihlalleri")
+async def hss_ihlalleri(takim_no: Optional[int] = None):
+    """
+    Kayıtlı HSS ihlal aralıkları (ms, sunucu saati) ve henüz kapanmamış
+    olanlar (cikis_ms/sure_ms null). takim_no verilirse yalnızca o takım.
+    """
+    satirlar = await db_yoneticisi.calistir(hss_ihlalleri_sorgula, takim_no)
+    ihlaller = [dict(satir) for satir in satirlar]
+    ihlaller += [{"takim_no": t, "hss_id": h, "giris_ms": g, "cikis_ms": None, "sure_ms": None}
+                 for t, h, g in hss_motoru.acik_ihlaller() if takim_no is None or t == takim_no]
+    return {"sunucusaati": mevcut_sunucu_saati(), "hss_ihlalleri": ihlaller}
+
+# --- METRİK UCU ---
+def aktif_takim_sayisi():
+    konum_tablosu.suresi_dolanlari_sil(int(time.time() * 1000))
+    return len(konum_tablosu)
+
+metrik_kaydi.gosterge("hakem_aktif_takim", "Son TIMEOUT_MS içinde telemetri gönderen takım sayısı",
+                      aktif_takim_sayisi)
+metrik_kaydi.gosterge("hakem_websocket_abone", "konumBilgileri yayınına bağlı WebSocket sayısı",
+                      lambda: len(konum_aboneleri))
+metrik_kaydi.gosterge("hakem_kuyruk_derinligi", "Arka plan kuyruklarında bekleyen kayıt sayısı",
+                      lambda: {("telemetri",): telemetri_yazici.kuyruk.qsize(),
+                               ("hss_ihlalleri",): hss_yazici.kuyruk.qsize(),
+                               ("gunluk",): gunluk_dinleyici.queue.qsize()}, ("kuyruk",))
+metrik_kaydi.gosterge("hakem_yazici_atilan_toplam", "Yazıcı kuyruğu dolu olduğu için atılan DB satırları",
+                      lambda: {("telemetri",): telemetri_yazici.atilan,
+                               ("hss_ihlalleri",): hss_yazici.atilan}, ("kuyruk",), tur="counter")
+metrik_kaydi.gosterge("hakem_gunluk_atilan_toplam", "Günlük kuyruğu dolu olduğu için atılan olay kayıtları",
+                      atilan_kayit_sayisi, tur="counter")
+
+@app.get("/metrics", include_in_schema=False)
+async def metrikler():
+    return Response(content=metrik_kaydi.metin(), media_type=ICERIK_TURU)
+
+# --- HAKEM KONTROL UÇLARI ---
+# Çoklu worker modunda her istek bir worker'a düşer; profil o worker'da açılır
+# (durum/sonuç cevaplarındaki pid ile görülebilir).
+def hakem_dogrula(request: Request):
+    if not HAKEM_ANAHTARI:
+        raise HTTPException(status_code=404, detail="Not Found")
+    anahtar = request.headers.get("X-Hakem-Anahtari", "")
+    if not hmac.compare_digest(anahtar.encode("utf-8"), HAKEM_ANAHTARI.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Hakem anahtari gecersiz")
+
+@app.post("/hakem/profil/baslat", include_in_schema=False)
+async def profil_baslat(request: Request, tur: str = "cprofile",
+                        sure_s: float = Query(10.0, gt=0),
+                        istek_sayisi: Optional[int] = Query(None, gt=0),
+                        yol: Optional[str] = None,
+                        aralik_ms: float = Query(5.0, gt=0)):
+    """
+    Profil oturumu açar: tur=cprofile|ornekleme. sure_s dolunca ya da
+    istek_sayisi kadar istek (yol verilirse yalnızca o rota, örn.
+    /api/telemetri_gonder) bitince kapanır.
+    """
+    hakem_dogrula(request)
+    try:
+        durum = profilleyici.baslat(asyncio.get_running_loop(), tur, sure_s, istek_sayisi, yol, aralik_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    olay("profil_basladi", tur=tur, sure_s=sure_s, istek_sayisi=istek_sayisi, yol=yol)
+    return durum
+
+@app.post("/hakem/profil/durdur", include_in_schema=False)
+async def profil_durdur(request: Request):
+    hakem_dogrula(request)
+    profilleyici.durdur()
+    return profilleyici.durum()
+
+@app.get("/hakem/profil/durum", include_in_schema=False)
+async def profil_durum(request: Request):
+    hakem_dogrula(request)
+    return profilleyici.durum()
+
+@app.get("/hakem/profil/sonuc", include_in_schema=False)
+async def profil_sonuc(request: Request):
+    """Son biten oturumun dosyası: .prof (pstats) veya .folded (collapsed stack)."""
+    hakem_dogrula(request)
+    if profilleyici.son_dosya is None or not os.path.exists(profilleyici.son_dosya):
+        raise HTTPException(status_code=404, detail="Profil sonucu yok")
+    return FileResponse(profilleyici.son_dosya, media_type="application/octet-stream",
+                        filename=os.path.basename(profilleyici.son_dosya))
 
 if __name__ == "__main__":
     # 127.0.0.25 Mac/Windows bazı durumlarda sorun çıkarabilir, localhost ile test edebilirsiniz.
     # Ancak kod mantığı IP kontrolü yaptığı için, client scriptiniz de aynı makinede ise
     # IP hep 127.0.0.1 görünecektir. Bu test için yeterlidir.
-    uvicorn.run(app, host="localhost", port=8000)
\ No newline at end of file
+    if SUNUCU_ISCI_SAYISI > 1:
+        # Worker'lar bu modülü yeniden import eder; paylaşılan depoyu ortamdan alırlar.
+        # Önceki çalıştırmadan kalan oturumlar geçerli olmasın diye depo sıfırdan kurulur.
+        durum_db = PAYLASIMLI_DURUM_DB or "paylasimli_durum.db"
+        for ek in ("", "-wal", "-shm"):
+            if os.path.exists(durum_db + ek):
+                os.remove(durum_db + ek)
+        os.environ["PAYLASIMLI_DURUM_DB"] = durum_db
+        uvicorn.run("referee_server:app", host="localhost", port=8000, workers=SUNUCU_ISCI_SAYISI)
+    else:
+        uvicorn.run(app, host="localhost", port=8000)
\ No newline at end of file
@@ -0,0 +1,69 @@
+import struct
+from typing import NamedTuple
+
+
+class TelemetriKaydi(NamedTuple):
+    """
+    Sunucunun içeride kullandığı telemetri kaydı.
+
+    Alan sırası telemetri tablosunun sütun sırasıdır (sunucu_saati_ms hariç);
+    böylece (*kayit, sunucu_saati_ms) doğrudan INSERT parametresi olur.
+    JSON (TelemetriModel) ve ikili uç aynı kayda dönüştürülür.
+    """
+    takim_numarasi: int
+    iha_enlem: float
+    iha_boylam: float
+    iha_irtifa: float
+    iha_dikilme: float
+    iha_yonelme: float
+    iha_yatis: float
+    iha_hiz: float
+    iha_batarya: float
+    iha_otonom: int
+    iha_kilitlenme: int
+    hedef_merkez_X: int
+    hedef_merkez_Y: int
+    hedef_genislik: int
+    hedef_yukseklik: int
+    gps_saati_ms: int
+
+    @classmethod
+    def modelden(cls, data):
+        """TelemetriModel'den kayıt oluşturur."""
+        gps = data.gps_saati
+        gps_ms = (gps.saat * 3600000) + (gps.dakika * 60000) + (gps.saniye * 1000) + gps.milisaniye
+        return cls(data.takim_numarasi, data.iha_enlem, data.iha_boylam, data.iha_irtifa,
+                   data.iha_dikilme, data.iha_yonelme, data.iha_yatis, data.iha_hiz,
+                   data.iha_batarya, data.iha_otonom, data.iha_kilitlenme,
+                   data.hedef_merkez_X, data.hedef_merkez_Y, data.hedef_genislik,
+                   data.hedef_yukseklik, gps_ms)
+
+    @classmethod
+    def ikiliden(cls, govde):
+        """
+        /api/telemetri_gonder_ikili gövdesini çözer. Uzunluk veya sürüm
+        yanlışsa ValueError fırlatır (JSON'daki format hatasının karşılığı).
+        """
+        if len(govde) != IKILI_PAKET.size:
+            raise ValueError("Paket boyutu yanlış")
+        (surum, takim_no, enlem, boylam, irtifa, dikilme, yonelme, yatis, hiz, batarya,
+         otonom, kilitlenme, merkez_x, merkez_y, genislik, yukseklik,
+         saat, dakika, saniye, milisaniye) = IKILI_PAKET.unpack_from(memoryview(govde))
+        if surum != IKILI_SURUM:
+            raise ValueError("Paket sürümü desteklenmiyor")
+        gps_ms = (saat * 3600000) + (dakika * 60000) + (saniye * 1000) + milisaniye
+        return cls(takim_no, enlem, boylam, irtifa, dikilme, yonelme, yatis, hiz, batarya,
+                   otonom, kilitlenme, merkez_x, merkez_y, genislik, yukseklik, gps_ms)
+
+
+# --- İKİLİ PAKET DÜZENİ (little-endian, hizalamasız, 60 byte) ---
+# B   sürüm (1)
+# i   takim_numarasi
+# d d iha_enlem, iha_boylam
+# f*6 iha_irtifa, iha_dikilme, iha_yonelme, iha_yatis, iha_hiz, iha_batarya
+# B B iha_otonom, iha_kilitlenme
+# h*4 hedef_merkez_X, hedef_merkez_Y, hedef_genislik, hedef_yukseklik
+# B B B H  gps_saati: saat, dakika, saniye, milisaniye
+# İstemci tarafındaki kodlayıcı: client/competitor_client.py (TELEMETRI_IKILI_PAKET)
+IKILI_SURUM = 1
+IKILI_PAKET = struct.Struct("<BiddffffffBBhhhhBBBH")
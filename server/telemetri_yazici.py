@@ -0,0 +1,116 @@
+import logging
+import queue
+import threading
+import time
+
+from gunluk import olay
+
+
+class TelemetriYazici:
+    """
+    Telemetri paketlerini istek yolundan alıp arka plandaki bir thread ile
+    toplu halde (executemany + tek commit) veritabanına yazar.
+
+    Böylece her paket için ayrı bir commit (fsync) yapılmaz; istek süresine
+    disk senkronizasyonu eklenmez.
+    """
+
+    _DUR = object() # Kuyruğa konan durdurma işareti
+
+    def __init__(self, baglanti_fabrikasi, sql, kuyruk_boyutu=10000,
+                 parti_boyutu=500, yazma_araligi_s=0.2, ad="telemetri-yazici", olcum=None):
+        self.baglanti_fabrikasi = baglanti_fabrikasi
+        self.sql = sql
+        self.ad = ad
+        # olcum(islem, sure_s): parti başına "insert" ve "commit" süreleri (bkz. metrikler.py)
+        self.olcum = olcum
+        self.parti_boyutu = parti_boyutu
+        self.yazma_araligi_s = yazma_araligi_s
+        self.kuyruk = queue.Queue(maxsize=kuyruk_boyutu)
+        self.atilan = 0        # Kuyruk dolu olduğu için yazılamayan satırlar
+        self._tasiyor = False  # Son ekleme kuyruk dolu diye atıldı mı
+        self._thread = None
+
+    def baslat(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._calis, name=self.ad, daemon=True)
+        self._thread.start()
+
+    def ekle(self, kayit):
+        """
+        Satırı (INSERT parametre sırasıyla) kuyruğa ekler; eklenemezse False.
+
+        Event loop thread'inden çağrılır, bu yüzden asla beklemez: disk
+        yavaşlayıp kuyruk dolarsa satır atılır ve sayılır (atilan). Her taşma
+        döneminin ilk satırı için bir uyarı olayı yazılır.
+        """
+        try:
+            self.kuyruk.put_nowait(kayit)
+        except queue.Full:
+            self.atilan += 1
+            if not self._tasiyor:
+                self._tasiyor = True
+                olay("yazici_kuyrugu_dolu", logging.WARNING, yazici=self.ad,
+                     kuyruk_boyutu=self.kuyruk.maxsize, atilan=self.atilan)
+            return False
+        if self._tasiyor:
+            self._tasiyor = False
+            olay("yazici_kuyrugu_bosaldi", logging.WARNING, yazici=self.ad, atilan=self.atilan)
+        return True
+
+    def durdur(self):
+        """Kuyrukta kalan tüm satırları yazar ve thread'i kapatır."""
+        if self._thread is None:
+            return
+        self.kuyruk.put(self._DUR)
+        self._thread.join()
+        self._thread = None
+
+    def _calis(self):
+        # Bağlantı bu thread'e aittir; kapatılması bağlantı fabrikasının işidir
+        conn = self.baglanti_fabrikasi()
+        calisiyor = True
+        while calisiyor:
+            kayit = self.kuyruk.get()
+            if kayit is self._DUR:
+                break
+            parti = [kayit]
+            # İlk satırdan itibaren en fazla yazma_araligi_s kadar biriktir
+            son_zaman = time.monotonic() + self.yazma_araligi_s
+            while len(parti) < self.parti_boyutu:
+                kalan = son_zaman - time.monotonic()
+                try:
+                    kayit = self.kuyruk.get(timeout=kalan) if kalan > 0 else self.kuyruk.get_nowait()
+                except queue.Empty:
+                    break
+                if kayit is self._DUR:
+                    calisiyor = False
+                    break
+                parti.append(kayit)
+            self._yaz(conn, parti)
+
+        # Kapanışta kuyrukta kalanları da boşalt
+        kalanlar = []
+        while True:
+            try:
+                kayit = self.kuyruk.get_nowait()
+            except queue.Empty:
+                break
+            if kayit is not self._DUR:
+                kalanlar.append(kayit)
+        if kalanlar:
+            self._yaz(conn, kalanlar)
+
+    def _yaz(self, conn, parti):
+        try:
+            baslangic = time.perf_counter()
+            conn.executemany(self.sql, parti)
+            ara = time.perf_counter()
+            conn.commit()
+            if self.olcum is not None:
+                self.olcum("insert", ara - baslangic)
+                self.olcum("commit", time.perf_counter() - ara)
+        except Exception as e:
+            conn.rollback()
+            olay("yazma_hatasi", logging.ERROR, yazici=self.ad, satir=len(parti), hata=str(e))
@@ -0,0 +1,140 @@
+import heapq
+import math
+
+METRE_PER_DERECE_ENLEM = 110540.0
+METRE_PER_DERECE_BOYLAM_EKVATOR = 111320.0
+
+
+class KonumIzgarasi:
+    """
+    Takımların son konumları için düzgün ızgara (uniform grid) indeksi.
+
+    Enlem/boylam, ilk eklenen konum referans alınarak yerel metrik düzleme
+    (equirectangular) izdüşürülür; yarışma alanı birkaç km olduğu için hata
+    ihmal edilebilir. Yatay düzlem hucre_m kenarlı hücrelere bölünür, mesafe
+    irtifa dahil 3B hesaplanır. Yarıçap sorgusu yalnızca yarıçapın kestiği
+    hücrelere, en yakın K sorgusu merkezden dışa doğru halkalara bakar.
+    """
+
+    def __init__(self, hucre_m=100.0):
+        self.hucre_m = hucre_m
+        self._referans = None  # (enlem, boylam, boylam_metre_carpani)
+        self._hucreler = {}    # {(hx, hy): {takim_no, ...}}
+        self._konumlar = {}    # {takim_no: (x, y, z, (hx, hy))}
+
+    def __len__(self):
+        return len(self._konumlar)
+
+    def _metrik(self, enlem, boylam):
+        if self._referans is None:
+            self._referans = (enlem, boylam,
+                              METRE_PER_DERECE_BOYLAM_EKVATOR * math.cos(math.radians(enlem)))
+        ref_enlem, ref_boylam, boylam_carpani = self._referans
+        return (boylam - ref_boylam) * boylam_carpani, (enlem - ref_enlem) * METRE_PER_DERECE_ENLEM
+
+    def _hucre(self, x, y):
+        return (math.floor(x / self.hucre_m), math.floor(y / self.hucre_m))
+
+    def guncelle(self, takim_no, enlem, boylam, irtifa):
+        x, y = self._metrik(enlem, boylam)
+        hucre = self._hucre(x, y)
+        eski = self._konumlar.get(takim_no)
+        if eski is not None and eski[3] != hucre:
+            self._hucreden_cikar(takim_no, eski[3])
+        if eski is None or eski[3] != hucre:
+            self._hucreler.setdefault(hucre, set()).add(takim_no)
+        self._konumlar[takim_no] = (x, y, irtifa, hucre)
+
+    def sil(self, takim_no):
+        eski = self._konumlar.pop(takim_no, None)
+        if eski is not None:
+            self._hucreden_cikar(takim_no, eski[3])
+
+    def _hucreden_cikar(self, takim_no, hucre):
+        takimlar = self._hucreler[hucre]
+        takimlar.discard(takim_no)
+        if not takimlar:
+            del self._hucreler[hucre]
+
+    def _mesafe(self, takim_no, x, y, z):
+        tx, ty, tz, _ = self._konumlar[takim_no]
+        return math.sqrt((tx - x) ** 2 + (ty - y) ** 2 + (tz - z) ** 2)
+
+    def yaricap_icinde(self, enlem, boylam, irtifa, yaricap_m, haric=None):
+        """yaricap_m içindeki takımları yakından uzağa [(mesafe_m, takim_no)] döner."""
+        x, y = self._metrik(enlem, boylam)
+        hx0, hy0 = self._hucre(x - yaricap_m, y - yaricap_m)
+        hx1, hy1 = self._hucre(x + yaricap_m, y + yaricap_m)
+        sonuc = []
+        # Yarıçap alanı hücre sayısından büyükse dolu hücreleri gezmek daha ucuz
+        if (hx1 - hx0 + 1) * (hy1 - hy0 + 1) > len(self._hucreler):
+            hucreler = [h for h in self._hucreler if hx0 <= h[0] <= hx1 and hy0 <= h[1] <= hy1]
+        else:
+            hucreler = [(hx, hy) for hx in range(hx0, hx1 + 1) for hy in range(hy0, hy1 + 1)]
+        for hucre in hucreler:
+            for takim_no in self._hucreler.get(hucre, ()):
+                if takim_no == haric:
+                    continue
+                mesafe = self._mesafe(takim_no, x, y, irtifa)
+                if mesafe <= yaricap_m:
+                    sonuc.append((mesafe, takim_no))
+        sonuc.sort()
+        return sonuc
+
+    def en_yakinlar(self, enlem, boylam, irtifa, k, haric=None):
+        """En yakın k takımı yakından uzağa [(mesafe_m, takim_no)] döner."""
+        x, y = self._metrik(enlem, boylam)
+        hx, hy = self._hucre(x, y)
+        aday_sayisi = len(self._konumlar) - (1 if haric in self._konumlar else 0)
+        k = min(k, aday_sayisi)
+        if k <= 0:
+            return []
+
+        en_iyiler = []  # k elemanlı max-heap: [(-mesafe, takim_no)]
+        gorulen = 0
+        bakilan_hucre = 0
+        halka = 0
+        while True:
+            for hucre in self._halka(hx, hy, halka):
+                bakilan_hucre += 1
+                for takim_no in self._hucreler.get(hucre, ()):
+                    if takim_no == haric:
+                        continue
+                    gorulen += 1
+                    mesafe = self._mesafe(takim_no, x, y, irtifa)
+                    if len(en_iyiler) < k:
+                        heapq.heappush(en_iyiler, (-mesafe, takim_no))
+                    elif mesafe < -en_iyiler[0][0]:
+                        heapq.heapreplace(en_iyiler, (-mesafe, takim_no))
+            # Dışarıdaki halkalardaki her nokta en az halka * hucre_m uzakta
+            if len(en_iyiler) == k and -en_iyiler[0][0] <= halka * self.hucre_m:
+                break
+            if gorulen == aday_sayisi:
+                break
+            # Seyrek dağılımda boş halka gezmek tüm listeyi taramaktan pahalılaştıysa tara
+            if bakilan_hucre > len(self._konumlar):
+                for takim_no in self._konumlar:
+                    if takim_no == haric or max(abs(self._konumlar[takim_no][3][0] - hx),
+                                                abs(self._konumlar[takim_no][3][1] - hy)) <= halka:
+                        continue
+                    mesafe = self._mesafe(takim_no, x, y, irtifa)
+                    if len(en_iyiler) < k:
+                        heapq.heappush(en_iyiler, (-mesafe, takim_no))
+                    elif mesafe < -en_iyiler[0][0]:
+                        heapq.heapreplace(en_iyiler, (-mesafe, takim_no))
+                break
+            halka += 1
+        return sorted((-eksi_mesafe, takim_no) for eksi_mesafe, takim_no in en_iyiler)
+
+    @staticmethod
+    def _halka(hx, hy, r):
+        """(hx, hy) merkezli, Chebyshev uzaklığı tam r olan hücreler."""
+        if r == 0:
+            yield (hx, hy)
+            return
+        for dx in range(-r, r + 1):
+            yield (hx + dx, hy - r)
+            yield (hx + dx, hy + r)
+        for dy in range(-r + 1, r):
+            yield (hx - r, hy + dy)
+            yield (hx + r, hy + dy)
@@ -0,0 +1,86 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Her bağlantı açılırken bir kez uygulanır.
+# WAL: okuyucular yazıcıyı, yazıcı okuyucuları beklemez.
+# synchronous=NORMAL: WAL modunda her commit'te değil checkpoint'te fsync yapılır.
+BAGLANTI_PRAGMALARI = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-65536",    # 64 MB (negatif değer KiB cinsinden)
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class BaglantiYoneticisi:
+    """
+    SQLite bağlantılarını thread başına bir kez açıp yeniden kullanır.
+
+    sqlite3 bağlantıları thread'ler arasında güvenle paylaşılamadığı için her
+    thread kendi kalıcı bağlantısını alır; böylece istek başına yeni bağlantı
+    açılmaz ve açılan hiçbir bağlantı sahipsiz kalmaz. kapat() hepsini kapatır.
+
+    async handler'lar sorguları calistir() ile ayrı bir thread havuzunda
+    çalıştırır; yavaş bir commit event loop'u (diğer takımların isteklerini)
+    bekletmez.
+    """
+
+    def __init__(self, db_yolu, isci_sayisi=4, olcum=None):
+        self.db_yolu = db_yolu
+        self.isci_sayisi = isci_sayisi
+        # olcum(fonksiyon_adi, sure_s): calistir() ile yapılan her işin DB thread'indeki süresi
+        self.olcum = olcum
+        self._yerel = threading.local()
+        self._baglantilar = []
+        self._kilit = threading.Lock()
+        self._havuz = None
+
+    def baglanti(self):
+        conn = getattr(self._yerel, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_yolu, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in BAGLANTI_PRAGMALARI:
+                conn.execute(pragma)
+            self._yerel.conn = conn
+            with self._kilit:
+                self._baglantilar.append(conn)
+        return conn
+
+    async def calistir(self, fonksiyon, *args):
+        """fonksiyon(conn, *args) çağrısını DB thread havuzunda çalıştırıp sonucunu döner."""
+        with self._kilit:
+            if self._havuz is None:
+                self._havuz = ThreadPoolExecutor(max_workers=self.isci_sayisi, thread_name_prefix="db")
+            havuz = self._havuz
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(havuz, self._baglanti_ile, fonksiyon, args)
+
+    def _baglanti_ile(self, fonksiyon, args):
+        if self.olcum is None:
+            return fonksiyon(self.baglanti(), *args)
+        baslangic = time.perf_counter()
+        try:
+            return fonksiyon(self.baglanti(), *args)
+        finally:
+            self.olcum(fonksiyon.__name__, time.perf_counter() - baslangic)
+
+    def kapat(self):
+        with self._kilit:
+            havuz, self._havuz = self._havuz, None
+        if havuz is not None:
+            havuz.shutdown(wait=True)
+        with self._kilit:
+            baglantilar, self._baglantilar = self._baglantilar, []
+        for conn in baglantilar:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        # Sonraki baglanti() çağrıları yeni bağlantı açsın
+        self._yerel = threading.local()